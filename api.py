@@ -11,7 +11,17 @@ import logging.handlers as handlers
 import signal
 import mysql.connector #pip3 install mysql-connector-python
 from enum import Enum
-import hashlib
+import threading
+import time
+import base64
+import heapq
+import itertools
+import zlib
+import bisect
+import array
+import math
+import binary_codec
+import canonical_json
 
 
 def handle_interrupt(signal, frame):
@@ -43,7 +53,7 @@ def setLogLevel(logLevel):
         return
 
 
-def responseHandler(requestHandler, status, headers=[], body=None, contentType="application/json"):
+def responseHandler(requestHandler, status, headers=[], body=None, contentType="application/json", contentEncoding=None):
 
     #Send the HTTP status code requested
     requestHandler.send_response(status)
@@ -51,6 +61,22 @@ def responseHandler(requestHandler, status, headers=[], body=None, contentType="
     if status == 404:
         contentType = None
 
+    #Structured bodies honour the caller's Accept header; pre-encoded bodies are already JSON
+    if contentType == "application/json":
+        if contentEncoding is None:
+            contentType = negotiateContentType(requestHandler)
+
+        tmpHeader = {}
+        tmpHeader['key'] = "Vary"
+        tmpHeader['value'] = "Accept, Accept-Encoding"
+        headers.append(tmpHeader)
+
+    if contentEncoding is not None and body != None:
+        tmpHeader = {}
+        tmpHeader['key'] = "Content-Encoding"
+        tmpHeader['value'] = contentEncoding
+        headers.append(tmpHeader)
+
     if contentType != None and body != None:
         tmpHeader = {}
         tmpHeader['key'] = "Content-Type"
@@ -74,12 +100,66 @@ def responseHandler(requestHandler, status, headers=[], body=None, contentType="
 
     #Write the response body to the caller
     if body is not None:
-        if contentType == "application/json":
+        if contentEncoding is not None:
+            requestHandler.wfile.write(body)
+        elif contentType == "application/json":
             requestHandler.wfile.write(json.dumps(body).encode("utf8"))
+        elif contentType == binary_codec.CBOR_CONTENT_TYPE:
+            requestHandler.wfile.write(binary_codec.cbor_dumps(body))
+        elif contentType == binary_codec.MSGPACK_CONTENT_TYPE:
+            requestHandler.wfile.write(binary_codec.msgpack_dumps(body))
         else:
             requestHandler.wfile.write(body)
 
 
+def negotiateContentType(requestHandler):
+
+    #Pick the supported media type with the highest quality in the Accept header, defaulting to JSON
+    returnValue = "application/json"
+    bestQuality = 0
+
+    for mediaRange in str(requestHandler.headers.get('Accept', "")).split(","):
+        parameters = mediaRange.split(";")
+        mediaType = parameters[0].strip().lower()
+        quality = 1
+
+        for parameter in parameters[1:]:
+            parameter = parameter.strip().lower()
+
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0
+
+        if mediaType not in SUPPORTED_MEDIA_TYPES or quality <= bestQuality:
+            continue
+
+        returnValue = SUPPORTED_MEDIA_TYPES[mediaType]
+        bestQuality = quality
+
+    return returnValue
+
+
+def acceptsDeflate(requestHandler):
+
+    for coding in str(requestHandler.headers.get('Accept-Encoding', "")).split(","):
+        parameters = coding.split(";")
+
+        if parameters[0].strip().lower() != "deflate":
+            continue
+
+        for parameter in parameters[1:]:
+            parameter = parameter.strip().lower()
+
+            if parameter.startswith("q=") and parameter[2:] in ["0", "0.0", "0.00", "0.000"]:
+                return False
+
+        return True
+
+    return False
+
+
 def authenticate(requestHandler):
 
     #Ensure the header exists
@@ -90,6 +170,28 @@ def authenticate(requestHandler):
     if requestHandler.headers['x-api-key'] != settings['api']['x-api-key']:
         raise HTTPUnauthorizedResponse(status=401)
 
+    heavyHitters.record("client", requestHandler.client_address[0])
+
+    admit(requestHandler.headers['x-api-key'])
+
+
+def admit(apiKey):
+
+    #Per key rate limiting; a rate of 0 disables it
+    if int(settings['api']['rate_limit_per_second']) == 0:
+        return
+
+    with rateLimitLock:
+        if apiKey not in rateLimits:
+            rateLimits[apiKey] = token_bucket(int(settings['api']['rate_limit_per_second']), int(settings['api']['rate_limit_burst']))
+
+        bucket = rateLimits[apiKey]
+
+    retryAfter = bucket.take()
+
+    if retryAfter > 0:
+        raise HTTPThrottledResponse(retry_after=max(1, math.ceil(retryAfter)))
+
 
 def parseURL(path):
 
@@ -111,16 +213,114 @@ def parseURL(path):
 
 def parseBody(requestHandler):
 
-    #Ensure the data is JSON
-    if requestHandler.headers.get('Content-Type') != "application/json":
-        raise HTTPErrorResponse(status=415, message="Unexpected Content-Type; Send application/json")
+    #Ensure the data is JSON, CBOR or MessagePack
+    contentType = str(requestHandler.headers.get('Content-Type')).split(";")[0].strip().lower()
+
+    if contentType not in ["application/json", binary_codec.CBOR_CONTENT_TYPE, binary_codec.MSGPACK_CONTENT_TYPE, "application/x-msgpack", "application/vnd.msgpack"]:
+        raise HTTPErrorResponse(status=415, message="Unexpected Content-Type; Send application/json, application/cbor or application/msgpack")
 
     content_len = int(requestHandler.headers.get('Content-Length'))
-    return json.loads(requestHandler.rfile.read(content_len))
+    data = requestHandler.rfile.read(content_len)
+
+    if contentType == "application/json":
+        return json.loads(data)
+
+    try:
+        if contentType == binary_codec.CBOR_CONTENT_TYPE:
+            return binary_codec.cbor_loads(data)
+
+        return binary_codec.msgpack_loads(data)
+
+    except Exception:
+        raise HTTPErrorResponse(status=400, message="Unable to decode the request body as " + contentType)
+
+
+def parsePaging(requestHandler, cursorLength):
+
+    #Optional keyset pagination; when no limit is supplied the full result set is returned
+    queryString = parse.parse_qs(parse.urlsplit(requestHandler.path).query)
+    limit = None
+    cursor = None
+
+    if "limit" in queryString:
+        if len(queryString['limit']) != 1 or queryString['limit'][0].isnumeric() != True:
+            raise HTTPErrorResponse(status=400, message="Parameter 'limit' must be a single positive integer")
+
+        limit = int(queryString['limit'][0])
+
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise HTTPErrorResponse(status=400, message="Parameter 'limit' must be between 1 and " + str(MAX_PAGE_LIMIT))
+
+    if "cursor" in queryString:
+        if len(queryString['cursor']) != 1:
+            raise HTTPErrorResponse(status=400, message="Exactly 1 cursor must be supplied")
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(queryString['cursor'][0].encode("ascii")))
+        except Exception:
+            raise HTTPErrorResponse(status=400, message="Parameter 'cursor' is invalid")
+
+        if isinstance(cursor, list) == False or len(cursor) != cursorLength:
+            raise HTTPErrorResponse(status=400, message="Parameter 'cursor' is invalid")
+
+    return limit, cursor
+
+
+def encodeCursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf8")).decode("ascii")
+
+
+def pagingHeaders(nextCursor):
+
+    tmpHeaders = []
+
+    if nextCursor is None:
+        return tmpHeaders
+
+    tmpHeader = {}
+    tmpHeader['key'] = "X-Next-Cursor"
+    tmpHeader['value'] = nextCursor
+    tmpHeaders.append(tmpHeader)
+
+    tmpHeader = {}
+    tmpHeader['key'] = "Access-Control-Expose-Headers"
+    tmpHeader['value'] = "X-Next-Cursor"
+    tmpHeaders.append(tmpHeader)
+
+    return tmpHeaders
+
+
+def registration_search_get(requestHandler):
+
+    #Parse the query string
+    queryString = parse.parse_qs(parse.urlsplit(requestHandler.path).query)
+    limit = 20
+
+    if "prefix" not in queryString or len(queryString['prefix']) != 1 or queryString['prefix'][0].strip() == "":
+        raise HTTPErrorResponse(status=400, message="Exactly 1 prefix must be supplied")
+
+    if "limit" in queryString:
+        if len(queryString['limit']) != 1 or queryString['limit'][0].isnumeric() != True:
+            raise HTTPErrorResponse(status=400, message="Parameter 'limit' must be a single positive integer")
+
+        limit = int(queryString['limit'][0])
+
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise HTTPErrorResponse(status=400, message="Parameter 'limit' must be between 1 and " + str(MAX_PAGE_LIMIT))
+
+    if registrationIndex.loaded == False:
+        responseHandler(requestHandler, 503, headers=[{'key': "Retry-After", 'value': "30"}], body={"error": "Registration index is loading"})
+        return
+
+    responseHandler(requestHandler, 200, body=registrationIndex.search(queryString['prefix'][0], limit))
 
 
 def registration_get(requestHandler, urlPath):
 
+    if len(urlPath) == 2 and urlPath[1] == "search":
+        registration_search_get(requestHandler)
+        return
+
     if len(urlPath) < 3:
         raise HTTPErrorResponse(status=400, message="Parameter type (icao_hex|registration) and value is required")
 
@@ -147,8 +347,16 @@ def registration_get(requestHandler, urlPath):
 
     getResult = tmpRegistration.get()
 
+    heavyHitters.record(urlPath[1], urlPath[2].upper(), miss=(getResult['status'] == ENUM_RESULT.NOT_FOUND))
+
     #Ensure we have a result
     if getResult['status'] == ENUM_RESULT.SUCCESS:
+
+        #Compressed documents go to the client untouched when it accepts deflate and wants JSON
+        if "deflate" in getResult and acceptsDeflate(requestHandler) and negotiateContentType(requestHandler) == "application/json":
+            responseHandler(requestHandler, 200, body=getResult['deflate'], contentEncoding="deflate")
+            return
+
         responseHandler(requestHandler, 200, body=getResult['data'])
         return
 
@@ -206,6 +414,8 @@ def operator_get(requestHandler, urlPath):
 
     getResult = tmpOperator.get()
 
+    heavyHitters.record("operator", tmpOperator.airline_designator.upper(), miss=(getResult == ENUM_RESULT.NOT_FOUND))
+
     #Ensure we have a result
     if getResult == ENUM_RESULT.SUCCESS:
         responseHandler(requestHandler, 200, body=tmpOperator.toDict())
@@ -358,13 +568,18 @@ def operator_delete(requestHandler, urlPath):
 
 def operator_unknown_get(requestHandler, urlPath):
 
+    limit, cursor = parsePaging(requestHandler, 2)
+
+    if cursor is not None and (isinstance(cursor[0], int) == False or isinstance(cursor[1], str) == False):
+        raise HTTPErrorResponse(status=400, message="Parameter 'cursor' is invalid")
+
     tmpUnknown = operator_unknown()
 
-    getResult = tmpUnknown.get()
+    getResult = tmpUnknown.get(limit=limit, cursor=cursor)
 
     #Ensure we have a result
     if getResult == ENUM_RESULT.SUCCESS:
-        responseHandler(requestHandler, 200, body=tmpUnknown.operators())
+        responseHandler(requestHandler, 200, headers=pagingHeaders(tmpUnknown.next_cursor), body=tmpUnknown.operators())
         return
 
     if getResult == ENUM_RESULT.NOT_FOUND:
@@ -429,6 +644,8 @@ def flight_info_get(requestHandler, urlPath):
     tmpFlightInfo = flight_info(urlPath[1], focus_airport_icao_code=airport_icao)
 
     getResult = tmpFlightInfo.get()
+
+    heavyHitters.record("flight", urlPath[1].upper(), miss=(getResult == ENUM_RESULT.NOT_FOUND))
     
     #Ensure we have a result
     if getResult == ENUM_RESULT.SUCCESS:
@@ -552,13 +769,21 @@ def flight_info_delete(requestHandler, urlPath):
 
 def flight_info_conflicts_get(requestHandler):
 
+    limit, cursor = parsePaging(requestHandler, 3)
+
+    if cursor is not None:
+        try:
+            cursor = [str(cursor[0]), datetime.fromisoformat(cursor[1]), int(cursor[2])]
+        except Exception:
+            raise HTTPErrorResponse(status=400, message="Parameter 'cursor' is invalid")
+
     tmpFlightInfo = flight_info(None)
 
-    getResult = tmpFlightInfo.get_conflicts()
+    getResult = tmpFlightInfo.get_conflicts(limit=limit, cursor=cursor)
     
     #Ensure we have a result
     if getResult == ENUM_RESULT.SUCCESS:
-        responseHandler(requestHandler, 200, body=tmpFlightInfo.conflicts())
+        responseHandler(requestHandler, 200, headers=pagingHeaders(tmpFlightInfo.next_cursor), body=tmpFlightInfo.conflicts())
         return
 
     if getResult == ENUM_RESULT.NOT_FOUND:
@@ -574,6 +799,66 @@ def flight_info_conflicts_get(requestHandler):
     raise HTTPErrorResponse()
 
 
+def admin_top_keys_get(requestHandler):
+
+    #Parse the query string
+    queryString = parse.parse_qs(parse.urlsplit(requestHandler.path).query)
+    kind = None
+    limit = 100
+
+    if "kind" in queryString:
+        if len(queryString['kind']) != 1 or queryString['kind'][0] not in HEAVY_HITTER_KINDS:
+            raise HTTPErrorResponse(status=400, message="Parameter 'kind' must be one of " + ", ".join(HEAVY_HITTER_KINDS))
+
+        kind = queryString['kind'][0]
+
+    if "limit" in queryString:
+        if len(queryString['limit']) != 1 or queryString['limit'][0].isnumeric() != True or int(queryString['limit'][0]) < 1:
+            raise HTTPErrorResponse(status=400, message="Parameter 'limit' must be a single positive integer")
+
+        limit = int(queryString['limit'][0])
+
+    responseHandler(requestHandler, 200, body=heavyHitters.toDict(kind=kind, limit=limit))
+
+
+def airport_get(requestHandler, urlPath):
+
+    #/airport/{icao|iata}/{code}
+
+    if len(urlPath) < 3:
+        raise HTTPErrorResponse(status=400, message="Parameter type (icao|iata) and code is required")
+
+    if urlPath[1] not in ['icao', 'iata']:
+        raise HTTPErrorResponse(status=400, message="Parameter type (icao or iata) is required")
+
+    if len(urlPath[2]) == 0:
+        raise HTTPErrorResponse(status=400, message="Search criteria is required")
+
+    if urlPath[1] == "icao":
+        getResult = airportIndex.get(icao_code=urlPath[2])
+
+    if urlPath[1] == "iata":
+        getResult = airportIndex.get(iata_code=urlPath[2])
+
+    #Ensure we have a result
+    if getResult['status'] == ENUM_RESULT.SUCCESS:
+        responseHandler(requestHandler, 200, body=getResult['data'])
+        return
+
+    if getResult['status'] == ENUM_RESULT.NOT_FOUND:
+        responseHandler(requestHandler, 404)
+        return
+
+    if getResult['status'] == ENUM_RESULT.INVALID_REQUEST:
+        raise HTTPErrorResponse(status=400, message=getResult['message'])
+
+    if getResult['status'] == ENUM_RESULT.UNEXPECTED_RESULT:
+        raise HTTPErrorResponse(status=409, message=getResult['message'])
+
+    #Default to a 500
+    raise HTTPErrorResponse()
+
+
 class sigKill(Exception):
     pass
 
@@ -613,6 +898,9 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
         except HTTPUnauthorizedResponse as ex:
             responseHandler(self, ex.status)
 
+        except HTTPThrottledResponse as ex:
+            responseHandler(self, ex.status, headers=[{'key': "Retry-After", 'value': str(ex.retry_after)}], body={"error": "Too many requests"})
+
         except Exception as ex:
             logger.error({"exception": ex})
             responseHandler(self, 500, body={"error": "Unknown Error"})
@@ -648,6 +936,9 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
         except HTTPUnauthorizedResponse as ex:
             responseHandler(self, ex.status)
 
+        except HTTPThrottledResponse as ex:
+            responseHandler(self, ex.status, headers=[{'key': "Retry-After", 'value': str(ex.retry_after)}], body={"error": "Too many requests"})
+
         except Exception as ex:
             logger.error({"exception": ex})
             responseHandler(self, 500, body={"error": "Unknown Error"})
@@ -685,6 +976,9 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
         except HTTPUnauthorizedResponse as ex:
             responseHandler(self, ex.status)
 
+        except HTTPThrottledResponse as ex:
+            responseHandler(self, ex.status, headers=[{'key': "Retry-After", 'value': str(ex.retry_after)}], body={"error": "Too many requests"})
+
         except Exception as ex:
             logger.error({"exception": ex})
             responseHandler(self, 500, body={"error": "Unknown Error"})
@@ -743,6 +1037,14 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
                 flight_info_conflicts_get(self)
                 return
 
+            if urlPath[0] == "airport":
+                airport_get(self, urlPath)
+                return
+
+            if urlPath[0] == "admin" and len(urlPath) > 1 and urlPath[1] == "top_keys":
+                admin_top_keys_get(self)
+                return
+
             #All other requests get 404
             responseHandler(self, 404)
 
@@ -752,6 +1054,9 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
         except HTTPUnauthorizedResponse as ex:
             responseHandler(self, ex.status)
 
+        except HTTPThrottledResponse as ex:
+            responseHandler(self, ex.status, headers=[{'key': "Retry-After", 'value': str(ex.retry_after)}], body={"error": "Too many requests"})
+
         except Exception as ex:
             logger.error({"exception": ex})
             responseHandler(self, 500, body={"error": "Unknown Error"})
@@ -835,6 +1140,42 @@ class HTTPUnauthorizedResponse(Exception):
         super().__init__(self.status)
 
 
+class HTTPThrottledResponse(Exception):
+
+    #Custom rate limited message wrapper
+
+    def __init__(self, retry_after, status=429):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(self.status, self.retry_after)
+
+
+class token_bucket():
+
+    #Classic token bucket; refills at rate tokens per second up to burst tokens
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+
+        #Returns 0 when a token was taken, otherwise the number of seconds until one is available
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens = self.tokens - 1
+                return 0
+
+            return (1 - self.tokens) / self.rate
+
+
 class flight_info():
 
     def __init__(self, ident, focus_airport_icao_code = None):
@@ -850,6 +1191,7 @@ class flight_info():
         self.focus_airport_icao_code = focus_airport_icao_code
         self.ident = ident
         self._conflicts = []
+        self.next_cursor = None
 
     class conflict():
 
@@ -865,6 +1207,18 @@ class flight_info():
 
     def get(self):
 
+        cacheKey = (str(self.ident).strip().upper(), None)
+
+        if self.focus_airport_icao_code is not None:
+            cacheKey = (cacheKey[0], str(self.focus_airport_icao_code).strip().upper())
+
+        keyHistory.record("flight", list(cacheKey))
+
+        cached = flightCache.get(cacheKey)
+
+        if cached is not None:
+            return self.apply_cached(cached)
+
         operatorsDb = mysql.connector.connect(
             host=settings['mySQL']['uri'],
             user=settings['mySQL']['username'],
@@ -877,30 +1231,18 @@ class flight_info():
                 "flight_numbers.airline_designator, "\
                 "flight_numbers.flight_number, "\
                 "flight_numbers.expires, "\
-                "origin_airport.icao_code AS origin_airport_icao_code, "\
-                "origin_airport.name AS origin_airport_name, "\
-                "origin_airport.city AS origin_airport_city, "\
-                "origin_airport.region AS origin_airport_region, "\
-                "origin_airport.country AS origin_airport_country, "\
-                "origin_airport.phonic AS origin_airport_phonic, "\
-                "destination_airport.icao_code AS destination_airport_icao_code, "\
-                "destination_airport.name AS destination_airport_name, "\
-                "destination_airport.city AS destination_airport_city, "\
-                "destination_airport.region AS destination_airport_region, "\
-                "destination_airport.country AS destination_airport_country, "\
-                "destination_airport.phonic AS destination_airport_phonic, "\
+                "flight_numbers.origin, "\
+                "flight_numbers.destination, "\
                 "flight_numbers.hash, "\
                 "sources.agency AS source "\
             "FROM flight_numbers "\
-            "LEFT OUTER JOIN airports AS origin_airport ON origin_airport.icao_code = flight_numbers.origin "\
-            "LEFT OUTER JOIN airports AS destination_airport ON destination_airport.icao_code = flight_numbers.destination "\
             "LEFT OUTER JOIN sources ON sources.unique_id = flight_numbers.source "\
             "WHERE "\
                 "flight_numbers.expires >= now() AND "\
                 "flight_numbers.ident='" + self.ident + "'"
 
         if self.focus_airport_icao_code is not None:
-            sqlQuery = sqlQuery + " AND (origin_airport.icao_code = '" + self.focus_airport_icao_code + "' OR destination_airport.icao_code = '" + self.focus_airport_icao_code + "')"
+            sqlQuery = sqlQuery + " AND (flight_numbers.origin = '" + self.focus_airport_icao_code + "' OR flight_numbers.destination = '" + self.focus_airport_icao_code + "')"
 
         mysqlCur.execute(sqlQuery)
 
@@ -911,26 +1253,16 @@ class flight_info():
 
         #Ensure we have have exactly 1 row
         if len(result) == 1:
-            self.airline_designator = result[0]['airline_designator']
-            self.flight_number = result[0]['flight_number']
-            self.expires = result[0]['expires']
-            self.origin['icao_code'] = result[0]['origin_airport_icao_code']
-            self.origin['name'] = result[0]['origin_airport_name']
-            self.origin['city'] = result[0]['origin_airport_city']
-            self.origin['region'] = result[0]['origin_airport_region']
-            self.origin['country'] = result[0]['origin_airport_country']
-            self.origin['phonic'] = result[0]['origin_airport_phonic']
-            self.destination['icao_code'] = result[0]['destination_airport_icao_code']
-            self.destination['name'] = result[0]['destination_airport_name']
-            self.destination['city'] = result[0]['destination_airport_city']
-            self.destination['region'] = result[0]['destination_airport_region']
-            self.destination['country'] = result[0]['destination_airport_country']
-            self.destination['phonic'] = result[0]['destination_airport_phonic']
-            self.source = result[0]['source']
-            self.hash = result[0]['hash']
-            return ENUM_RESULT.SUCCESS
+
+            #The cached entry never outlives the row's own expiration
+            cached = dict(result[0])
+            cached['status'] = ENUM_RESULT.SUCCESS
+            flightCache.set(cacheKey, cached, expires=result[0]['expires'].timestamp(), group=cacheKey[0])
+
+            return self.apply_cached(cached)
 
         if len(result) == 0:
+            flightCache.set(cacheKey, {"status" : ENUM_RESULT.NOT_FOUND}, group=cacheKey[0])
             return ENUM_RESULT.NOT_FOUND
 
         if len(result) > 1:
@@ -940,6 +1272,21 @@ class flight_info():
         #Return unknown failure
         return {"status" : ENUM_RESULT.UNKNOWN_FAILURE}
 
+    def apply_cached(self, cached):
+
+        if cached['status'] != ENUM_RESULT.SUCCESS:
+            return cached['status']
+
+        self.airline_designator = cached['airline_designator']
+        self.flight_number = cached['flight_number']
+        self.expires = cached['expires']
+        self.origin = airportIndex.enrich(cached['origin'])
+        self.destination = airportIndex.enrich(cached['destination'])
+        self.source = cached['source']
+        self.hash = cached['hash']
+
+        return ENUM_RESULT.SUCCESS
+
     def post(self):
 
         try:
@@ -1000,6 +1347,9 @@ class flight_info():
                                     SELECT agency FROM sources WHERE agency = '" + self.source + "' \
                                 ) LIMIT 1;")
             
+            #The same flight stored under another hash scheme takes this hash, so it is updated below rather than duplicated
+            mysqlCur.execute("UPDATE IGNORE flight_numbers SET hash = %s WHERE ident = %s AND airline_designator = %s AND flight_number = %s AND origin = %s AND destination = %s AND hash <> %s;", (self.hash, self.ident, self.airline_designator, self.flight_number, self.origin['icao_code'], self.destination['icao_code'], self.hash))
+
             #Insert the data
             mysqlCur.execute("INSERT INTO flight_numbers (airline_designator, flight_number, ident, origin, destination, expires, hash, source) \
                                 (SELECT '" + self.airline_designator + "','" + self.flight_number + "','" + self.ident + "','" + self.origin['icao_code'] + "','" + self.destination['icao_code'] + "','" + self.expires.strftime('%Y-%m-%d %H:%M:%S') + "','" + self.hash + "', sources.unique_id FROM sources \
@@ -1012,11 +1362,16 @@ class flight_info():
                     returnValue = {"status" : ENUM_RESULT.SUCCESS_NOT_MODIFIED, "message" : "Resource exists and was not updated"}
                 if mysqlCur.rowcount < 0:
                     returnValue = {"status" : ENUM_RESULT.UNEXPECTED_RESULT, "message" : "Unexpected row count"}
+
+            #Keep the materialised conflicts in step with this ident
+            self.refresh_conflicts(mysqlCur)
                 
             operatorsDb.commit()
             mysqlCur.close()
             operatorsDb.close()
 
+            flightCache.invalidate_group(self.ident)
+
             logger.info("POST flight numbers ident " + self.ident + " hash " + self.hash)
 
             return returnValue
@@ -1050,16 +1405,23 @@ class flight_info():
             #Insert the data
             mysqlCur.execute("UPDATE flight_numbers SET expires = now() WHERE ident = '" + self.ident + "' AND origin = '" + self.origin['icao_code'] + "' AND destination = '" + self.destination['icao_code'] + "' AND expires > now()")
 
-            if mysqlCur.rowcount > 0:
+            rowCount = mysqlCur.rowcount
+
+            if rowCount > 0:
                 returnValue = {"status" : ENUM_RESULT.SUCCESS}
             else:
                 returnValue = {"status" : ENUM_RESULT.NOT_FOUND, "message" : "Resource not found"}
+
+            #Keep the materialised conflicts in step with this ident
+            self.refresh_conflicts(mysqlCur)
                 
             operatorsDb.commit()
             mysqlCur.close()
             operatorsDb.close()
 
-            logger.info("DELETE flight " + self.ident + " (" + str(mysqlCur.rowcount) + ")")
+            flightCache.invalidate_group(self.ident.strip().upper())
+
+            logger.info("DELETE flight " + self.ident + " (" + str(rowCount) + ")")
 
             return returnValue
 
@@ -1070,7 +1432,7 @@ class flight_info():
     def conflicts(self):
         return [ob.__dict__ for ob in self._conflicts]
 
-    def get_conflicts(self):
+    def get_conflicts(self, limit=None, cursor=None):
 
         flightInfoDb = mysql.connector.connect(
             host=settings['mySQL']['uri'],
@@ -1080,44 +1442,45 @@ class flight_info():
 
         mysqlCur = flightInfoDb.cursor(dictionary=True)
 
-        sqlQuery = "SELECT flight_numbers.ident, " \
+        #flight_conflicts is maintained incrementally by post, delete, the FlightAware importer and expire_conflicts
+        sqlQuery = "SELECT flight_conflicts.flight_number_id, " \
+                        "flight_numbers.ident, " \
                         "flight_numbers.airline_designator, "\
                         "flight_numbers.flight_number, "\
                         "flight_numbers.expires, "\
-                        "origin_airport.icao_code AS origin_airport_icao_code, "\
-                        "origin_airport.name AS origin_airport_name, "\
-                        "origin_airport.city AS origin_airport_city, "\
-                        "origin_airport.region AS origin_airport_region, "\
-                        "origin_airport.country AS origin_airport_country, "\
-                        "origin_airport.phonic AS origin_airport_phonic, "\
-                        "destination_airport.icao_code AS destination_airport_icao_code, "\
-                        "destination_airport.name AS destination_airport_name, "\
-                        "destination_airport.city AS destination_airport_city, "\
-                        "destination_airport.region AS destination_airport_region, "\
-                        "destination_airport.country AS destination_airport_country, "\
-                        "destination_airport.phonic AS destination_airport_phonic, "\
+                        "flight_numbers.origin, "\
+                        "flight_numbers.destination, "\
                         "flight_numbers.hash, "\
                         "sources.agency AS source "\
-                    "FROM flight_numbers " \
-                    "LEFT OUTER JOIN airports AS origin_airport ON origin_airport.icao_code = flight_numbers.origin " \
-                    "LEFT OUTER JOIN airports AS destination_airport ON destination_airport.icao_code = flight_numbers.destination " \
+                    "FROM flight_conflicts " \
+                    "INNER JOIN flight_numbers ON flight_numbers.unique_id = flight_conflicts.flight_number_id " \
                     "LEFT OUTER JOIN sources ON sources.unique_id = flight_numbers.source " \
-                    "WHERE flight_numbers.ident IN " \
-                            "(SELECT ident " \
-                                "FROM flight_numbers " \
-                                "WHERE expires > now() " \
-                                "GROUP BY ident " \
-                                "HAVING count(ident) > 1)  " \
-                        "AND flight_numbers.expires > now() " \
-                        "ORDER BY flight_numbers.ident, flight_numbers.expires;"
+                    "WHERE flight_conflicts.expires > now() "
+        parameters = ()
 
-        mysqlCur.execute(sqlQuery)
+        #Keyset pagination on the ident_expires index, which carries flight_number_id as its tie breaker
+        if cursor is not None:
+            sqlQuery = sqlQuery + "AND (flight_conflicts.ident, flight_conflicts.expires, flight_conflicts.flight_number_id) > (%s, %s, %s) "
+            parameters = parameters + (cursor[0], cursor[1], cursor[2], )
+
+        sqlQuery = sqlQuery + "ORDER BY flight_conflicts.ident, flight_conflicts.expires, flight_conflicts.flight_number_id"
+
+        #Read one extra row to learn if another page exists
+        if limit is not None:
+            sqlQuery = sqlQuery + " LIMIT %s"
+            parameters = parameters + (limit + 1, )
+
+        mysqlCur.execute(sqlQuery + ";", parameters)
 
         result = mysqlCur.fetchall()
 
         mysqlCur.close()
         flightInfoDb.close()
 
+        if limit is not None and len(result) > limit:
+            result = result[:limit]
+            self.next_cursor = encodeCursor([result[-1]['ident'], result[-1]['expires'].isoformat(), result[-1]['flight_number_id']])
+
         if len(result) > 0:
 
             for entry in result:
@@ -1127,18 +1490,8 @@ class flight_info():
                 tmpConflict.flight_number = entry['flight_number']
                 tmpConflict.expires = entry['expires'].isoformat()
                 tmpConflict.source = entry['source']
-                tmpConflict.origin['icao_code'] = entry['origin_airport_icao_code']
-                tmpConflict.origin['name'] = entry['origin_airport_name']
-                tmpConflict.origin['city'] = entry['origin_airport_city']
-                tmpConflict.origin['region'] = entry['origin_airport_region']
-                tmpConflict.origin['country'] = entry['origin_airport_country']
-                tmpConflict.origin['phonic'] = entry['origin_airport_phonic']
-                tmpConflict.destination['icao_code'] = entry['destination_airport_icao_code']
-                tmpConflict.destination['name'] = entry['destination_airport_name']
-                tmpConflict.destination['city'] = entry['destination_airport_city']
-                tmpConflict.destination['region'] = entry['destination_airport_region']
-                tmpConflict.destination['country'] = entry['destination_airport_country']
-                tmpConflict.destination['phonic'] = entry['destination_airport_phonic']
+                tmpConflict.origin = airportIndex.enrich(entry['origin'])
+                tmpConflict.destination = airportIndex.enrich(entry['destination'])
                 self._conflicts.append(tmpConflict)
 
             return ENUM_RESULT.SUCCESS
@@ -1148,6 +1501,44 @@ class flight_info():
             
         #Return unknown failure
         return {"status" : ENUM_RESULT.UNKNOWN_FAILURE}
+
+    def refresh_conflicts(self, mysqlCur):
+
+        #Rebuild the flight_conflicts rows for this ident only; the caller is responsible for committing
+        mysqlCur.execute("DELETE FROM flight_conflicts WHERE ident = %s", (self.ident, ))
+
+        mysqlCur.execute("INSERT INTO flight_conflicts (flight_number_id, ident, expires) \
+                            SELECT unique_id, ident, expires FROM flight_numbers \
+                            WHERE ident = %s AND expires > now() \
+                            AND (SELECT count(*) FROM flight_numbers AS live WHERE live.ident = %s AND live.expires > now()) > 1;", (self.ident, self.ident, ))
+
+    @staticmethod
+    def expire_conflicts():
+
+        flightInfoDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = flightInfoDb.cursor()
+
+        #Drop entries that have passed their expiration
+        mysqlCur.execute("DELETE FROM flight_conflicts WHERE expires <= now();")
+        expiredCount = mysqlCur.rowcount
+
+        #Any ident left with a single live entry is no longer a conflict
+        mysqlCur.execute("DELETE flight_conflicts FROM flight_conflicts \
+                            INNER JOIN (SELECT ident FROM flight_conflicts GROUP BY ident HAVING count(ident) < 2) AS resolved \
+                                ON resolved.ident = flight_conflicts.ident;")
+        resolvedCount = mysqlCur.rowcount
+
+        flightInfoDb.commit()
+        mysqlCur.close()
+        flightInfoDb.close()
+
+        if expiredCount > 0 or resolvedCount > 0:
+            logger.debug("Expired " + str(expiredCount) + " and resolved " + str(resolvedCount) + " flight conflict entries.")
     
     def toDict(self):
 
@@ -1170,112 +1561,899 @@ class flight_info():
         tmpObj['origin'] = self.origin['icao_code']
         tmpObj['destination'] = self.destination['icao_code']
 
-        self.hash = hashlib.md5(json.dumps(tmpObj).encode('utf-8')).hexdigest()
+        self.hash = canonical_json.encode(tmpObj, settings['hash_scheme'])[1]
 
 
-class registration():
+class expiring_cache():
 
-    def __init__(self, icao_hex = None, registration = None, data_type = "simple"):
-        self.icao_hex = ""
-        self.registration = ""
+    #Thread safe cache where each entry carries its own expiration, capped at max_ttl seconds.  A heap ordered by
+    #  expiration lets evict() drop stale entries proactively instead of waiting for them to be read again.
 
-        if icao_hex:
-            self.icao_hex = icao_hex
-        
-        if registration:
-            self.registration = registration
+    def __init__(self, max_ttl, max_entries):
+        self.max_ttl = max_ttl
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = {}
+        self._groups = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
 
-        if data_type is None:
-            data_type = "simple"
+    def get(self, key):
 
-        self.data_type = data_type
+        with self._lock:
+            entry = self._entries.get(key)
 
-        if self.data_type not in ['simple', 'detailed']:
-            raise Exception("Unknown registration data type " + self.registration)    
+            if entry is None:
+                return None
 
-    def get(self):
+            if entry[0] <= time.time():
+                self._remove(key)
+                return None
 
-        operatorsDb = mysql.connector.connect(
-            host=settings['mySQL']['uri'],
-            user=settings['mySQL']['username'],
-            password=settings['mySQL']['password'],
-            database=settings['mySQL']['database'])
+            return entry[1]
 
-        mysqlCur = operatorsDb.cursor(dictionary=True)
+    def set(self, key, value, expires=None, group=None):
 
-        #Set the table name based on the data type
-        if self.data_type == "simple":
-            table_name = "simple"
-        else:
-            table_name = "registrations"
+        now = time.time()
 
-        if self.registration == "" and self.icao_hex == "":
-            return {"status" : ENUM_RESULT.INVALID_REQUEST, "message" : "registration or icao_hex must be specified"}
+        if expires is None or expires > now + self.max_ttl:
+            expires = now + self.max_ttl
 
-        if self.registration !="":
-            mysqlCur.execute("SELECT " + table_name + ".data, sources.agency FROM " + table_name + " "\
-                "INNER JOIN sources ON " + table_name + ".source = sources.unique_id " \
-                "WHERE registration = '" + self.registration + "' AND " + table_name + ".deleted is null;")
+        if expires <= now:
+            return
 
-        if self.icao_hex != "":
-            mysqlCur.execute("SELECT " + table_name + ".data, sources.agency FROM " + table_name + " "\
-                "INNER JOIN sources ON " + table_name + ".source = sources.unique_id " \
-                "WHERE icao_hex = '" + self.icao_hex + "' AND " + table_name + ".deleted is null;")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
 
-        result = mysqlCur.fetchall()
+            #The sequence breaks ties between keys expiring at the same moment, so keys of different types are never compared.
+            #  Pushing first keeps a failed push from leaving an entry that the heap and its group do not know about.
+            sequence = next(self._counter)
+            heapq.heappush(self._heap, (expires, sequence, key))
+            self._entries[key] = (expires, value, group, sequence)
 
-        mysqlCur.close()
-        operatorsDb.close()
+            if group is not None:
+                self._groups.setdefault(group, set()).add(key)
 
-        #Ensure we have have exactly 1 row
-        if len(result) == 1:
-            return {"status" : ENUM_RESULT.SUCCESS, "data" : json.loads(result[0]['data'])}
+            self._evict(now)
 
-        if len(result) == 0:
-            return {"status" : ENUM_RESULT.NOT_FOUND}
+            #Over capacity, drop the entries closest to expiring first
+            while len(self._entries) > self.max_entries and len(self._heap) > 0:
+                entryExpires, entrySequence, entryKey = heapq.heappop(self._heap)
+                entry = self._entries.get(entryKey)
 
-        if len(result) > 1:
-            logger.warning("Retrieved " + str(len(result)) + " records from MySQL when querying " + json.dumps(self.__dict__, default=str) + ".  Expected 0 or 1.")
-            return {"status" : ENUM_RESULT.UNEXPECTED_RESULT, "message" : "Unexpected number of records returned " + str(len(result))}
-            
-        #Return unknown failure
-        return {"status" : ENUM_RESULT.UNKNOWN_FAILURE}
+                if entry is not None and entry[3] == entrySequence:
+                    self._remove(entryKey)
 
+    def invalidate_group(self, group):
 
-class operator_unknown():
+        with self._lock:
+            for key in list(self._groups.get(group, [])):
+                self._remove(key)
 
-    def __init__(self):
-        self.airline_designator = ""
-        self._operators = []
+    def clear(self):
 
-    class operator():
+        with self._lock:
+            self._entries = {}
+            self._groups = {}
+            self._heap = []
 
-        def __init__(self, airline_designator, count):
-            self.airline_designator = str(airline_designator).strip().upper()
-            self.count = count
+    def evict(self):
 
-    def operators(self):
-        return [ob.__dict__ for ob in self._operators]
+        with self._lock:
+            return self._evict(time.time())
 
-    def get(self):
+    def _evict(self, now):
 
-        operatorsDb = mysql.connector.connect(
-            host=settings['mySQL']['uri'],
-            user=settings['mySQL']['username'],
-            password=settings['mySQL']['password'],
-            database=settings['mySQL']['database'])
+        evicted = 0
 
-        mysqlCur = operatorsDb.cursor(dictionary=True)
+        while len(self._heap) > 0 and self._heap[0][0] <= now:
+            entryExpires, entrySequence, entryKey = heapq.heappop(self._heap)
+            entry = self._entries.get(entryKey)
 
-        sqlQuery = "SELECT airline_designator, count FROM operators_unknown WHERE deleted IS NULL ORDER BY count DESC, airline_designator;"
+            #Skip heap records left behind when the key was replaced or removed
+            if entry is not None and entry[3] == entrySequence:
+                self._remove(entryKey)
+                evicted = evicted + 1
 
-        mysqlCur.execute(sqlQuery)
+        return evicted
 
-        result = mysqlCur.fetchall()
+    def _remove(self, key):
 
-        mysqlCur.close()
+        entry = self._entries.pop(key, None)
+
+        if entry is None or entry[2] is None:
+            return
+
+        groupKeys = self._groups.get(entry[2])
+
+        if groupKeys is not None:
+            groupKeys.discard(key)
+
+            if len(groupKeys) == 0:
+                del self._groups[entry[2]]
+
+
+class counter_bucket():
+
+    #The keys that share a count, linked to the buckets with the next smaller and larger counts
+
+    def __init__(self, count):
+        self.count = count
+        self.keys = {}
+        self.previous = None
+        self.next = None
+
+
+class stream_summary():
+
+    #Space-Saving counters for one kind of key, kept as a Stream-Summary: buckets of keys with equal counts in a list ordered by
+    #  count, so both counting a key and evicting the smallest counter take constant time however many keys are tracked
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total = 0
+        self.entries = {}
+        self.smallest = None
+
+    def record(self, key, miss=False):
+
+        self.total = self.total + 1
+
+        #Each entry is [bucket, error, misses]
+        entry = self.entries.get(key)
+
+        if entry is None:
+            if len(self.entries) < self.capacity:
+                entry = [None, 0, 0]
+            else:
+                #Replace a key with the smallest count; the newcomer inherits its count as the error bound
+                bucket = self.smallest
+                evictedKey = next(iter(bucket.keys))
+                del bucket.keys[evictedKey]
+                del self.entries[evictedKey]
+                entry = [bucket, bucket.count, 0]
+
+            self.entries[key] = entry
+        else:
+            del entry[0].keys[key]
+
+        self.increment(key, entry)
+
+        if miss == True:
+            entry[2] = entry[2] + 1
+
+    def increment(self, key, entry):
+
+        #Move the key, already removed from its bucket, to the bucket one count higher
+        bucket = entry[0]
+
+        if bucket is None:
+            count = 1
+            following = self.smallest
+        else:
+            count = bucket.count + 1
+            following = bucket.next
+
+        if following is None or following.count != count:
+            newBucket = counter_bucket(count)
+            newBucket.previous = bucket
+            newBucket.next = following
+
+            if following is not None:
+                following.previous = newBucket
+
+            if bucket is None:
+                self.smallest = newBucket
+            else:
+                bucket.next = newBucket
+
+            following = newBucket
+
+        following.keys[key] = None
+        entry[0] = following
+
+        #Unlink the old bucket once its last key has moved on; it always has a following bucket at this point
+        if bucket is not None and len(bucket.keys) == 0:
+            if bucket.previous is None:
+                self.smallest = bucket.next
+            else:
+                bucket.previous.next = bucket.next
+
+            bucket.next.previous = bucket.previous
+
+    def top(self, limit):
+        return [(key, entry[0].count, entry[1], entry[2]) for key, entry in sorted(self.entries.items(), key=lambda item: item[1][0].count, reverse=True)[:limit]]
+
+
+class heavy_hitters():
+
+    #Space-Saving top-K counters, one set per kind of key.  Each counter may overestimate by at most its error, so
+    #  any key requested more than total / capacity times is guaranteed to be present.
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.since = datetime.now()
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, key, miss=False):
+
+        with self._lock:
+            summary = self._summaries.get(kind)
+
+            if summary is None:
+                summary = stream_summary(self.capacity)
+                self._summaries[kind] = summary
+
+            summary.record(key, miss)
+
+    def toDict(self, kind=None, limit=100):
+
+        returnValue = {"since" : self.since.isoformat(), "capacity" : self.capacity, "kinds" : {}}
+
+        with self._lock:
+            for counterKind, summary in self._summaries.items():
+                if kind is not None and counterKind != kind:
+                    continue
+
+                tmpKeys = []
+
+                for key, count, error, misses in summary.top(limit):
+                    tmpKeys.append({"key" : key, "count" : count, "error" : error, "misses" : misses})
+
+                returnValue['kinds'][counterKind] = {"total" : summary.total, "keys" : tmpKeys}
+
+        return returnValue
+
+
+class key_history():
+
+    #Remembers which keys are requested most often and most recently so the caches can be warmed after a restart
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, key):
+
+        historyKey = (kind, tuple(key))
+        now = time.time()
+
+        with self._lock:
+            entry = self._keys.get(historyKey)
+
+            if entry is None:
+                self._keys[historyKey] = [1, now]
+            else:
+                entry[0] = entry[0] + 1
+                entry[1] = now
+
+            #Trim in bulk so the sort is not repeated on every request
+            if len(self._keys) > self.max_entries * 2:
+                self._keys = dict(self._top(now))
+
+    def _top(self, now):
+
+        #Frequency decays with the age of the last request, measured in hours
+        return sorted(self._keys.items(), key=lambda item: item[1][0] / (1 + (now - item[1][1]) / 3600), reverse=True)[:self.max_entries]
+
+    def save(self, fileName):
+
+        with self._lock:
+            tmpEntries = []
+
+            for historyKey, entry in self._top(time.time()):
+                tmpEntries.append({"kind" : historyKey[0], "key" : list(historyKey[1]), "count" : entry[0], "last_seen" : entry[1]})
+
+        #Write to a temporary file first so a crash never leaves a partial history behind
+        with open(fileName + ".tmp", "w") as f:
+            json.dump(tmpEntries, f)
+
+        os.replace(fileName + ".tmp", fileName)
+
+    def load(self, fileName):
+
+        if os.path.exists(fileName) == False:
+            return []
+
+        with open(fileName, "r") as f:
+            tmpEntries = json.load(f)
+
+        with self._lock:
+            for entry in tmpEntries:
+                historyKey = (entry['kind'], tuple(entry['key']))
+
+                if historyKey not in self._keys:
+                    self._keys[historyKey] = [entry['count'], entry['last_seen']]
+
+        return tmpEntries
+
+
+class airport_index():
+
+    #In-memory copy of the airports table, reloaded whenever the OurAirports import bumps its dataset version
+
+    def __init__(self):
+        self._icao = {}
+        self._iata = {}
+        self.version = None
+
+    def load(self):
+
+        airportsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = airportsDb.cursor(dictionary=True)
+
+        #Read the version first so an import finishing mid-load is picked up on the next refresh
+        version = get_dataset_version(mysqlCur, "airports")
+
+        mysqlCur.execute("SELECT icao_code, iata_code, name, city, region, country, phonic FROM airports;")
+
+        result = mysqlCur.fetchall()
+
+        mysqlCur.close()
+        airportsDb.close()
+
+        tmpIcao = {}
+        tmpIata = {}
+
+        for entry in result:
+            tmpIcao[str(entry['icao_code']).upper()] = entry
+
+            if entry['iata_code'] is not None:
+                tmpIata.setdefault(str(entry['iata_code']).upper(), []).append(entry)
+
+        #Swap the new dictionaries in whole so readers never see a partial index
+        self._icao = tmpIcao
+        self._iata = tmpIata
+        self.version = version
+
+        logger.info("Loaded " + str(len(tmpIcao)) + " airports into the airport index.")
+
+    def refresh(self):
+
+        airportsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = airportsDb.cursor(dictionary=True)
+
+        version = get_dataset_version(mysqlCur, "airports")
+
+        mysqlCur.close()
+        airportsDb.close()
+
+        if version != self.version:
+            self.load()
+
+    def get(self, icao_code=None, iata_code=None):
+
+        if icao_code is not None:
+            entry = self._icao.get(str(icao_code).strip().upper())
+
+            if entry is None:
+                return {"status" : ENUM_RESULT.NOT_FOUND}
+
+            return {"status" : ENUM_RESULT.SUCCESS, "data" : dict(entry)}
+
+        if iata_code is not None:
+            entries = self._iata.get(str(iata_code).strip().upper(), [])
+
+            if len(entries) == 1:
+                return {"status" : ENUM_RESULT.SUCCESS, "data" : dict(entries[0])}
+
+            if len(entries) == 0:
+                return {"status" : ENUM_RESULT.NOT_FOUND}
+
+            logger.warning("Airport index holds " + str(len(entries)) + " airports for IATA code " + str(iata_code) + ".  Expected 0 or 1.")
+            return {"status" : ENUM_RESULT.UNEXPECTED_RESULT, "message" : "Unexpected number of records returned " + str(len(entries))}
+
+        return {"status" : ENUM_RESULT.INVALID_REQUEST, "message" : "icao_code or iata_code must be specified"}
+
+    def enrich(self, icao_code):
+
+        #Shape used for flight origin and destination; every field is None when the airport is unknown, as the previous LEFT JOIN returned
+        returnValue = {}
+        entry = None
+
+        if icao_code is not None:
+            entry = self._icao.get(str(icao_code).upper())
+
+        for key in ['icao_code', 'name', 'city', 'region', 'country', 'phonic']:
+            if entry is None:
+                returnValue[key] = None
+            else:
+                returnValue[key] = entry[key]
+
+        return returnValue
+
+
+class registration_index():
+
+    #Sorted in-memory copy of every registration and ICAO hex in the simple and registrations active tables, used for
+    #  prefix searches.  Registrations are kept in a sorted list of normalised strings; ICAO hex codes are kept as
+    #  24-bit integers in a sorted array, so a hex prefix becomes a numeric range.  Both are scanned with bisect.
+
+    def __init__(self):
+        self._keys = []
+        self._registrations = []
+        self._registrationHex = array.array("I")
+        self._hex = array.array("I")
+        self._hexPosition = array.array("I")
+        self.version = None
+        self.loaded = False
+
+    @staticmethod
+    def normalise(value):
+        return str(value).strip().upper().replace("-", "").replace(" ", "")
+
+    def load(self):
+
+        registrationsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = registrationsDb.cursor(dictionary=True)
+
+        #Read the version first so an import finishing mid-load is picked up on the next refresh
+        version = get_dataset_version(mysqlCur, "registrations")
+
+        mysqlCur.close()
+
+        mysqlCur = registrationsDb.cursor()
+
+        mysqlCur.execute("SELECT icao_hex, registration FROM simple_active WHERE registration <> '' "\
+            "UNION SELECT icao_hex, registration FROM registrations_active WHERE registration <> '';")
+
+        tmpEntries = []
+
+        while True:
+            rows = mysqlCur.fetchmany(10000)
+
+            if len(rows) == 0:
+                break
+
+            for icaoHex, registration in rows:
+                tmpEntries.append((self.normalise(registration), int(icaoHex), str(registration).upper()))
+
+        mysqlCur.close()
+        registrationsDb.close()
+
+        tmpEntries.sort()
+
+        tmpKeys = [entry[0] for entry in tmpEntries]
+        tmpRegistrations = [entry[2] for entry in tmpEntries]
+        tmpRegistrationHex = array.array("I", [entry[1] for entry in tmpEntries])
+        tmpHexPosition = array.array("I", sorted(range(len(tmpEntries)), key=lambda position: tmpEntries[position][1]))
+        tmpHex = array.array("I", [tmpEntries[position][1] for position in tmpHexPosition])
+
+        #Swap the new arrays in whole so readers never see a partial index
+        self._keys, self._registrations, self._registrationHex, self._hex, self._hexPosition = tmpKeys, tmpRegistrations, tmpRegistrationHex, tmpHex, tmpHexPosition
+        self.version = version
+        self.loaded = True
+
+        logger.info("Loaded " + str(len(tmpEntries)) + " registrations into the registration index.")
+
+    def refresh(self):
+
+        registrationsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = registrationsDb.cursor(dictionary=True)
+
+        version = get_dataset_version(mysqlCur, "registrations")
+
+        mysqlCur.close()
+        registrationsDb.close()
+
+        if version != self.version or self.loaded == False:
+            self.load()
+
+    def search(self, prefix, limit):
+
+        keys, registrations, registrationHex, hexValues, hexPosition = self._keys, self._registrations, self._registrationHex, self._hex, self._hexPosition
+
+        returnValue = []
+        seen = set()
+
+        def add(position):
+            entry = (registrations[position], registrationHex[position])
+
+            if entry not in seen:
+                seen.add(entry)
+                returnValue.append({"icao_hex" : icaoIntToHex(entry[1]), "registration" : entry[0]})
+
+        #Registrations starting with the prefix
+        normalised = self.normalise(prefix)
+
+        if normalised != "":
+            position = bisect.bisect_left(keys, normalised)
+
+            while position < len(keys) and len(returnValue) < limit and keys[position].startswith(normalised):
+                add(position)
+                position = position + 1
+
+        #ICAO hex codes starting with the prefix, as the numeric range prefix000 through prefixFFF
+        hexPrefix = str(prefix).strip().upper()
+
+        if 0 < len(hexPrefix) <= 6 and all(character in "0123456789ABCDEF" for character in hexPrefix):
+            low = int(hexPrefix.ljust(6, "0"), 16)
+            high = int(hexPrefix.ljust(6, "F"), 16)
+            position = bisect.bisect_left(hexValues, low)
+
+            while position < len(hexValues) and len(returnValue) < limit and hexValues[position] <= high:
+                add(hexPosition[position])
+                position = position + 1
+
+        return returnValue
+
+
+def load_registration_index():
+
+    try:
+        registrationIndex.load()
+
+    except Exception as ex:
+        logger.error(ex)
+
+
+def refresh_caches():
+
+    #Importers write to MySQL directly, so drop a whole cache when its dataset reports a new import
+    cachesDb = mysql.connector.connect(
+        host=settings['mySQL']['uri'],
+        user=settings['mySQL']['username'],
+        password=settings['mySQL']['password'],
+        database=settings['mySQL']['database'])
+
+    mysqlCur = cachesDb.cursor(dictionary=True)
+
+    for dataset, cache in [("flight_numbers", flightCache), ("registrations", registrationCache), ("operators", operatorCache)]:
+        version = get_dataset_version(mysqlCur, dataset)
+
+        if version != cache.version:
+            cache.clear()
+            cache.version = version
+
+    mysqlCur.close()
+    cachesDb.close()
+
+
+def warm_caches():
+
+    #Preload the keys requested before the last shutdown, in batches, while requests are already being served
+    try:
+        tmpEntries = keyHistory.load(settings['api']['key_history_file'])
+
+    except Exception as ex:
+        logger.error("Unable to read key history " + str(settings['api']['key_history_file']) + ": " + str(ex))
+        return
+
+    if len(tmpEntries) == 0:
+        return
+
+    logger.info("Warming caches with " + str(len(tmpEntries)) + " keys from " + str(settings['api']['key_history_file']))
+
+    cachesDb = mysql.connector.connect(
+        host=settings['mySQL']['uri'],
+        user=settings['mySQL']['username'],
+        password=settings['mySQL']['password'],
+        database=settings['mySQL']['database'])
+
+    mysqlCur = cachesDb.cursor(dictionary=True)
+
+    refresh_caches()
+
+    registrationKeys = {}
+    flightKeys = []
+    operatorKeys = []
+
+    for entry in tmpEntries:
+        if entry['kind'] == "registration" and len(entry['key']) == 3 and entry['key'][0] in ['simple', 'registrations'] and entry['key'][1] in ['registration', 'icao_hex']:
+            registrationKeys.setdefault((entry['key'][0], entry['key'][1]), []).append(str(entry['key'][2]).upper())
+
+        if entry['kind'] == "flight" and len(entry['key']) == 2:
+            flightKeys.append((str(entry['key'][0]).upper(), entry['key'][1]))
+
+        if entry['kind'] == "operator" and len(entry['key']) == 1:
+            operatorKeys.append(str(entry['key'][0]).upper())
+
+    for (table_name, column), values in registrationKeys.items():
+
+        #Hex codes are stored as integers in the active projection
+        if column == "icao_hex":
+            values = [value for value in values if icaoHexToInt(value) is not None]
+
+        for position in range(0, len(values), WARM_BATCH_SIZE):
+            batch = values[position:position + WARM_BATCH_SIZE]
+            parameters = batch
+
+            if column == "icao_hex":
+                parameters = [icaoHexToInt(value) for value in batch]
+
+            active_table_name = table_name + "_active"
+
+            mysqlCur.execute("SELECT " + active_table_name + ".data, " + active_table_name + ".data_zlib, " + active_table_name + "." + column + " AS lookup FROM " + active_table_name + " "\
+                "INNER JOIN sources ON " + active_table_name + ".source = sources.unique_id " \
+                "WHERE " + active_table_name + "." + column + " IN (" + ", ".join(["%s"] * len(batch)) + ");", parameters)
+
+            tmpRows = {}
+
+            for row in mysqlCur.fetchall():
+                if column == "icao_hex":
+                    tmpRows.setdefault(icaoIntToHex(row['lookup']), []).append(row)
+                else:
+                    tmpRows.setdefault(str(row['lookup']).upper(), []).append(row)
+
+            for value in batch:
+                rows = tmpRows.get(value, [])
+
+                if len(rows) == 1:
+                    registrationCache.set((table_name, column, value), registration.fromRow(rows[0]))
+
+                if len(rows) == 0:
+                    registrationCache.set((table_name, column, value), {"status" : ENUM_RESULT.NOT_FOUND})
+
+    for position in range(0, len(flightKeys), WARM_BATCH_SIZE):
+        batch = flightKeys[position:position + WARM_BATCH_SIZE]
+        idents = list(set([key[0] for key in batch]))
+
+        mysqlCur.execute("SELECT flight_numbers.ident, flight_numbers.airline_designator, flight_numbers.flight_number, flight_numbers.expires, "\
+            "flight_numbers.origin, flight_numbers.destination, flight_numbers.hash, sources.agency AS source "\
+            "FROM flight_numbers "\
+            "LEFT OUTER JOIN sources ON sources.unique_id = flight_numbers.source "\
+            "WHERE flight_numbers.expires >= now() AND flight_numbers.ident IN (" + ", ".join(["%s"] * len(idents)) + ");", idents)
+
+        tmpRows = {}
+
+        for row in mysqlCur.fetchall():
+            tmpRows.setdefault(str(row['ident']).upper(), []).append(row)
+
+        #Apply the focus airport filter here, matching flight_info.get()
+        for ident, focus in batch:
+            rows = tmpRows.get(ident, [])
+
+            if focus is not None:
+                rows = [row for row in rows if str(row['origin']).upper() == focus or str(row['destination']).upper() == focus]
+
+            if len(rows) == 1:
+                cached = dict(rows[0])
+                del cached['ident']
+                cached['status'] = ENUM_RESULT.SUCCESS
+                flightCache.set((ident, focus), cached, expires=rows[0]['expires'].timestamp(), group=ident)
+
+            if len(rows) == 0:
+                flightCache.set((ident, focus), {"status" : ENUM_RESULT.NOT_FOUND}, group=ident)
+
+    for position in range(0, len(operatorKeys), WARM_BATCH_SIZE):
+        batch = operatorKeys[position:position + WARM_BATCH_SIZE]
+
+        mysqlCur.execute("SELECT airline_designator, name, callsign, country, sources.agency AS source, hash FROM operators "\
+            "LEFT OUTER JOIN sources ON sources.unique_id = operators.source "\
+            "WHERE operators.airline_designator IN (" + ", ".join(["%s"] * len(batch)) + ") AND operators.deleted is null;", batch)
+
+        tmpRows = {}
+
+        for row in mysqlCur.fetchall():
+            tmpRows.setdefault(str(row['airline_designator']).upper(), []).append(row)
+
+        for designator in batch:
+            rows = tmpRows.get(designator, [])
+
+            if len(rows) == 1:
+                operatorCache.set(designator, rows[0], group=designator)
+
+    mysqlCur.close()
+    cachesDb.close()
+
+    logger.info("Finished warming caches.")
+
+
+def icaoHexToInt(value):
+
+    #24-bit ICAO address as stored in the active projection tables, or None when the value is not 6 hex digits
+    value = str(value).strip()
+
+    if len(value) != 6 or all(character in "0123456789abcdefABCDEF" for character in value) == False:
+        return None
+
+    return int(value, 16)
+
+
+def icaoIntToHex(value):
+    return format(int(value), "06X")
+
+
+def get_dataset_version(mysqlCur, dataset):
+
+    #Importers bump dataset_versions when they finish so in-memory indexes know to reload
+    mysqlCur.execute("SELECT updated FROM dataset_versions WHERE dataset = %s;", (dataset, ))
+
+    result = mysqlCur.fetchall()
+
+    if len(result) == 0:
+        return None
+
+    return result[0]['updated']
+
+
+class registration():
+
+    def __init__(self, icao_hex = None, registration = None, data_type = "simple"):
+        self.icao_hex = ""
+        self.registration = ""
+
+        if icao_hex:
+            self.icao_hex = icao_hex
+        
+        if registration:
+            self.registration = registration
+
+        if data_type is None:
+            data_type = "simple"
+
+        self.data_type = data_type
+
+        if self.data_type not in ['simple', 'detailed']:
+            raise Exception("Unknown registration data type " + self.registration)    
+
+    def get(self):
+
+        #Set the table name based on the data type
+        if self.data_type == "simple":
+            table_name = "simple"
+        else:
+            table_name = "registrations"
+
+        if self.registration == "" and self.icao_hex == "":
+            return {"status" : ENUM_RESULT.INVALID_REQUEST, "message" : "registration or icao_hex must be specified"}
+
+        if self.registration != "":
+            cacheKey = (table_name, "registration", self.registration.upper())
+        else:
+            cacheKey = (table_name, "icao_hex", self.icao_hex.upper())
+
+        keyHistory.record("registration", list(cacheKey))
+
+        cached = registrationCache.get(cacheKey)
+
+        if cached is not None:
+            return self.expand(cached)
+
+        #The active projection stores icao_hex as a 24-bit integer; anything else cannot match
+        if self.registration == "" and icaoHexToInt(self.icao_hex) is None:
+            return {"status" : ENUM_RESULT.NOT_FOUND}
+
+        operatorsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = operatorsDb.cursor(dictionary=True)
+
+        #The active projection holds only live rows; more than one can share an icao_hex or registration
+        active_table_name = table_name + "_active"
+
+        if self.registration !="":
+            mysqlCur.execute("SELECT " + active_table_name + ".data, " + active_table_name + ".data_zlib, sources.agency FROM " + active_table_name + " "\
+                "INNER JOIN sources ON " + active_table_name + ".source = sources.unique_id " \
+                "WHERE registration = '" + self.registration + "';")
+
+        if self.icao_hex != "":
+            mysqlCur.execute("SELECT " + active_table_name + ".data, " + active_table_name + ".data_zlib, sources.agency FROM " + active_table_name + " "\
+                "INNER JOIN sources ON " + active_table_name + ".source = sources.unique_id " \
+                "WHERE icao_hex = " + str(icaoHexToInt(self.icao_hex)) + ";")
+
+        result = mysqlCur.fetchall()
+
+        mysqlCur.close()
         operatorsDb.close()
 
+        #Ensure we have have exactly 1 row
+        if len(result) == 1:
+            cached = self.fromRow(result[0])
+            registrationCache.set(cacheKey, cached)
+            return self.expand(cached)
+
+        if len(result) == 0:
+            returnValue = {"status" : ENUM_RESULT.NOT_FOUND}
+            registrationCache.set(cacheKey, returnValue)
+            return returnValue
+
+        if len(result) > 1:
+            logger.warning("Retrieved " + str(len(result)) + " records from MySQL when querying " + json.dumps(self.__dict__, default=str) + ".  Expected 0 or 1.")
+            return {"status" : ENUM_RESULT.UNEXPECTED_RESULT, "message" : "Unexpected number of records returned " + str(len(result))}
+            
+        #Return unknown failure
+        return {"status" : ENUM_RESULT.UNKNOWN_FAILURE}
+
+
+    @staticmethod
+    def fromRow(row):
+
+        #Compressed rows are cached still compressed, as MySQL's COMPRESS() output without its 4 byte length prefix,
+        #  which is a zlib stream that can be sent as-is to clients accepting Content-Encoding: deflate
+        if row['data_zlib'] is not None:
+            return {"status" : ENUM_RESULT.SUCCESS, "deflate" : bytes(row['data_zlib'][4:])}
+
+        return {"status" : ENUM_RESULT.SUCCESS, "data" : json.loads(row['data'])}
+
+    @staticmethod
+    def expand(cached):
+
+        if "deflate" not in cached:
+            return cached
+
+        return {"status" : cached['status'], "data" : json.loads(zlib.decompress(cached['deflate'])), "deflate" : cached['deflate']}
+
+
+class operator_unknown():
+
+    def __init__(self):
+        self.airline_designator = ""
+        self._operators = []
+        self.next_cursor = None
+
+    class operator():
+
+        def __init__(self, airline_designator, count):
+            self.airline_designator = str(airline_designator).strip().upper()
+            self.count = count
+
+    def operators(self):
+        return [ob.__dict__ for ob in self._operators]
+
+    def get(self, limit=None, cursor=None):
+
+        operatorsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = operatorsDb.cursor(dictionary=True)
+
+        sqlQuery = "SELECT airline_designator, count FROM operators_unknown WHERE deleted IS NULL "
+        parameters = ()
+
+        #Keyset pagination on the deleted_count_airline_designator index
+        if cursor is not None:
+            sqlQuery = sqlQuery + "AND (count < %s OR (count = %s AND airline_designator > %s)) "
+            parameters = parameters + (cursor[0], cursor[0], cursor[1], )
+
+        sqlQuery = sqlQuery + "ORDER BY count DESC, airline_designator"
+
+        #Read one extra row to learn if another page exists
+        if limit is not None:
+            sqlQuery = sqlQuery + " LIMIT %s"
+            parameters = parameters + (limit + 1, )
+
+        mysqlCur.execute(sqlQuery + ";", parameters)
+
+        result = mysqlCur.fetchall()
+
+        mysqlCur.close()
+        operatorsDb.close()
+
+        if limit is not None and len(result) > limit:
+            result = result[:limit]
+            self.next_cursor = encodeCursor([result[-1]['count'], result[-1]['airline_designator']])
+
         if len(result) > 0:
 
             for entry in result:
@@ -1347,6 +2525,15 @@ class operator():
 
     def get(self):
 
+        keyHistory.record("operator", [self.airline_designator.upper()])
+
+        #Only known operators are cached, a miss must still be counted in operators_unknown
+        cached = operatorCache.get(self.airline_designator.upper())
+
+        if cached is not None:
+            self.apply_cached(cached)
+            return ENUM_RESULT.SUCCESS
+
         operatorsDb = mysql.connector.connect(
             host=settings['mySQL']['uri'],
             user=settings['mySQL']['username'],
@@ -1361,12 +2548,8 @@ class operator():
 
         #Ensure we have have exactly 1 row
         if len(result) == 1:
-            self.airline_designator = result[0]['airline_designator']
-            self.name = result[0]['name']
-            self.callsign = result[0]['callsign']
-            self.country = result[0]['country']
-            self.source = result[0]['source']
-            self.hash = result[0]['hash']
+            operatorCache.set(self.airline_designator.upper(), result[0], group=self.airline_designator.upper())
+            self.apply_cached(result[0])
 
             mysqlCur.close()
             operatorsDb.close()
@@ -1394,6 +2577,14 @@ class operator():
 
         return ENUM_RESULT.FAILED
 
+    def apply_cached(self, cached):
+        self.airline_designator = cached['airline_designator']
+        self.name = cached['name']
+        self.callsign = cached['callsign']
+        self.country = cached['country']
+        self.source = cached['source']
+        self.hash = cached['hash']
+
     def toDict(self):
         returnValue = {}
 
@@ -1411,7 +2602,7 @@ class operator():
             if key in ['airline_designator', 'name', 'callsign', 'country', 'source']:
                 tmpObj[key] = self.__dict__[key]
 
-        self.hash = hashlib.md5(json.dumps(tmpObj).encode('utf-8')).hexdigest()
+        self.hash = canonical_json.encode(tmpObj, settings['hash_scheme'])[1]
     
 
     def post(self):
@@ -1480,6 +2671,8 @@ class operator():
             mysqlCur.close()
             operatorsDb.close()
 
+            operatorCache.invalidate_group(self.airline_designator)
+
             logger.info("POST operator " + self.airline_designator + " hash " + self.hash)
 
             return returnValue
@@ -1558,6 +2751,8 @@ class operator():
             mysqlCur.close()
             operatorsDb.close()
 
+            operatorCache.invalidate_group(self.airline_designator)
+
             logger.info("PATCH operator " + self.airline_designator + " hash " + self.hash)
 
             return returnValue
@@ -1607,6 +2802,8 @@ class operator():
             mysqlCur.close()
             operatorsDb.close()
 
+            operatorCache.invalidate_group(self.airline_designator)
+
             logger.info("DELETE operator " + self.airline_designator)
 
             return returnValue
@@ -1616,6 +2813,26 @@ class operator():
             return {"status" : ENUM_RESULT.UNKNOWN_FAILURE, "message" : "Unknown failure, see log"}
 
 
+MAX_PAGE_LIMIT = 1000
+
+#Number of keys looked up per query when warming the caches
+WARM_BATCH_SIZE = 500
+
+#Kinds of keys tracked by the heavy hitters counters
+HEAVY_HITTER_KINDS = ["icao_hex", "registration", "operator", "flight", "client"]
+
+#Media types accepted in the Accept header, mapped to the Content-Type sent back
+SUPPORTED_MEDIA_TYPES = {
+    "application/json" : "application/json",
+    "*/*" : "application/json",
+    "application/*" : "application/json",
+    binary_codec.CBOR_CONTENT_TYPE : binary_codec.CBOR_CONTENT_TYPE,
+    binary_codec.MSGPACK_CONTENT_TYPE : binary_codec.MSGPACK_CONTENT_TYPE,
+    "application/x-msgpack" : binary_codec.MSGPACK_CONTENT_TYPE,
+    "application/vnd.msgpack" : binary_codec.MSGPACK_CONTENT_TYPE
+}
+
+
 class ENUM_RESULT(Enum):
     SUCCESS = 0
     SUCCESS_NOT_MODIFIED = 1
@@ -1631,10 +2848,21 @@ def setup():
     global applicationName
     global settings
     global logger
+    global airportIndex
+    global registrationIndex
+    global flightCache
+    global rateLimits
+    global rateLimitLock
+    global registrationCache
+    global operatorCache
+    global keyHistory
+    global heavyHitters
 
     #Define some constants
     applicationName = "Aircraft Registration and Operator Information API"
     settings = {}
+    airportIndex = airport_index()
+    registrationIndex = registration_index()
 
     try:
 
@@ -1679,6 +2907,90 @@ def setup():
         if str(settings['api']['port']).isnumeric() != True:
             raise Exception ("Invalid api -> port in settings.json")
 
+        if "maintenance_interval_seconds" not in settings['api']:
+            settings['api']['maintenance_interval_seconds'] = 60
+
+        if str(settings['api']['maintenance_interval_seconds']).isnumeric() != True:
+            raise Exception ("Invalid api -> maintenance_interval_seconds in settings.json")
+
+        if "flight_cache_seconds" not in settings['api']:
+            settings['api']['flight_cache_seconds'] = 300
+
+        if str(settings['api']['flight_cache_seconds']).isnumeric() != True:
+            raise Exception ("Invalid api -> flight_cache_seconds in settings.json")
+
+        if "flight_cache_entries" not in settings['api']:
+            settings['api']['flight_cache_entries'] = 10000
+
+        if str(settings['api']['flight_cache_entries']).isnumeric() != True:
+            raise Exception ("Invalid api -> flight_cache_entries in settings.json")
+
+        flightCache = expiring_cache(int(settings['api']['flight_cache_seconds']), int(settings['api']['flight_cache_entries']))
+
+        if "max_concurrent_requests" not in settings['api']:
+            settings['api']['max_concurrent_requests'] = 50
+
+        if str(settings['api']['max_concurrent_requests']).isnumeric() != True or int(settings['api']['max_concurrent_requests']) < 1:
+            raise Exception ("Invalid api -> max_concurrent_requests in settings.json")
+
+        if "rate_limit_per_second" not in settings['api']:
+            settings['api']['rate_limit_per_second'] = 100
+
+        if str(settings['api']['rate_limit_per_second']).isnumeric() != True:
+            raise Exception ("Invalid api -> rate_limit_per_second in settings.json")
+
+        if "rate_limit_burst" not in settings['api']:
+            settings['api']['rate_limit_burst'] = 200
+
+        if str(settings['api']['rate_limit_burst']).isnumeric() != True or int(settings['api']['rate_limit_burst']) < 1:
+            raise Exception ("Invalid api -> rate_limit_burst in settings.json")
+
+        rateLimits = {}
+        rateLimitLock = threading.Lock()
+
+        if "lookup_cache_seconds" not in settings['api']:
+            settings['api']['lookup_cache_seconds'] = 300
+
+        if str(settings['api']['lookup_cache_seconds']).isnumeric() != True:
+            raise Exception ("Invalid api -> lookup_cache_seconds in settings.json")
+
+        if "lookup_cache_entries" not in settings['api']:
+            settings['api']['lookup_cache_entries'] = 50000
+
+        if str(settings['api']['lookup_cache_entries']).isnumeric() != True:
+            raise Exception ("Invalid api -> lookup_cache_entries in settings.json")
+
+        registrationCache = expiring_cache(int(settings['api']['lookup_cache_seconds']), int(settings['api']['lookup_cache_entries']))
+        operatorCache = expiring_cache(int(settings['api']['lookup_cache_seconds']), int(settings['api']['lookup_cache_entries']))
+
+        if "key_history_file" not in settings['api']:
+            settings['api']['key_history_file'] = "key_history.json"
+
+        if str(settings['api']['key_history_file']).strip() == "":
+            raise Exception ("Invalid api -> key_history_file in settings.json")
+
+        #Relative paths are kept alongside api.py
+        settings['api']['key_history_file'] = os.path.join(os.path.dirname(os.path.realpath(__file__)), settings['api']['key_history_file'])
+
+        if "key_history_entries" not in settings['api']:
+            settings['api']['key_history_entries'] = 5000
+
+        if str(settings['api']['key_history_entries']).isnumeric() != True:
+            raise Exception ("Invalid api -> key_history_entries in settings.json")
+
+        keyHistory = key_history(int(settings['api']['key_history_entries']))
+
+        if "top_keys_capacity" not in settings['api']:
+            settings['api']['top_keys_capacity'] = 1000
+
+        if str(settings['api']['top_keys_capacity']).isnumeric() != True or int(settings['api']['top_keys_capacity']) < 1:
+            raise Exception ("Invalid api -> top_keys_capacity in settings.json")
+
+        heavyHitters = heavy_hitters(int(settings['api']['top_keys_capacity']))
+
+        #Flight and operator hashes must match those written by the importers
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+
         if "mySQL" not in settings:
             raise Exception ("mySQL object is missing from settings.json")
 
@@ -1718,7 +3030,99 @@ def exitApp(exitCode=None):
 
 
 class ThreadedTCPServer(socketserver.ThreadingMixIn,socketserver.TCPServer):
-    pass
+
+    #Connections beyond api -> max_concurrent_requests are refused with a 503 before a thread is started
+    def __init__(self, server_address, RequestHandlerClass, maxConcurrentRequests):
+        self.slots = threading.BoundedSemaphore(maxConcurrentRequests)
+        socketserver.TCPServer.__init__(self, server_address, RequestHandlerClass)
+
+    def process_request(self, request, client_address):
+
+        if self.slots.acquire(blocking=False) == False:
+            logger.warning("Shedding request from " + str(client_address[0]) + "; " + str(settings['api']['max_concurrent_requests']) + " requests already in progress.")
+
+            try:
+                request.sendall(b"HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\nAccess-Control-Allow-Origin: *\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+
+            except OSError:
+                pass
+
+            self.shutdown_request(request)
+            return
+
+        try:
+            socketserver.ThreadingMixIn.process_request(self, request, client_address)
+
+        except Exception:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+
+        try:
+            socketserver.ThreadingMixIn.process_request_thread(self, request, client_address)
+
+        finally:
+            self.slots.release()
+
+
+def maintenance():
+
+    #Periodic housekeeping, runs on a daemon thread for the life of the server
+    while True:
+
+        time.sleep(int(settings['api']['maintenance_interval_seconds']))
+
+        try:
+            flight_info.expire_conflicts()
+
+        except Exception as ex:
+            logger.error(ex)
+
+        try:
+            airportIndex.refresh()
+
+        except Exception as ex:
+            logger.error(ex)
+
+        try:
+            registrationIndex.refresh()
+
+        except Exception as ex:
+            logger.error(ex)
+
+        try:
+            flightCache.evict()
+            registrationCache.evict()
+            operatorCache.evict()
+            refresh_caches()
+
+        except Exception as ex:
+            logger.error(ex)
+
+        try:
+            keyHistory.save(settings['api']['key_history_file'])
+
+        except Exception as ex:
+            logger.error(ex)
+
+
+def warm_caches_safely():
+
+    try:
+        warm_caches()
+
+    except Exception as ex:
+        logger.error(ex)
+
+
+def save_key_history():
+
+    try:
+        keyHistory.save(settings['api']['key_history_file'])
+
+    except Exception as ex:
+        logger.error(ex)
 
 
 def main():
@@ -1726,10 +3130,26 @@ def main():
     #Start the HTTP server
     try:
 
+        #Load the in-memory indexes; a failure leaves them empty until the next housekeeping pass
+        try:
+            airportIndex.load()
+
+        except Exception as ex:
+            logger.error(ex)
+
+        #Start the housekeeping thread
+        threading.Thread(target=maintenance, name="maintenance", daemon=True).start()
+
+        #The registration index is large, so it is built in the background while the server starts
+        threading.Thread(target=load_registration_index, name="registration_index", daemon=True).start()
+
+        #Warm the caches in the background while the server starts
+        threading.Thread(target=warm_caches_safely, name="warm_caches", daemon=True).start()
+
         logger.info("Starting HTTP server on port " + str(settings['api']['port']))
 
         #Create the webserver
-        httpd = socketserver.ThreadingTCPServer(("", settings['api']['port']), RequestHandler)
+        httpd = ThreadedTCPServer(("", settings['api']['port']), RequestHandler, int(settings['api']['max_concurrent_requests']))
 
         #Serve clients until stopped
         httpd.serve_forever()
@@ -1737,11 +3157,13 @@ def main():
     except sigKill:
         #Kill the http server and clean up open connections
         httpd.server_close()
+        save_key_history()
         exitApp(0)       
 
     except KeyboardInterrupt:
         #Kill the http server and clean up open connections
         httpd.server_close()
+        save_key_history()
         exitApp(0)
 
     except Exception as ex:
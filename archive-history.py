@@ -0,0 +1,245 @@
+import os
+import json
+import logging
+import logging.handlers as handlers
+import sys
+import time
+from yaspin import yaspin
+import mysql.connector #pip3 install mysql-connector-python
+import argparse
+
+
+#Tables that are archived, the column identifying each row, the condition that makes a row eligible and the columns copied
+ARCHIVE_TABLES = [
+    {
+        "table" : "registrations",
+        "key" : "unique_id",
+        "condition" : "deleted IS NOT NULL AND deleted < NOW() - INTERVAL %s DAY",
+        "columns" : "unique_id, icao_hex, registration, data, hash, source, created, deleted"
+    },
+    {
+        "table" : "simple",
+        "key" : "unique_id",
+        "condition" : "deleted IS NOT NULL AND deleted < NOW() - INTERVAL %s DAY",
+        "columns" : "unique_id, icao_hex, registration, data, hash, source, created, deleted"
+    },
+    {
+        "table" : "operators",
+        "key" : "unique_id",
+        "condition" : "deleted IS NOT NULL AND deleted < NOW() - INTERVAL %s DAY",
+        "columns" : "unique_id, airline_designator, name, callsign, country, hash, source, created, deleted"
+    },
+    {
+        "table" : "flight_numbers",
+        "key" : "unique_id",
+        "condition" : "expires < NOW() - INTERVAL %s DAY",
+        "columns" : "unique_id, airline_designator, flight_number, ident, origin, destination, expires, source, hash"
+    },
+    {
+        "table" : "operators_unknown",
+        "key" : "airline_designator",
+        "condition" : "deleted IS NOT NULL AND deleted < NOW() - INTERVAL %s DAY",
+        "columns" : "airline_designator, count, created, deleted"
+    }
+]
+
+
+def setup(args):
+    global logger
+    global applicationName
+    global settings
+
+    settings = {}
+
+    try:
+
+        filePath = os.path.dirname(os.path.realpath(__file__)) + "/"
+
+        applicationName = "Archive History"
+
+        #Setup the logger, 10MB maximum log size
+        logger = logging.getLogger(applicationName)
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] - %(message)s')
+        logHandler = handlers.RotatingFileHandler(filePath + 'events.log', maxBytes=10485760, backupCount=1)
+        logHandler.setFormatter(formatter)
+        logger.addHandler(logHandler)
+        logger.setLevel(logging.INFO)
+
+        logger.info(applicationName + " application started.")
+
+        #Make sure the settings file exists
+        if os.path.exists(filePath + 'settings.json') == False:
+            raise Exception("Settings file does not exist.  Expected file " + filePath + 'settings.json')
+
+        #Get the settings file
+        if os.path.exists(filePath + 'settings.json.private') == True:
+            with open(filePath + 'settings.json.private') as settingsFile:
+                settings = json.load(settingsFile)
+        else:
+            with open(filePath + 'settings.json') as settingsFile:
+                settings = json.load(settingsFile)
+
+        if "mySQL" not in settings:
+            raise Exception("The database information (mySQL) is not populated in the settings.json file.")
+
+        if "uri" not in settings['mySQL']:
+            raise Exception("The database uri (mySQL -> uri) is not populated in the settings.json file.")
+
+        if "username" not in settings['mySQL']:
+            raise Exception("The database username (mySQL -> username) is not populated in the settings.json file.")
+
+        if "password" not in settings['mySQL']:
+            raise Exception("The database password (mySQL -> password) is not populated in the settings.json file.")
+
+        if "database" not in settings['mySQL']:
+            raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
+
+        if "archive" not in settings:
+            settings['archive'] = {}
+
+        if "retention_days" not in settings['archive']:
+            settings['archive']['retention_days'] = 90
+
+        if "batch_size" not in settings['archive']:
+            settings['archive']['batch_size'] = 1000
+
+        if "sleep_seconds" not in settings['archive']:
+            settings['archive']['sleep_seconds'] = 0.5
+
+        #Command line arguments override the settings file
+        if args.retention_days is not None:
+            settings['archive']['retention_days'] = args.retention_days
+
+        if str(settings['archive']['retention_days']).isnumeric() != True:
+            raise Exception("The retention period (archive -> retention_days) must be a whole number of days.")
+
+        if str(settings['archive']['batch_size']).isnumeric() != True or int(settings['archive']['batch_size']) < 1:
+            raise Exception("The batch size (archive -> batch_size) must be a positive whole number.")
+
+        try:
+            settings['archive']['sleep_seconds'] = float(settings['archive']['sleep_seconds'])
+        except ValueError:
+            raise Exception("The throttle (archive -> sleep_seconds) must be a number of seconds.")
+
+        settings['archive']['retention_days'] = int(settings['archive']['retention_days'])
+        settings['archive']['batch_size'] = int(settings['archive']['batch_size'])
+
+        settings['tables'] = args.tables
+
+    except Exception as ex:
+        logger.error(ex)
+        print(ex)
+        exitApp(1)
+
+
+def main():
+
+    try:
+
+        archiveDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = archiveDb.cursor()
+
+        for archiveTable in ARCHIVE_TABLES:
+            if settings['tables'] is not None and archiveTable['table'] not in settings['tables']:
+                continue
+
+            archive(archiveDb, mysqlCur, archiveTable)
+
+        mysqlCur.close()
+        archiveDb.close()
+
+        #Success, exit the app
+        exitApp()
+
+    except Exception as ex:
+        logger.error(ex)
+        print(ex)
+        exitApp(1)
+
+
+def archive(archiveDb, mysqlCur, archiveTable):
+
+    table = archiveTable['table']
+    key = archiveTable['key']
+
+    logger.info("Archiving " + table + " rows older than " + str(settings['archive']['retention_days']) + " days.")
+
+    movedCount = 0
+    lastKey = None
+    start = time.time()
+
+    with yaspin(text="Archiving " + table + "...") as spinner:
+
+        while True:
+
+            #Pick one small batch at a time so each transaction only locks a few rows the API may be reading; continuing after the last key
+            #  keeps each batch from rescanning the live rows the previous batches already passed over.  FOR UPDATE holds the batch until
+            #  the commit, so a writer reviving one of its rows waits rather than having the revived row archived and deleted.
+            if lastKey is None:
+                mysqlCur.execute("SELECT " + key + " FROM " + table + " WHERE " + archiveTable['condition'] + " ORDER BY " + key + " LIMIT " + str(settings['archive']['batch_size']) + " FOR UPDATE;", (settings['archive']['retention_days'],))
+            else:
+                mysqlCur.execute("SELECT " + key + " FROM " + table + " WHERE " + key + " > %s AND " + archiveTable['condition'] + " ORDER BY " + key + " LIMIT " + str(settings['archive']['batch_size']) + " FOR UPDATE;", (lastKey, settings['archive']['retention_days']))
+
+            keys = [row[0] for row in mysqlCur.fetchall()]
+
+            if len(keys) == 0:
+                break
+
+            lastKey = keys[-1]
+
+            placeholders = ", ".join(["%s"] * len(keys))
+
+            mysqlCur.execute("INSERT INTO " + table + "_history (" + archiveTable['columns'] + ") SELECT " + archiveTable['columns'] + " FROM " + table + " WHERE " + key + " IN (" + placeholders + ");", keys)
+
+            #Conflicts point at flight numbers, so they leave with them
+            if table == "flight_numbers":
+                mysqlCur.execute("DELETE FROM flight_conflicts WHERE flight_number_id IN (" + placeholders + ");", keys)
+
+            mysqlCur.execute("DELETE FROM " + table + " WHERE " + key + " IN (" + placeholders + ");", keys)
+
+            archiveDb.commit()
+
+            movedCount = movedCount + len(keys)
+            spinner.text = "Archiving " + table + "... " + str(movedCount) + " rows"
+
+            #Give the API's queries room between batches
+            time.sleep(settings['archive']['sleep_seconds'])
+
+        spinner.text = "Moved " + str(movedCount) + " rows of " + table + " to " + table + "_history in " + format(time.time() - start, ".1f") + " seconds.\n"
+        spinner.ok("")
+
+    logger.info("Moved " + str(movedCount) + " rows of " + table + " to " + table + "_history in " + format(time.time() - start, ".1f") + " seconds.")
+
+
+def exitApp(exitCode=None):
+
+    if exitCode is None:
+        exitCode = 0
+
+    if exitCode == 0:
+        print(applicationName + " application finished successfully.")
+        logger.info(applicationName + " application finished successfully.")
+
+    if exitCode != 0:
+        logger.info("Error; Exiting with code " + str(exitCode))
+
+    sys.exit(exitCode)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Moves deleted and expired rows past the retention period into history tables')
+    parser.add_argument('--retention-days', dest='retention_days', type=int, help='Days a deleted or expired row is kept before it is archived.  Overrides archive -> retention_days.')
+    parser.add_argument('--tables', dest='tables', nargs='+', choices=[archiveTable['table'] for archiveTable in ARCHIVE_TABLES], help='Only archive these tables.  Defaults to all of them.')
+
+    args = parser.parse_args()
+
+    #Setup the configuration required
+    setup(args)
+
+    main()
@@ -0,0 +1,557 @@
+import os
+import json
+import sys
+import time
+import random
+import zlib
+import csv
+import sqlite3
+import resource
+import logging
+import importlib.util
+import subprocess
+import tempfile
+import itertools
+import mysql.connector #pip3 install mysql-connector-python
+import argparse
+import sqlite_batch
+import parallel_decode
+
+
+def setup():
+    global settings
+
+    filePath = os.path.dirname(os.path.realpath(__file__)) + "/"
+
+    #Make sure the settings file exists
+    if os.path.exists(filePath + 'settings.json') == False:
+        raise Exception("Settings file does not exist.  Expected file " + filePath + 'settings.json')
+
+    #Get the settings file
+    if os.path.exists(filePath + 'settings.json.private') == True:
+        with open(filePath + 'settings.json.private') as settingsFile:
+            settings = json.load(settingsFile)
+    else:
+        with open(filePath + 'settings.json') as settingsFile:
+            settings = json.load(settingsFile)
+
+    if "mySQL" not in settings:
+        raise Exception("The database information (mySQL) is not populated in the settings.json file.")
+
+    for key in ['uri', 'username', 'password', 'database']:
+        if key not in settings['mySQL']:
+            raise Exception("The database " + key + " (mySQL -> " + key + ") is not populated in the settings.json file.")
+
+
+def connect():
+
+    return mysql.connector.connect(
+        host=settings['mySQL']['uri'],
+        user=settings['mySQL']['username'],
+        password=settings['mySQL']['password'],
+        database=settings['mySQL']['database'])
+
+
+def percentile(values, fraction):
+
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def printTimings(label, timings):
+
+    timings = [timing * 1000 for timing in timings]
+
+    print("  " + label.ljust(44) + "mean " + format(sum(timings) / len(timings), "8.3f") + " ms" + \
+        "   p50 " + format(percentile(timings, 0.50), "8.3f") + " ms" + \
+        "   p95 " + format(percentile(timings, 0.95), "8.3f") + " ms" + \
+        "   p99 " + format(percentile(timings, 0.99), "8.3f") + " ms")
+
+
+def timeQuery(mysqlCur, sqlQuery, parameters):
+
+    timings = []
+
+    for parameter in parameters:
+        start = time.perf_counter()
+        mysqlCur.execute(sqlQuery, (parameter,))
+        mysqlCur.fetchall()
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def storage(tables, analyze):
+
+    #Index and data sizes from InnoDB's persistent statistics
+    registrationsDb = connect()
+    mysqlCur = registrationsDb.cursor(dictionary=True)
+
+    if analyze == True:
+        for table in tables:
+            mysqlCur.execute("ANALYZE TABLE " + table + ";")
+            mysqlCur.fetchall()
+
+    mysqlCur.execute("SELECT @@innodb_page_size AS page_size;")
+    pageSize = mysqlCur.fetchall()[0]['page_size']
+
+    print("Storage")
+
+    for table in tables:
+        mysqlCur.execute("SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s;", (table,))
+        result = mysqlCur.fetchall()
+
+        if len(result) == 0:
+            print("  " + table + " does not exist")
+            continue
+
+        print("  " + table + ": ~" + str(result[0]['TABLE_ROWS']) + " rows, data " + format(result[0]['DATA_LENGTH'] / 1048576, ".1f") + " MiB, secondary indexes " + format(result[0]['INDEX_LENGTH'] / 1048576, ".1f") + " MiB")
+
+        mysqlCur.execute("SELECT index_name, stat_value FROM mysql.innodb_index_stats WHERE database_name = DATABASE() AND table_name = %s AND stat_name = 'size' ORDER BY index_name;", (table,))
+
+        for entry in mysqlCur.fetchall():
+            print("    " + entry['index_name'].ljust(40) + format(entry['stat_value'] * pageSize / 1048576, "8.1f") + " MiB")
+
+    mysqlCur.close()
+    registrationsDb.close()
+
+
+def registrations(args):
+
+    storage(["registrations", "registrations_active", "simple", "simple_active"], args.analyze)
+
+    registrationsDb = connect()
+    mysqlCur = registrationsDb.cursor()
+
+    for table in ["registrations", "simple"]:
+
+        #Sample live keys, shuffled so both lookups see the same keys in a random order
+        mysqlCur.execute("SELECT icao_hex, registration FROM " + table + " WHERE deleted IS NULL ORDER BY RAND() LIMIT " + str(int(args.samples)) + ";")
+        result = mysqlCur.fetchall()
+
+        if len(result) == 0:
+            print("No live rows in " + table + "; skipping lookups")
+            continue
+
+        random.shuffle(result)
+        icaoHexes = [entry[0] for entry in result]
+        registrationValues = [entry[1] for entry in result]
+
+        print("Lookups against " + table + " (" + str(len(result)) + " samples)")
+
+        printTimings("history by icao_hex, deleted is null", timeQuery(mysqlCur, "SELECT data FROM " + table + " WHERE icao_hex = %s AND deleted IS NULL;", icaoHexes))
+        printTimings("active by integer icao_hex", timeQuery(mysqlCur, "SELECT data FROM " + table + "_active WHERE icao_hex = %s;", [int(value, 16) for value in icaoHexes]))
+        printTimings("history by registration, deleted is null", timeQuery(mysqlCur, "SELECT data FROM " + table + " WHERE registration = %s AND deleted IS NULL;", registrationValues))
+        printTimings("active by registration", timeQuery(mysqlCur, "SELECT data FROM " + table + "_active WHERE registration = %s;", registrationValues))
+
+    mysqlCur.close()
+    registrationsDb.close()
+
+
+def compression(args):
+
+    storage(["registrations_active", "simple_active"], args.analyze)
+
+    registrationsDb = connect()
+    mysqlCur = registrationsDb.cursor()
+
+    for table in ["registrations_active", "simple_active"]:
+
+        mysqlCur.execute("SELECT COUNT(*), SUM(data IS NOT NULL), SUM(data_zlib IS NOT NULL) FROM " + table + ";")
+        result = mysqlCur.fetchall()[0]
+
+        print(table + ": " + str(result[1] or 0) + " JSON and " + str(result[2] or 0) + " compressed documents")
+
+        #Sample documents in their JSON text form regardless of how they are stored
+        mysqlCur.execute("SELECT COALESCE(CAST(data AS CHAR), CONVERT(UNCOMPRESS(data_zlib) USING utf8mb4)) FROM " + table + " ORDER BY RAND() LIMIT " + str(int(args.samples)) + ";")
+        documents = [entry[0].encode("utf8") for entry in mysqlCur.fetchall()]
+
+        if len(documents) == 0:
+            continue
+
+        #Level 6 matches the zlib default used by MySQL's COMPRESS()
+        compressed = [zlib.compress(document, 6) for document in documents]
+
+        rawSize = sum(len(document) for document in documents)
+        compressedSize = sum(len(document) + 4 for document in compressed)
+
+        print("  Sampled " + str(len(documents)) + " documents: JSON " + format(rawSize / len(documents), ".0f") + " bytes, zlib " + format(compressedSize / len(documents), ".0f") + " bytes on average (" + format(compressedSize / rawSize * 100, ".1f") + "%)")
+
+        jsonTimings = []
+        zlibTimings = []
+
+        for document in documents:
+            start = time.perf_counter()
+            json.loads(document)
+            jsonTimings.append(time.perf_counter() - start)
+
+        for document in compressed:
+            start = time.perf_counter()
+            json.loads(zlib.decompress(document))
+            zlibTimings.append(time.perf_counter() - start)
+
+        printTimings("decode JSON", jsonTimings)
+        printTimings("decompress and decode zlib", zlibTimings)
+
+    mysqlCur.close()
+    registrationsDb.close()
+
+
+def staging(args):
+
+    if os.path.exists(args.file) == False:
+        raise Exception("File does not exist.  Expected " + args.file)
+
+    #Read the whole file first so only the staging inserts are timed
+    start = time.perf_counter()
+
+    with open(args.file, "r") as csvfile:
+        fileReader = csv.reader(csvfile)
+        headers = fileReader.__next__()
+        rows = [tuple(str(value).strip() for value in row[:len(headers)]) for row in fileReader if len(row) >= len(headers)]
+
+    readSeconds = time.perf_counter() - start
+
+    if len(rows) == 0:
+        raise Exception("No rows found in " + args.file)
+
+    createStatement = "CREATE TABLE staging (" + ", ".join("c" + str(index) + " text" for index in range(len(headers))) + ")"
+    insertStatement = "INSERT INTO staging VALUES (" + ",".join(["?"] * len(headers)) + ")"
+
+    print("Staging inserts of " + str(len(rows)) + " rows from " + args.file + " (read and parsed in " + format(readSeconds, ".2f") + " s)")
+
+    #The importers' original approach; one cursor and one INSERT per row
+    stagingDb = sqlite3.connect(":memory:")
+    stagingDb.execute(createStatement)
+    start = time.perf_counter()
+
+    for row in rows:
+        dbCursor = stagingDb.cursor()
+        dbCursor.execute(insertStatement, row)
+        dbCursor.close()
+
+    stagingDb.commit()
+    elapsed = time.perf_counter() - start
+    stagingDb.close()
+
+    print("  " + "cursor and execute per row".ljust(44) + format(len(rows) / elapsed, "12,.0f") + " rows/s   " + format(elapsed, "8.2f") + " s")
+
+    for batchSize in args.batch_sizes:
+        stagingDb = sqlite3.connect(":memory:")
+        stagingDb.execute(createStatement)
+        start = time.perf_counter()
+
+        with sqlite_batch.insert_batch(stagingDb, insertStatement, batchSize) as batch:
+            for row in rows:
+                batch.add(row)
+
+        elapsed = time.perf_counter() - start
+        stagingDb.close()
+
+        print("  " + ("executemany, batches of " + str(batchSize)).ljust(44) + format(len(rows) / elapsed, "12,.0f") + " rows/s   " + format(elapsed, "8.2f") + " s")
+
+
+def peakRssMiB():
+
+    #Peak resident set size of this process so far; Linux reports ru_maxrss in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export(args):
+
+    if os.path.exists(args.file) == False:
+        raise Exception("File does not exist.  Expected " + args.file)
+
+    stagingDb = sqlite3.connect(":memory:")
+    stagingDb.row_factory = sqlite3.Row
+
+    #Stage the file the way the importers do, without holding it in Python memory
+    with open(args.file, "r") as csvfile:
+        fileReader = csv.reader(csvfile)
+        headers = fileReader.__next__()
+
+        stagingDb.execute("CREATE TABLE staging (" + ", ".join("c" + str(index) + " text" for index in range(len(headers))) + ")")
+
+        with sqlite_batch.insert_batch(stagingDb, "INSERT INTO staging VALUES (" + ",".join(["?"] * len(headers)) + ")") as batch:
+            for row in fileReader:
+                if len(row) >= len(headers):
+                    batch.add(tuple(str(value).strip() for value in row[:len(headers)]))
+
+    sqlQuery = "SELECT * FROM staging"
+    rowCount = sqlite_batch.count_rows(stagingDb, sqlQuery)
+
+    print("Export of " + str(rowCount) + " staged rows from " + args.file + " (peak RSS after staging " + format(peakRssMiB(), ".0f") + " MiB)")
+
+    #Streamed first, since the peak can only grow
+    baseline = peakRssMiB()
+    start = time.perf_counter()
+
+    sqliteCur = stagingDb.cursor()
+    sqliteCur.execute(sqlQuery)
+
+    for row in sqlite_batch.fetch_chunks(sqliteCur, args.chunk_size):
+        json.dumps(dict(row))
+
+    streamedSeconds = time.perf_counter() - start
+    streamedGrowth = peakRssMiB() - baseline
+
+    print("  " + ("fetchmany, chunks of " + str(args.chunk_size)).ljust(44) + format(rowCount / streamedSeconds, "12,.0f") + " rows/s   peak RSS +" + format(streamedGrowth, ".1f") + " MiB")
+
+    baseline = peakRssMiB()
+    start = time.perf_counter()
+
+    sqliteCur = stagingDb.cursor()
+    sqliteCur.execute(sqlQuery)
+    rows = sqliteCur.fetchall()
+
+    for row in rows:
+        json.dumps(dict(row))
+
+    fetchallSeconds = time.perf_counter() - start
+    fetchallGrowth = peakRssMiB() - baseline
+
+    print("  " + "fetchall".ljust(44) + format(rowCount / fetchallSeconds, "12,.0f") + " rows/s   peak RSS +" + format(fetchallGrowth, ".1f") + " MiB")
+
+    stagingDb.close()
+
+    if streamedGrowth > args.max_rss_mib:
+        raise Exception("Streaming export grew peak RSS by " + format(streamedGrowth, ".1f") + " MiB, more than the allowed " + str(args.max_rss_mib) + " MiB.")
+
+
+
+def loadImporter(fileName, moduleName):
+
+    #The importers are scripts with hyphenated names; registering the module lets worker processes unpickle its functions and classes
+    spec = importlib.util.spec_from_file_location(moduleName, os.path.join(os.path.dirname(os.path.realpath(__file__)), fileName))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[moduleName] = module
+    spec.loader.exec_module(module)
+
+    #setup() is not run, so the importer gets a logger that leaves out its warnings about unknown codes
+    module.logger = logging.getLogger("Benchmark")
+    module.logger.setLevel(logging.ERROR)
+
+    return module
+
+
+def decode(args):
+
+    if os.path.exists(args.file) == False:
+        raise Exception("File does not exist.  Expected " + args.file)
+
+    faa = loadImporter("us-faa.py", "us_faa")
+
+    print("Decoding registrations from " + args.file + " (" + str(os.cpu_count()) + " CPUs)")
+
+    baselineSeconds = None
+
+    #A single process is always measured first, as the baseline for the speedup
+    for processes in sorted(set([1] + args.processes)):
+        rowCount = 0
+        start = time.perf_counter()
+
+        for tmpRegistration in parallel_decode.decode_file(args.file, faa.parse_registration, processes):
+            rowCount = rowCount + 1
+
+        elapsed = time.perf_counter() - start
+
+        if baselineSeconds is None:
+            baselineSeconds = elapsed
+
+        speedup = baselineSeconds / elapsed
+
+        print("  " + (str(processes) + " decode processes").ljust(44) + format(rowCount / elapsed, "12,.0f") + " rows/s   " + format(elapsed, "8.2f") + " s   speedup " + format(speedup, "5.2f") + "x   efficiency " + format(speedup / processes * 100, "3.0f") + "%")
+
+
+def loadReference(reference, moduleName):
+
+    #The reference is either a copy of us-faa.py or a git revision whose us-faa.py is checked out to a temporary file
+    if os.path.isfile(reference):
+        return loadImporter(os.path.realpath(reference), moduleName)
+
+    result = subprocess.run(["git", "show", reference + ":us-faa.py"], cwd=os.path.dirname(os.path.realpath(__file__)), capture_output=True)
+
+    if result.returncode != 0:
+        raise Exception("Reference is neither a file nor a git revision containing us-faa.py: " + reference)
+
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=".py", delete=False) as referenceFile:
+        referenceFile.write(result.stdout)
+
+    try:
+        return loadImporter(referenceFile.name, moduleName)
+
+    finally:
+        os.remove(referenceFile.name)
+
+
+def compareDecoded(label, fileName, currentParse, referenceParse):
+
+    if os.path.exists(fileName) == False:
+        raise Exception("File does not exist.  Expected " + fileName)
+
+    rowCount = 0
+    mismatches = 0
+
+    #Both decoders read the same rows in file order, so their records are compared pairwise
+    for currentRecord, referenceRecord in itertools.zip_longest(parallel_decode.decode_file(fileName, currentParse, 1), parallel_decode.decode_file(fileName, referenceParse, 1)):
+        rowCount = rowCount + 1
+
+        currentFields = json.loads(json.dumps(currentRecord.toDict(), default=str))
+        referenceFields = json.loads(json.dumps(referenceRecord.toDict(), default=str))
+
+        if currentFields == referenceFields:
+            continue
+
+        mismatches = mismatches + 1
+
+        #Only the first few differences are shown, by field
+        if mismatches <= 10:
+            print("  Row " + str(rowCount) + " differs")
+
+            for key in sorted(set(currentFields) | set(referenceFields)):
+                if currentFields.get(key) != referenceFields.get(key):
+                    print("    " + key + ": " + json.dumps(currentFields.get(key)) + " against reference " + json.dumps(referenceFields.get(key)))
+
+    print("  " + label.ljust(44) + format(rowCount, "12,") + " rows   " + format(mismatches, "8,") + " differ")
+
+    return mismatches
+
+
+def golden(args):
+
+    faa = loadImporter("us-faa.py", "us_faa")
+    reference = loadReference(args.reference, "us_faa_reference")
+
+    print("Comparing decoded records against the us-faa.py from " + args.reference)
+
+    mismatches = compareDecoded("registrations in " + os.path.basename(args.file), args.file, faa.parse_registration, reference.parse_registration)
+
+    if args.aircraft is not None:
+        mismatches = mismatches + compareDecoded("aircraft in " + os.path.basename(args.aircraft), args.aircraft, faa.parse_aircraft, reference.parse_aircraft)
+
+    if args.engines is not None:
+        mismatches = mismatches + compareDecoded("engines in " + os.path.basename(args.engines), args.engines, faa.parse_engine, reference.parse_engine)
+
+    if mismatches > 0:
+        raise Exception(str(mismatches) + " decoded records differ from the reference.")
+
+
+def owners(args):
+
+    tc = loadImporter("ca-tc.py", "ca_tc")
+    tc.settings = {"staging_batch_size" : sqlite_batch.DEFAULT_BATCH_SIZE}
+    tc.import_sql = sqlite3.connect(":memory:")
+    tc.import_sql.execute(tc.owner.CREATE_STATEMENT)
+
+    #A synthetic register the size of the Transport Canada file; most aircraft have one active owner, some have several and
+    #  earlier owners are kept as inactive rows
+    random.seed(args.seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    registrations = random.sample(["C-" + first + second + third + fourth for first in "FGI" for second in letters for third in letters for fourth in letters], args.aircraft)
+
+    with sqlite_batch.insert_batch(tc.import_sql, tc.owner.INSERT_STATEMENT) as ownerBatch:
+        for registration in registrations:
+            for status in ["a"] * random.choice([1, 1, 1, 1, 1, 1, 2, 2, 3, 0]) + ["i"] * random.choice([0, 0, 1, 2]):
+                tmpOwner = tc.owner()
+                tmpOwner.registration = registration
+                tmpOwner.name = "Owner " + str(ownerBatch.count + len(ownerBatch.rows))
+                tmpOwner.set_street(str(random.randint(1, 9999)) + " Main Street", random.choice(["", "Unit 2"]))
+                tmpOwner.city = "Ottawa"
+                tmpOwner.province = "Ontario"
+                tmpOwner.postal_code = "K1A 0N5"
+                tmpOwner.country = "Canada"
+                tmpOwner.type = random.choice(["Individual", "Entity"])
+                tmpOwner.set_status(status)
+                tmpOwner.care_of = random.choice(["", "", "", "Flying Club"])
+                tmpOwner.region = "Ontario"
+                tmpOwner.set_mail_recipient(random.choice(["y", "n"]))
+                tmpOwner.commit(ownerBatch)
+
+    ownerCount = ownerBatch.count
+
+    print("Owners of " + str(len(registrations)) + " registrations (" + str(ownerCount) + " owner rows)")
+
+    start = time.perf_counter()
+    activeOwners = tc.load_active_owners()
+    groupedSeconds = time.perf_counter() - start
+
+    #The query per aircraft scans the whole table each time, so it is timed for a sample of registrations and scaled up
+    samples = random.sample(registrations, min(args.samples, len(registrations)))
+    ownersCur = tc.import_sql.cursor()
+    ownersCur.row_factory = sqlite3.Row
+    start = time.perf_counter()
+
+    for registration in samples:
+        ownersCur.execute("SELECT * FROM owners WHERE registration = ? AND status = 'Active'", (registration,))
+
+        if [tc.build_owner(row) for row in ownersCur.fetchall()] != activeOwners.get(registration, []):
+            raise Exception("Grouped owners of " + registration + " do not match the owners queried for it.")
+
+    queriedSeconds = (time.perf_counter() - start) / len(samples) * len(registrations)
+
+    tc.import_sql.close()
+
+    print("  " + ("query per aircraft (" + str(len(samples)) + " sampled, scaled)").ljust(44) + format(len(registrations) / queriedSeconds, "12,.0f") + " rows/s   " + format(queriedSeconds, "8.2f") + " s")
+    print("  " + "grouped in one pass".ljust(44) + format(len(registrations) / groupedSeconds, "12,.0f") + " rows/s   " + format(groupedSeconds, "8.2f") + " s   speedup " + format(queriedSeconds / groupedSeconds, ".0f") + "x")
+
+    if groupedSeconds > args.max_seconds:
+        raise Exception("Grouping the active owners took " + format(groupedSeconds, ".2f") + " s, more than the allowed " + str(args.max_seconds) + " s.")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Measures storage and query latency of the AROI database')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    registrationsParser = subparsers.add_parser('registrations', help='Index sizes and lookup latency of the registration history tables against their active projections.')
+    registrationsParser.add_argument('--samples', type=int, default=1000, help='Number of live keys looked up in each table.  Defaults to 1000.')
+    registrationsParser.add_argument('--analyze', action='store_true', help='Run ANALYZE TABLE first so the index statistics are current.')
+    registrationsParser.set_defaults(function=registrations)
+
+    compressionParser = subparsers.add_parser('compression', help='Storage size and decode latency of JSON against zlib compressed registration documents.')
+    compressionParser.add_argument('--samples', type=int, default=1000, help='Number of documents sampled from each table.  Defaults to 1000.')
+    compressionParser.add_argument('--analyze', action='store_true', help='Run ANALYZE TABLE first so the index statistics are current.')
+    compressionParser.set_defaults(function=compression)
+
+    stagingParser = subparsers.add_parser('staging', help='Rows per second written to an importer\'s SQLite staging table, row by row against batched executemany().  Does not use MySQL.')
+    stagingParser.add_argument(dest='file', metavar="file", help='Extracted CSV file to load, such as the FAA master.txt.')
+    stagingParser.add_argument('--batch-sizes', dest='batch_sizes', type=int, nargs='+', default=[1000, sqlite_batch.DEFAULT_BATCH_SIZE, 20000], help='Batch sizes to compare.  Defaults to 1000 5000 20000.')
+    stagingParser.set_defaults(function=staging)
+
+    exportParser = subparsers.add_parser('export', help='Rows per second and peak memory reading an importer\'s SQLite staging table back in chunks against fetchall().  Does not use MySQL.')
+    exportParser.add_argument(dest='file', metavar="file", help='Extracted CSV file to stage, such as the FAA master.txt.')
+    exportParser.add_argument('--chunk-size', dest='chunk_size', type=int, default=sqlite_batch.DEFAULT_BATCH_SIZE, help='Rows fetched at a time.  Defaults to 5000.')
+    exportParser.add_argument('--max-rss-mib', dest='max_rss_mib', type=float, default=64, help='Fail if the streamed export grows peak RSS by more than this many MiB.  Defaults to 64.')
+    exportParser.set_defaults(function=export)
+
+    decodeParser = subparsers.add_parser('decode', help='Rows per second decoding the FAA master.txt with one or more processes, with the speedup and scaling efficiency of each.  Does not use MySQL.')
+    decodeParser.add_argument(dest='file', metavar="file", help='Extracted FAA master.txt file to decode.')
+    decodeParser.add_argument('--processes', type=int, nargs='+', default=[2, 4, os.cpu_count()], help='Process counts to compare against a single process.  Defaults to 2, 4 and the number of CPUs.')
+    decodeParser.set_defaults(function=decode)
+
+    ownersParser = subparsers.add_parser('owners', help='Time taken to find the active owners of every Transport Canada aircraft, grouped in one pass against a query per aircraft, on a synthetic register.  Does not use MySQL.')
+    ownersParser.add_argument('--aircraft', type=int, default=36000, help='Number of registrations in the synthetic register, at most 52728.  Defaults to 36000.')
+    ownersParser.add_argument('--samples', type=int, default=500, help='Number of registrations timed with a query each.  Defaults to 500.')
+    ownersParser.add_argument('--seed', type=int, default=1, help='Seed for the synthetic register.  Defaults to 1.')
+    ownersParser.add_argument('--max-seconds', dest='max_seconds', type=float, default=10, help='Fail if grouping the owners takes longer than this many seconds.  Defaults to 10.')
+    ownersParser.set_defaults(function=owners)
+
+    goldenParser = subparsers.add_parser('golden', help='Decode every row of the FAA files with the current us-faa.py and a reference one, failing if any record\'s JSON differs.  Does not use MySQL.')
+    goldenParser.add_argument(dest='file', metavar="file", help='Extracted FAA master.txt file to decode.')
+    goldenParser.add_argument('--reference', default="HEAD", help='Git revision or path of the us-faa.py to compare against.  Defaults to HEAD, which checks uncommitted changes.')
+    goldenParser.add_argument('--aircraft', default=None, help='Extracted FAA acftref.txt file to also compare.')
+    goldenParser.add_argument('--engines', default=None, help='Extracted FAA engine.txt file to also compare.')
+    goldenParser.set_defaults(function=golden)
+
+    args = parser.parse_args()
+
+    try:
+        if args.benchmark not in ["staging", "export", "decode", "owners", "golden"]:
+            setup()
+
+        args.function(args)
+
+    except Exception as ex:
+        print(ex)
+        sys.exit(1)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+#Compact binary encodings for API responses and request bodies.  Supports the same value types as json.dumps()
+#  produces and json.loads() returns: dict, list, str, int, float, bool and None.  Bytes are also supported.
+import struct
+
+
+CBOR_CONTENT_TYPE = "application/cbor"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+def cbor_dumps(value):
+
+    output = bytearray()
+    _cbor_encode(value, output)
+
+    return bytes(output)
+
+
+def cbor_loads(data):
+
+    value, position = _cbor_decode(memoryview(data), 0)
+
+    if position != len(data):
+        raise ValueError("Unexpected trailing data after CBOR item")
+
+    return value
+
+
+def msgpack_dumps(value):
+
+    output = bytearray()
+    _msgpack_encode(value, output)
+
+    return bytes(output)
+
+
+def msgpack_loads(data):
+
+    value, position = _msgpack_decode(memoryview(data), 0)
+
+    if position != len(data):
+        raise ValueError("Unexpected trailing data after MessagePack item")
+
+    return value
+
+
+def _cbor_head(majorType, length, output):
+
+    majorType = majorType << 5
+
+    if length < 24:
+        output.append(majorType | length)
+    elif length < 0x100:
+        output.append(majorType | 24)
+        output.append(length)
+    elif length < 0x10000:
+        output.append(majorType | 25)
+        output += struct.pack(">H", length)
+    elif length < 0x100000000:
+        output.append(majorType | 26)
+        output += struct.pack(">I", length)
+    elif length < 0x10000000000000000:
+        output.append(majorType | 27)
+        output += struct.pack(">Q", length)
+    else:
+        raise ValueError("Integer " + str(length) + " is too large to encode")
+
+
+def _cbor_encode(value, output):
+
+    #bool must be tested before int since it is a subclass
+    if value is None:
+        output.append(0xf6)
+    elif value is True:
+        output.append(0xf5)
+    elif value is False:
+        output.append(0xf4)
+    elif isinstance(value, int):
+        if value >= 0:
+            _cbor_head(0, value, output)
+        else:
+            _cbor_head(1, -1 - value, output)
+    elif isinstance(value, float):
+        output.append(0xfb)
+        output += struct.pack(">d", value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf8")
+        _cbor_head(3, len(encoded), output)
+        output += encoded
+    elif isinstance(value, (bytes, bytearray)):
+        _cbor_head(2, len(value), output)
+        output += value
+    elif isinstance(value, (list, tuple)):
+        _cbor_head(4, len(value), output)
+
+        for item in value:
+            _cbor_encode(item, output)
+    elif isinstance(value, dict):
+        _cbor_head(5, len(value), output)
+
+        for key, item in value.items():
+            _cbor_encode(key, output)
+            _cbor_encode(item, output)
+    else:
+        raise TypeError("Object of type " + type(value).__name__ + " is not CBOR serializable")
+
+
+def _cbor_length(data, position, additional):
+
+    if additional < 24:
+        return additional, position
+
+    if additional == 24:
+        return data[position], position + 1
+
+    if additional == 25:
+        return struct.unpack_from(">H", data, position)[0], position + 2
+
+    if additional == 26:
+        return struct.unpack_from(">I", data, position)[0], position + 4
+
+    if additional == 27:
+        return struct.unpack_from(">Q", data, position)[0], position + 8
+
+    raise ValueError("Indefinite length CBOR items are not supported")
+
+
+def _cbor_decode(data, position):
+
+    initial = data[position]
+    position = position + 1
+    majorType = initial >> 5
+    additional = initial & 0x1f
+
+    if majorType == 7:
+        if additional == 20:
+            return False, position
+
+        if additional == 21:
+            return True, position
+
+        if additional == 22 or additional == 23:
+            return None, position
+
+        if additional == 25:
+            return struct.unpack_from(">e", data, position)[0], position + 2
+
+        if additional == 26:
+            return struct.unpack_from(">f", data, position)[0], position + 4
+
+        if additional == 27:
+            return struct.unpack_from(">d", data, position)[0], position + 8
+
+        raise ValueError("Unsupported CBOR simple value " + str(additional))
+
+    length, position = _cbor_length(data, position, additional)
+
+    if majorType == 0:
+        return length, position
+
+    if majorType == 1:
+        return -1 - length, position
+
+    if majorType == 2:
+        return bytes(data[position:position + length]), position + length
+
+    if majorType == 3:
+        return str(data[position:position + length], "utf8"), position + length
+
+    if majorType == 4:
+        returnValue = []
+
+        for _ in range(length):
+            item, position = _cbor_decode(data, position)
+            returnValue.append(item)
+
+        return returnValue, position
+
+    if majorType == 5:
+        returnValue = {}
+
+        for _ in range(length):
+            key, position = _cbor_decode(data, position)
+            item, position = _cbor_decode(data, position)
+            returnValue[key] = item
+
+        return returnValue, position
+
+    #Major type 6 is a tag; the tagged item is returned as-is
+    return _cbor_decode(data, position)
+
+
+def _msgpack_head(fixPrefix, fixLimit, codes, length, output):
+
+    if length < fixLimit:
+        output.append(fixPrefix | length)
+    elif codes[0] is not None and length < 0x100:
+        output.append(codes[0])
+        output.append(length)
+    elif length < 0x10000:
+        output.append(codes[1])
+        output += struct.pack(">H", length)
+    elif length < 0x100000000:
+        output.append(codes[2])
+        output += struct.pack(">I", length)
+    else:
+        raise ValueError("Length " + str(length) + " is too large to encode")
+
+
+def _msgpack_encode(value, output):
+
+    if value is None:
+        output.append(0xc0)
+    elif value is True:
+        output.append(0xc3)
+    elif value is False:
+        output.append(0xc2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            output.append(value)
+        elif -32 <= value < 0:
+            output += struct.pack(">b", value)
+        elif 0 <= value < 0x100:
+            output += b"\xcc" + struct.pack(">B", value)
+        elif 0 <= value < 0x10000:
+            output += b"\xcd" + struct.pack(">H", value)
+        elif 0 <= value < 0x100000000:
+            output += b"\xce" + struct.pack(">I", value)
+        elif 0 <= value < 0x10000000000000000:
+            output += b"\xcf" + struct.pack(">Q", value)
+        elif -0x80 <= value < 0:
+            output += b"\xd0" + struct.pack(">b", value)
+        elif -0x8000 <= value < 0:
+            output += b"\xd1" + struct.pack(">h", value)
+        elif -0x80000000 <= value < 0:
+            output += b"\xd2" + struct.pack(">i", value)
+        elif -0x8000000000000000 <= value < 0:
+            output += b"\xd3" + struct.pack(">q", value)
+        else:
+            raise ValueError("Integer " + str(value) + " is too large to encode")
+    elif isinstance(value, float):
+        output += b"\xcb" + struct.pack(">d", value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf8")
+        _msgpack_head(0xa0, 32, (0xd9, 0xda, 0xdb), len(encoded), output)
+        output += encoded
+    elif isinstance(value, (bytes, bytearray)):
+        _msgpack_head(0x00, 0, (0xc4, 0xc5, 0xc6), len(value), output)
+        output += value
+    elif isinstance(value, (list, tuple)):
+        _msgpack_head(0x90, 16, (None, 0xdc, 0xdd), len(value), output)
+
+        for item in value:
+            _msgpack_encode(item, output)
+    elif isinstance(value, dict):
+        _msgpack_head(0x80, 16, (None, 0xde, 0xdf), len(value), output)
+
+        for key, item in value.items():
+            _msgpack_encode(key, output)
+            _msgpack_encode(item, output)
+    else:
+        raise TypeError("Object of type " + type(value).__name__ + " is not MessagePack serializable")
+
+
+#Fixed width MessagePack types, keyed by type code: (struct format, size)
+MSGPACK_FIXED = {
+    0xca: (">f", 4), 0xcb: (">d", 8),
+    0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+    0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8)
+}
+
+#Variable length MessagePack types, keyed by type code: (kind, struct format of the length, size of the length)
+MSGPACK_SIZED = {
+    0xc4: ("bin", ">B", 1), 0xc5: ("bin", ">H", 2), 0xc6: ("bin", ">I", 4),
+    0xd9: ("str", ">B", 1), 0xda: ("str", ">H", 2), 0xdb: ("str", ">I", 4),
+    0xdc: ("array", ">H", 2), 0xdd: ("array", ">I", 4),
+    0xde: ("map", ">H", 2), 0xdf: ("map", ">I", 4)
+}
+
+
+def _msgpack_decode(data, position):
+
+    code = data[position]
+    position = position + 1
+
+    if code < 0x80:
+        return code, position
+
+    if code >= 0xe0:
+        return code - 0x100, position
+
+    if code == 0xc0:
+        return None, position
+
+    if code == 0xc2:
+        return False, position
+
+    if code == 0xc3:
+        return True, position
+
+    if code in MSGPACK_FIXED:
+        fmt, size = MSGPACK_FIXED[code]
+        return struct.unpack_from(fmt, data, position)[0], position + size
+
+    if 0xa0 <= code <= 0xbf:
+        kind, length = "str", code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, length = "array", code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, length = "map", code & 0x0f
+    elif code in MSGPACK_SIZED:
+        kind, fmt, size = MSGPACK_SIZED[code]
+        length = struct.unpack_from(fmt, data, position)[0]
+        position = position + size
+    else:
+        raise ValueError("Unsupported MessagePack type 0x" + format(code, "02x"))
+
+    if kind == "str":
+        return str(data[position:position + length], "utf8"), position + length
+
+    if kind == "bin":
+        return bytes(data[position:position + length]), position + length
+
+    if kind == "array":
+        returnValue = []
+
+        for _ in range(length):
+            item, position = _msgpack_decode(data, position)
+            returnValue.append(item)
+
+        return returnValue, position
+
+    returnValue = {}
+
+    for _ in range(length):
+        key, position = _msgpack_decode(data, position)
+        item, position = _msgpack_decode(data, position)
+        returnValue[key] = item
+
+    return returnValue, position
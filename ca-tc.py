@@ -1,7 +1,6 @@
 import csv
 import os
 import json
-import requests
 import shutil
 from urllib.parse import urlparse
 import zipfile
@@ -10,13 +9,18 @@ import logging
 import logging.handlers as handlers
 import sys
 from datetime import datetime
-from progress.bar import Bar
 import time
-import hashlib
 from yaspin import yaspin
 from bson.objectid import ObjectId
 import mysql.connector #pip3 install mysql-connector-python
 import argparse
+import sqlite_batch
+import mysql_bulk
+import canonical_json
+import source_download
+import zip_source
+import incremental_import
+import run_report
 
 #https://wwwapps.tc.gc.ca/Saf-Sec-Sur/2/CCARCS-RIACC/download/ccarcsdb.zip
 
@@ -26,6 +30,7 @@ def setup(args):
     global applicationName
     global settings
     global import_sql
+    global runReport
 
     settings = {}
 
@@ -44,6 +49,9 @@ def setup(args):
         logger.setLevel(logging.INFO)
 
         logger.info(applicationName + " application started.")
+
+        #Time each stage of the run
+        runReport = run_report.run_report(os.path.splitext(os.path.basename(__file__))[0], filePath, logger)
         
         #Make sure the settings file exists
         if os.path.exists(filePath + 'settings.json') == False:
@@ -60,6 +68,7 @@ def setup(args):
         settings['filePath'] = filePath
         settings['tempPath']  = os.path.join(settings['filePath'] , "tmp")
         settings['download_url'] = args.download_url
+        settings['force_download'] = args.force_download
 
         #By default, do not skip the download
         if "skip_download" not in settings:
@@ -86,6 +95,22 @@ def setup(args):
         if "database" not in settings['mySQL']:
             raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
 
+        #Get the storage format of active registration documents, defaulting to "json"
+        if 'registration_storage' not in settings:
+            settings['registration_storage'] = "json"
+
+        settings['registration_storage'] = str(settings['registration_storage']).lower()
+
+        if settings['registration_storage'] not in ["json", "zlib"]:
+            raise Exception("The registration storage format (registration_storage) must be json or zlib.")
+
+        settings['staging_batch_size'] = sqlite_batch.get_batch_size(settings)
+        settings['bulk_load_mode'] = mysql_bulk.get_mode(settings)
+        settings['bulk_load_batch_size'] = mysql_bulk.get_batch_size(settings)
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+        settings['read_from_zip'] = zip_source.get_read_from_zip(settings)
+        settings['incremental_import'] = incremental_import.is_enabled(settings)
+
         #Get the SQL mode, defaulting to "memory"
         if 'local_database_mode' not in settings:
             settings['local_database_mode'] = "memory"
@@ -113,7 +138,7 @@ def setup(args):
 
         #Create the temporary tables in memory
         cursor.execute("CREATE TABLE aircraft (registration text NOT NULL, registration_type text, manufacturer_name_common text, manufacturer_name text, model text, serial_number text, eligibility_basis text, category text, import_date text, engine_manufacturer text, power_glider text, engine_category text, engine_count integer, seat_count integer, weight real, sale_reported text, issue_date text, effective_date text, ineffective_date text, use text, flight_authority text, manufacture_or_assembly text, country_manufactured text, manufactured_date text, base_operations_country text,  base_operations_province text, base text, type_certificate_number text, status text, multiple_owners text, modified_date text, icao_hex text NOT NULL, ex_military_registration text)")
-        cursor.execute("CREATE TABLE owners (registration text NOT NULL, name text, trade_name text, street text, city text, province text, postal_code text, country text, type text, status text, care_of text, region text, mail_recipient text)")   
+        cursor.execute(owner.CREATE_STATEMENT)
     
     except Exception as ex:
         logger.error(ex)
@@ -124,9 +149,15 @@ def main():
 
     try:
 
+        sourceFile = None
+
         #Get the files
         if settings['skip_download'] != True:
-            download()
+            sourceFile = download()
+
+            #Nothing has changed since the last import
+            if sourceFile is None:
+                exitApp()
 
         #Import the aircraft file
         import_aircraft()
@@ -137,6 +168,10 @@ def main():
         #Export the data to disk
         export_data()
 
+        #Remember the file that was imported, so an unchanged file is skipped next time
+        if sourceFile is not None:
+            sourceFile.remember()
+
         #Success, exit the app
         exitApp()
 
@@ -170,12 +205,9 @@ def exitApp(exitCode=None):
     if exitCode != 0:
         logger.info("Error; Exiting with code " + str(exitCode))
 
-    sys.exit(exitCode)
-
+    runReport.finish(exitCode, settings.get('mySQL'))
 
-def totalLines(filename):
-    with open(filename, encoding = "ISO-8859-1") as f:
-        return (sum(1 for line in f)) - 1
+    sys.exit(exitCode)
 
 
 def download():
@@ -197,24 +229,39 @@ def download():
     #Get the file from the TC
     logger.info("Beginning file download from Transport Canada.  File: " + settings['download_url'])
 
+    sourceFile = source_download.source_file(settings['download_url'], settings['filePath'])
+
+    runReport.begin("Downloading")
+
     with yaspin(text="Downloading file from Transport Canada...") as spinner:
-        response = requests.get(settings['download_url'])
+
+        #Streamed to disk; skipped if the file has not changed since the last import, unless forced
+        if sourceFile.fetch(downloadFileDestination, settings['force_download'] == False) == False:
+            spinner.text = "File has not changed since the last import.\n"
+            spinner.ok()
+
+            logger.info("File has not changed since the last import.")
+            runReport.end()
+            return None
 
         spinner.text = "Completed file download from Transport Canada.\n"
         spinner.ok()
-   
-    if response.status_code != 200:
-        raise Exception("Response code from download was " + str(response.status_code) + ".")
 
-    #Write the file to disk
-    with open(downloadFileDestination, 'wb') as downloadedFile:
-        downloadedFile.write(response.content)
+    if sourceFile.resumed == True:
+        logger.info("Resumed the partial download from where it stopped.")
 
     logger.info("Completed file download from Transport Canada.")
+    runReport.end(bytes=sourceFile.bytesDownloaded)
+
+    #The files are read straight out of the ZIP file instead
+    if settings['read_from_zip'] == True:
+        return sourceFile
 
     #Extract the file
     logger.info("Extracting ZIP file.")
 
+    runReport.begin("Extracting")
+
     with zipfile.ZipFile(downloadFileDestination, 'r') as downloadedFile:
 
         with yaspin(text="Extracting files...") as spinner:
@@ -224,6 +271,7 @@ def download():
             spinner.ok()
 
     logger.info("ZIP file extracted.")
+    runReport.end()
 
     #Delete the original zip file
     os.remove(downloadFileDestination)
@@ -237,26 +285,22 @@ def download():
         if ".txt.txt" in extractedFile:
             os.rename(os.path.join(settings['tempPath'], extractedFile), os.path.join(settings['tempPath'], os.path.splitext(extractedFile)[0]))
 
+    return sourceFile
+
 
 def import_aircraft():
-    
-    aircraftFile = os.path.join(settings['tempPath'], "carscurr.txt")
 
     logger.info("Beginning Aircraft Import.")
 
-    #Make sure the file exists
-    if os.path.exists(aircraftFile) == False:
-        raise Exception ("Aircraft file does not exist.  Expected " + aircraftFile)
+    runReport.begin("Importing aircraft")
 
-    rowCount = totalLines(aircraftFile)
-
-    with open(aircraftFile, "r", encoding = "ISO-8859-1") as csvfile:
-        fileReader = csv.reader(x.replace('\0', '') for x in csvfile)
+    with zip_source.open_text(settings, "carscurr.txt", "ISO-8859-1") as aircraftText:
+        fileReader = csv.reader(x.replace('\0', '') for x in aircraftText.file)
 
         #Skip the headers
         fileReader.__next__()
 
-        with Bar("Importing Aircraft...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Aircraft...", max=aircraftText.total()) as bar, sqlite_batch.insert_batch(import_sql, aircraft.INSERT_STATEMENT, settings['staging_batch_size']) as aircraftBatch:
 
             for row in fileReader:
 
@@ -301,36 +345,31 @@ def import_aircraft():
                 tmpAircraft.set_icao_hex(str(row[42]).strip())
                 tmpAircraft.ex_military_registration = str(row[45]).strip()
 
-                #Store it in the DB
-                tmpAircraft.commit()
+                #Queue it for the DB
+                tmpAircraft.commit(aircraftBatch)
 
                 #Increment the bar
-                bar.next()
+                aircraftText.advance(bar)
 
             bar.finish()
 
-        logger.info("Completed Aircraft Import, total row count " + str(rowCount) + ".")
+        logger.info("Completed Aircraft Import, total row count " + str(aircraftText.rows) + ".")
+        runReport.end(aircraftText.rows, staging_insert_seconds=aircraftBatch.seconds)
 
 
 def import_owners():
 
-    registrationFile = os.path.join(settings['tempPath'], "carsownr.txt")
-
     logger.info("Beginning Owner Import.")
 
-    #Make sure the file exists
-    if os.path.exists(registrationFile) == False:
-        raise Exception ("Owner file does not exist.  Expected " + registrationFile)
-
-    rowCount = totalLines(registrationFile)
+    runReport.begin("Importing owners")
 
-    with open(registrationFile, "r", encoding = "ISO-8859-1") as csvfile:
-        fileReader = csv.reader(x.replace('\0', '') for x in csvfile)
+    with zip_source.open_text(settings, "carsownr.txt", "ISO-8859-1") as ownerText:
+        fileReader = csv.reader(x.replace('\0', '') for x in ownerText.file)
 
         #Skip the headers
         fileReader.__next__()
 
-        with Bar("Importing Owners...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Owners...", max=ownerText.total()) as bar, sqlite_batch.insert_batch(import_sql, owner.INSERT_STATEMENT, settings['staging_batch_size']) as ownerBatch:
 
             for row in fileReader:
 
@@ -355,47 +394,103 @@ def import_owners():
                 tmpOwner.region = str(row[15]).strip()
                 tmpOwner.set_mail_recipient(str(row[18]).strip())               
 
-                #Store it in the DB
-                tmpOwner.commit()
+                #Queue it for the DB
+                tmpOwner.commit(ownerBatch)
 
                 #Increment the bar
-                bar.next()
+                ownerText.advance(bar)
 
         bar.finish()
 
-    logger.info("Completed Owner Import, total row count " + str(rowCount) + ".")
+    logger.info("Completed Owner Import, total row count " + str(ownerText.rows) + ".")
+    runReport.end(ownerText.rows, staging_insert_seconds=ownerBatch.seconds)
+
+
+def build_owner(row):
+
+    objOwner = {}
+    objOwner['name'] = row['name']
+
+    if row['trade_name'] != '':
+        objOwner['trade_name'] = row['trade_name']
+
+    objOwner['street'] = json.loads(row['street'])
+    objOwner['city'] = row['city']
+
+    if row['province'] != '':
+        objOwner['province'] = row['province']
+
+    if row['postal_code'] != '':
+        objOwner['postal_code'] = row['postal_code']
+
+    objOwner['country'] = row['country']
+    objOwner['type'] = row['type']
+
+    if row['care_of'] != '':
+        objOwner['care_of'] = row['care_of']
+
+    objOwner['region'] = row['region']
+    objOwner['mail_recipient'] = row['mail_recipient']
+
+    return objOwner
+
+
+def load_active_owners():
+
+    #One pass over the owners table instead of a query per aircraft; each registration's owners stay in the order they were imported
+    ownersCur = import_sql.cursor()
+    ownersCur.row_factory = sqlite3.Row
+    ownersCur.execute("SELECT * FROM owners WHERE status = 'Active' ORDER BY rowid")
+
+    activeOwners = {}
+
+    for row in sqlite_batch.fetch_chunks(ownersCur, settings['staging_batch_size']):
+        activeOwners.setdefault(row['registration'], []).append(build_owner(row))
+
+    return activeOwners
 
 
 def export_data():
 
     import_sql.row_factory = sqlite3.Row
     aircraftCur = import_sql.cursor()
-    ownersCur = import_sql.cursor()
 
     logger.info("Querying aircraft data from SQLite.")
 
     with yaspin(text="Querying aircraft data from SQLite...") as spinner:
 
-        aircraftCur.execute("SELECT aircraft.registration, aircraft.manufacturer_name_common, aircraft.manufacturer_name, aircraft.model, aircraft.serial_number, \
+        sqlQuery = "SELECT aircraft.registration, aircraft.manufacturer_name_common, aircraft.manufacturer_name, aircraft.model, aircraft.serial_number, \
                             aircraft.eligibility_basis, aircraft.category, aircraft.import_date, aircraft.engine_manufacturer, aircraft.power_glider, \
                             aircraft.engine_category, aircraft.engine_count, aircraft.seat_count, aircraft.weight, aircraft.issue_date, aircraft.effective_date, \
                             aircraft.use, aircraft.flight_authority, aircraft.manufacture_or_assembly, aircraft.country_manufactured, \
                             aircraft.manufactured_date, aircraft.base_operations_country, aircraft.base_operations_province, aircraft.base, \
                             aircraft.type_certificate_number, aircraft.status, aircraft.modified_date, aircraft.icao_hex, \
                             aircraft.ex_military_registration \
-                            FROM aircraft WHERE ineffective_date = ''")
+                            FROM aircraft WHERE ineffective_date = ''"
+
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        aircraftCur.execute(sqlQuery)
 
-        arrayAircraft = aircraftCur.fetchall()
+        arrayAircraft = sqlite_batch.fetch_chunks(aircraftCur, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(arrayAircraft)) + " rows of aircraft data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of aircraft data.")
+
+    runReport.begin("Grouping active owners")
+
+    activeOwners = load_active_owners()
+
+    runReport.end(sum(len(owners) for owners in activeOwners.values()))
+
+    logger.info("Grouped the active owners of " + str(len(activeOwners)) + " registrations.")
 
     registrationsDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     logger.info("Creating temp table in MySQL.")
 
@@ -409,12 +504,26 @@ def export_data():
                         ) LIMIT 1;")
     
     mysqlCur.execute("CREATE TEMPORARY TABLE import (icao_hex char(6) NOT NULL, registration varchar(8) NOT NULL, data json NULL, hash char(32) NOT NULL, KEY icao_hex (icao_hex), KEY hash (hash));")
+
+    changeFilter = None
+
+    if settings['incremental_import'] == True:
+
+        runReport.begin("Loading live registration hashes")
+
+        #Only new and changed registrations are sent to MySQL; the rest are already live with the same hash
+        changeFilter = incremental_import.change_filter(mysqlCur, "registrations", "CA-TC")
+
+        logger.info("Loaded " + str(changeFilter.liveCount) + " live registration hashes from MySQL.")
+        runReport.end(changeFilter.liveCount)
     
     logger.info("Exporting data to MySQL.")
 
-    sqlInsert = "INSERT INTO import (icao_hex, registration, data, hash) VALUES (%s,%s,%s,%s)"
+    runReport.begin("Exporting data to MySQL")
 
-    with Bar("Exporting Data to MySQL...", max=len(arrayAircraft)) as bar:
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import", ['icao_hex', 'registration', 'data', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+
+    with run_report.throttled_bar("Exporting Data to MySQL...", max=rowCount) as bar:
 
         for aircraft in arrayAircraft:
 
@@ -495,67 +604,71 @@ def export_data():
                 objCompleted['base_operations']['base'] = aircraft['base']
 
             #Get the owner data
-            ownersCur.execute("SELECT * FROM owners WHERE registration = '" + objCompleted['registration'] + "' AND status = 'Active'")
-
-            arrayOwners = ownersCur.fetchall()
+            objCompleted['owners'] = activeOwners.get(objCompleted['registration'], [])
 
-            for owner in arrayOwners:
+            data, dataHash = canonical_json.encode(objCompleted, settings['hash_scheme'])
 
-                objOwner = {}
-                objOwner['name'] = owner['name']
+            if changeFilter is None or changeFilter.changed(objCompleted['icao_hex'], dataHash):
+                importLoader.add((objCompleted['icao_hex'], objCompleted['registration'], data, dataHash, ))
 
-                if owner['trade_name'] != '':
-                    objOwner['trade_name'] = owner['trade_name']
-
-                objOwner['street'] = json.loads(owner['street'])
-                objOwner['city'] = owner['city']
+            #Increment the bar
+            bar.next()
 
-                if owner['province'] != '':
-                    objOwner['province'] = owner['province']
+        bar.finish()
 
-                if owner['postal_code'] != '':
-                    objOwner['postal_code'] = owner['postal_code']
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
 
-                objOwner['country'] = owner['country']
-                objOwner['type'] = owner['type']
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
 
-                if owner['care_of'] != '':
-                    objOwner['care_of'] = owner['care_of']
+    logger.info("Committing import data to MySQL.")
 
-                objOwner['region'] = owner['region']
-                objOwner['mail_recipient'] = owner['mail_recipient']
+    runReport.begin("Committing import data to MySQL")
 
-                objCompleted['owners'].append(objOwner)
+    with yaspin(text="Committing import data to MySQL...") as spinner:
+        registrationsDb.commit()
 
-            mysqlCur.execute(sqlInsert, (objCompleted['icao_hex'], objCompleted['registration'], json.dumps(objCompleted), hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+        spinner.text = "Committed " + str(importLoader.count) + " rows of import data to MySQL.\n"
+        spinner.ok()
 
-            #Increment the bar
-            bar.next()
+    logger.info("Committed " + str(importLoader.count) + " rows of import data to MySQL.")
+    runReport.end()
 
-        bar.finish()
+    if changeFilter is not None:
 
-    logger.info("Committing import data to MySQL.")
+        runReport.begin("Sending vanished registrations")
 
-    with yaspin(text="Committing import data to MySQL...") as spinner:
+        #Registrations that were live but not in this file are sent as keys only
+        vanishedCount = changeFilter.send_vanished(mysqlCur, settings['bulk_load_mode'], settings['bulk_load_batch_size'])
         registrationsDb.commit()
 
-        spinner.text = "Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.\n"
-        spinner.ok()
+        runReport.end(vanishedCount)
 
-    logger.info("Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.")
+        logger.info(changeFilter.summary())
+        print(changeFilter.summary())
 
     #Delete registrations that don't exist in the import
     logger.info("Deleting deregistered registrations.")
 
+    runReport.begin("Deleting deregistered registrations")
+
     with yaspin(text="Deleting deregistered registrations...") as spinner:
 
-        mysqlCur.execute("UPDATE registrations, \
-                            (SELECT registrations.unique_id FROM registrations \
-                            LEFT OUTER JOIN import ON registrations.icao_hex = import.icao_hex \
-                            INNER JOIN sources ON registrations.source = sources.unique_id \
-                            WHERE import.icao_hex IS NULL AND registrations.deleted IS NULL AND sources.agency = 'CA-TC') as d \
-                        SET registrations.deleted = CURRENT_TIMESTAMP \
-                        WHERE registrations.unique_id = d.unique_id;")
+        if changeFilter is None:
+            mysqlCur.execute("UPDATE registrations, \
+                                (SELECT registrations.unique_id FROM registrations \
+                                LEFT OUTER JOIN import ON registrations.icao_hex = import.icao_hex \
+                                INNER JOIN sources ON registrations.source = sources.unique_id \
+                                WHERE import.icao_hex IS NULL AND registrations.deleted IS NULL AND sources.agency = 'CA-TC') as d \
+                            SET registrations.deleted = CURRENT_TIMESTAMP \
+                            WHERE registrations.unique_id = d.unique_id;")
+        else:
+            mysqlCur.execute("UPDATE registrations \
+                                INNER JOIN vanished ON registrations.icao_hex = vanished.icao_hex \
+                                INNER JOIN sources ON registrations.source = sources.unique_id \
+                            SET registrations.deleted = CURRENT_TIMESTAMP \
+                            WHERE registrations.deleted IS NULL AND sources.agency = 'CA-TC';")
 
         logger.info("Committing deletion of deregistered registrations to MySQL.")
         registrationsDb.commit()
@@ -564,10 +677,13 @@ def export_data():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " missing registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
     #Delete registrations if we have a new record coming in where the hashes don't match
     logger.info("Deleting obsolete registrations.")
 
+    runReport.begin("Deleting obsolete registrations")
+
     with yaspin(text="Deleting obsolete registrations...") as spinner:
 
         mysqlCur.execute("UPDATE registrations, \
@@ -585,10 +701,20 @@ def export_data():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " obsolete registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
+
+    #A second record for a registration skipped as unchanged marks that registration obsolete above, so it is made live again
+    if changeFilter is not None and len(changeFilter.rematched) > 0:
+        restoredCount = changeFilter.restore_rematched(mysqlCur)
+        registrationsDb.commit()
+
+        logger.info("Restored " + str(restoredCount) + " unchanged registrations sharing an ICAO hex with a changed one.")
 
     # Create new registrations and mark deleted registrations with a matching has as undeleted
     logger.info("Creating new registrations.")
 
+    runReport.begin("Creating new registrations")
+
     with yaspin(text="Creating new registrations...") as spinner:
 
         mysqlCur.execute("INSERT INTO registrations (icao_hex, registration, data,  hash, source) \
@@ -603,6 +729,45 @@ def export_data():
         spinner.ok("")
 
     logger.info("Created " + str(mysqlCur.rowcount) + " new registrations.")
+    runReport.end(mysqlCur.rowcount)
+
+    #Bring the active projection in line with the live rows
+    logger.info("Refreshing active registrations.")
+
+    runReport.begin("Refreshing active registrations")
+
+    with yaspin(text="Refreshing active registrations...") as spinner:
+
+        mysqlCur.execute("DELETE registrations_active FROM registrations_active \
+                            LEFT OUTER JOIN registrations ON registrations.unique_id = registrations_active.unique_id AND registrations.deleted IS NULL \
+                            WHERE registrations.unique_id IS NULL;")
+
+        removedCount = mysqlCur.rowcount
+
+        #Documents are either copied as JSON or stored compressed by MySQL's zlib COMPRESS()
+        if settings['registration_storage'] == "zlib":
+            dataColumns = "NULL, COMPRESS(CAST(registrations.data AS CHAR))"
+        else:
+            dataColumns = "registrations.data, NULL"
+
+        mysqlCur.execute("INSERT INTO registrations_active (icao_hex, unique_id, registration, data, data_zlib, hash, source) \
+                            (SELECT CONV(registrations.icao_hex, 16, 10), registrations.unique_id, registrations.registration, " + dataColumns + ", registrations.hash, registrations.source FROM registrations \
+                            LEFT OUTER JOIN registrations_active ON registrations_active.unique_id = registrations.unique_id \
+                            WHERE registrations.deleted IS NULL AND registrations_active.unique_id IS NULL AND registrations.icao_hex REGEXP '^[0-9A-Fa-f]{6}$');")
+
+        addedCount = mysqlCur.rowcount
+
+        #Signal the API to drop its cached registrations
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('registrations') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
+        logger.info("Committing active registrations to MySQL.")
+        registrationsDb.commit()
+
+        spinner.text = "Removed " + str(removedCount) + " and added " + str(addedCount) + " active registrations.\n"
+        spinner.ok("")
+
+    logger.info("Removed " + str(removedCount) + " and added " + str(addedCount) + " active registrations.")
+    runReport.end(removedCount + addedCount)
     
     mysqlCur.close()
     registrationsDb.close()
@@ -618,6 +783,9 @@ def parseYYYYMMDD(value):
 
 class owner():
 
+    CREATE_STATEMENT = "CREATE TABLE owners (registration text NOT NULL, name text, trade_name text, street text, city text, province text, postal_code text, country text, type text, status text, care_of text, region text, mail_recipient text)"
+    INSERT_STATEMENT = "INSERT INTO owners (registration, name, trade_name, street, city, province, postal_code, country, type, status, care_of, region, mail_recipient) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)"
+
     def __init__(self):
         self.registration = ""
         self.name = ""
@@ -674,12 +842,8 @@ class owner():
         if str(value).lower() == "n":
             self.mail_recipient = "No"
     
-    def commit(self):
-        
-        dbCursor = import_sql.cursor()
+    def commit(self, batch):
 
-        insert_statement = "INSERT INTO owners (registration, name, trade_name, street, city, province, postal_code, country, type, status, care_of, region, mail_recipient) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)"
-        
         parameters = (self.registration,
                         self.name,
                         self.trade_name,
@@ -694,13 +858,8 @@ class owner():
                         self.region,
                         self.mail_recipient)
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
-
-        #Destroy itself
+        #Queue the record for the table
+        batch.add(parameters)
 
 
     def toDict(self):
@@ -708,6 +867,8 @@ class owner():
 
 class aircraft():
 
+    INSERT_STATEMENT = "INSERT INTO aircraft (registration, registration_type, manufacturer_name_common, manufacturer_name, model, serial_number, eligibility_basis, category, import_date, engine_manufacturer, power_glider, engine_category, engine_count, seat_count, weight, sale_reported, issue_date, effective_date, ineffective_date, use, flight_authority, manufacture_or_assembly, country_manufactured, manufactured_date, base_operations_country,  base_operations_province, base, type_certificate_number, status, multiple_owners, modified_date, icao_hex, ex_military_registration) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+
     def __init__(self):
         self.registration = ""
         self.registration_type = ""
@@ -829,23 +990,18 @@ class aircraft():
     def toDict(self):
         return self.__dict__
 
-    def commit(self):
-
-        dbCursor = import_sql.cursor()
+    def commit(self, batch):
 
-        insert_statement = "INSERT INTO aircraft (registration, registration_type, manufacturer_name_common, manufacturer_name, model, serial_number, eligibility_basis, category, import_date, engine_manufacturer, power_glider, engine_category, engine_count, seat_count, weight, sale_reported, issue_date, effective_date, ineffective_date, use, flight_authority, manufacture_or_assembly, country_manufactured, manufactured_date, base_operations_country,  base_operations_province, base, type_certificate_number, status, multiple_owners, modified_date, icao_hex, ex_military_registration) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
         parameters = (self.registration, self.registration_type, self.manufacturer_name_common, self.manufacturer_name, self.model, self.serial_number, self.eligibility_basis, self.category, self.import_date, self.engine_manufacturer, self.power_glider, self.engine_category, self.engine_count, self.seat_count, self.weight, self.sale_reported, self.issue_date, self.effective_date, self.ineffective_date, self.use, self.flight_authority, self.manufacture_or_assembly, self.country_manufactured, self.manufactured_date, self.base_operations_country, self.base_operations_province, self.base, self.type_certificate_number, self.status, self.multiple_owners, self.modified_date, self.icao_hex, self.ex_military_registration)
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
+        #Queue the record for the table
+        batch.add(parameters)
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Imports the Transport Canada Registry')
     parser.add_argument(dest='download_url', metavar="download_url", help='URL of the Transport Canada registry to download.')
+    parser.add_argument('--force-download', dest='force_download', action='store_true', help='Download and import the file even if it has not changed since the last import.')
 
     args = parser.parse_args()
 
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+#Serialises a record to JSON once and hashes those same bytes, under a versioned hash scheme shared by the importers and the API.
+#  Every writer of a table must use the same scheme, or the same record would be stored twice under different hashes.
+import json
+import hashlib
+
+try:
+    import xxhash #pip3 install xxhash; only required for hash scheme 3
+except ImportError:
+    xxhash = None
+
+
+DEFAULT_HASH_SCHEME = 1
+
+#Scheme 1 is the original json.dumps() text with MD5.  Later schemes use compact JSON with sorted keys, so the same record always
+#  encodes to the same bytes no matter how its dict was built.
+HASH_SCHEMES = {
+    1 : "MD5 of json.dumps() output",
+    2 : "BLAKE2b-128 of compact JSON with sorted keys",
+    3 : "XXH3-128 of compact JSON with sorted keys (requires the xxhash package)"
+}
+
+
+def get_hash_scheme(settings):
+
+    #Get the hash scheme, defaulting to DEFAULT_HASH_SCHEME
+    if "hash_scheme" not in settings:
+        return DEFAULT_HASH_SCHEME
+
+    if str(settings['hash_scheme']).isnumeric() != True or int(settings['hash_scheme']) not in HASH_SCHEMES:
+        raise Exception("The hash scheme (hash_scheme) must be one of " + ", ".join(str(scheme) for scheme in HASH_SCHEMES) + ".")
+
+    if int(settings['hash_scheme']) == 3 and xxhash is None:
+        raise Exception("Hash scheme 3 (hash_scheme) requires the xxhash package; install it with pip3 install xxhash.")
+
+    return int(settings['hash_scheme'])
+
+
+def encode(value, scheme=DEFAULT_HASH_SCHEME):
+
+    #Returns the JSON text of value and the 32 character hex hash of its UTF-8 bytes
+    if scheme == 1:
+        text = json.dumps(value)
+    else:
+        text = json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+    return text, digest(text.encode("utf-8"), scheme)
+
+
+def digest(data, scheme=DEFAULT_HASH_SCHEME):
+
+    if scheme == 1:
+        return hashlib.md5(data).hexdigest()
+
+    if scheme == 2:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    if scheme == 3:
+        return xxhash.xxh3_128_hexdigest(data)
+
+    raise ValueError("Unknown hash scheme " + str(scheme))
@@ -8,11 +8,13 @@ import logging.handlers as handlers
 import sys
 from datetime import datetime
 import time
-from progress.bar import Bar
-import hashlib
 from yaspin import yaspin
 import mysql.connector #pip3 install mysql-connector-python
 import argparse
+import sqlite_batch
+import mysql_bulk
+import canonical_json
+import run_report
 
 #https://aeroapi.flightaware.com/aeroapi/airports/{AIRPORT_ICAO}/flights/arrivals?type=Airline
 
@@ -27,6 +29,7 @@ def setup(args):
     global applicationName
     global settings
     global import_sql
+    global runReport
 
     settings = {}
 
@@ -45,6 +48,9 @@ def setup(args):
         logger.setLevel(logging.DEBUG)
 
         logger.info(applicationName + " application started.")
+
+        #Time each stage of the run
+        runReport = run_report.run_report(os.path.splitext(os.path.basename(__file__))[0], filePath, logger)
         
         #Make sure the settings file exists
         if os.path.exists(filePath + 'settings.json') == False:
@@ -125,6 +131,11 @@ def setup(args):
         if str(settings['flightAware']['sleep_duration_seconds']).isnumeric() != True:
             raise Exception ("Invalid flightAware -> sleep_duration_seconds in settings.json")
 
+        settings['staging_batch_size'] = sqlite_batch.get_batch_size(settings)
+        settings['bulk_load_mode'] = mysql_bulk.get_mode(settings)
+        settings['bulk_load_batch_size'] = mysql_bulk.get_batch_size(settings)
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+
         #Get the SQL mode, defaulting to "memory"
         if 'local_database_mode' not in settings:
             settings['local_database_mode'] = "memory"
@@ -164,7 +175,9 @@ def main():
     try:
 
         #Request the data
+        runReport.begin("Requesting arrivals")
         get_arrivals()
+        runReport.end()
 
         logger.info("Done processing arrival data.")
         print("Done processing arrival data.")
@@ -173,7 +186,9 @@ def main():
         print("Sleeping " + str(settings['flightAware']['sleep_duration_seconds']) + " seconds prior to getting scheduled arrivals.")
         time.sleep(settings['flightAware']['sleep_duration_seconds']) 
 
+        runReport.begin("Requesting scheduled arrivals")
         get_scheduled_arrivals()
+        runReport.end()
 
         logger.info("Done processing scheduled arrival data.")
         print("Done processing scheduled arrival data.")
@@ -207,6 +222,8 @@ def exitApp(exitCode=None):
     if exitCode != 0:
         logger.info("Error; Exiting with code " + str(exitCode))
 
+    runReport.finish(exitCode, settings.get('mySQL'))
+
     sys.exit(exitCode)
 
 
@@ -329,19 +346,23 @@ def export_data():
 
     with yaspin(text="Querying data from SQLite...") as spinner:
 
-        curFlightNumber.execute("SELECT airline_designator, flight_number, ident, origin, destination FROM flight_numbers")
+        sqlQuery = "SELECT airline_designator, flight_number, ident, origin, destination FROM flight_numbers"
+
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        curFlightNumber.execute(sqlQuery)
 
-        arrayFlightNumbers = curFlightNumber.fetchall()
+        arrayFlightNumbers = sqlite_batch.fetch_chunks(curFlightNumber, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(arrayFlightNumbers)) + " rows of data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of data.")
 
     flightNumbersDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     logger.info("Creating temp table in MySQL.")
 
@@ -360,9 +381,11 @@ def export_data():
      
     logger.info("Exporting data to MySQL.")
 
-    sqlInsert = "INSERT INTO import (airline_designator, flight_number, ident, origin, destination, hash) VALUES (%s,%s,%s,%s,%s,%s)"
+    runReport.begin("Exporting data to MySQL")
 
-    with Bar("Exporting Data to MySQL...", max=len(arrayFlightNumbers)) as bar:
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import", ['airline_designator', 'flight_number', 'ident', 'origin', 'destination', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+
+    with run_report.throttled_bar("Exporting Data to MySQL...", max=rowCount) as bar:
 
         for objFlight in arrayFlightNumbers:
 
@@ -374,15 +397,23 @@ def export_data():
             objCompleted['origin'] = objFlight['origin']
             objCompleted['destination'] = objFlight['destination']
 
-            mysqlCur.execute(sqlInsert, (objCompleted['airline_designator'], objCompleted['flight_number'], objCompleted['ident'], objCompleted['origin'], objCompleted['destination'], hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+            importLoader.add((objCompleted['airline_designator'], objCompleted['flight_number'], objCompleted['ident'], objCompleted['origin'], objCompleted['destination'], canonical_json.encode(objCompleted, settings['hash_scheme'])[1], ))
 
             #Increment the bar
             bar.next()
 
         bar.finish()
 
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
+
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
+
     logger.info("Committing import data to MySQL.")
 
+    runReport.begin("Committing import data to MySQL")
+
     with yaspin(text="Committing import data to MySQL...") as spinner:
         flightNumbersDb.commit()
 
@@ -390,10 +421,28 @@ def export_data():
         spinner.ok()
 
     logger.info("Committed import data to MySQL.")
+    runReport.end()
+
+    #The same flights stored under another hash scheme take the current hash, so they are extended below rather than duplicated
+    logger.info("Adopting the current hash scheme for known flight numbers.")
+
+    runReport.begin("Adopting the current hash scheme for known flight numbers")
+
+    mysqlCur.execute("UPDATE IGNORE flight_numbers INNER JOIN import ON import.ident <=> flight_numbers.ident \
+                        AND import.airline_designator <=> flight_numbers.airline_designator AND import.flight_number <=> flight_numbers.flight_number \
+                        AND import.origin <=> flight_numbers.origin AND import.destination <=> flight_numbers.destination AND import.hash <> flight_numbers.hash \
+                    SET flight_numbers.hash = import.hash;")
+
+    flightNumbersDb.commit()
+
+    logger.info("Re-hashed " + str(mysqlCur.rowcount) + " known flight numbers.")
+    runReport.end(mysqlCur.rowcount)
 
     # Add the data to the database
     logger.info("Creating new new flight numbers.")
 
+    runReport.begin("Creating new flight numbers")
+
     with yaspin(text="Creating new flight numbers...") as spinner:
 
         mysqlCur.execute("INSERT INTO flight_numbers (airline_designator, flight_number, ident, origin, destination, expires, hash, source) \
@@ -407,6 +456,39 @@ def export_data():
         spinner.ok("")
 
     logger.info("Created or updated " + str(mysqlCur.rowcount) + " flight numbers.")
+    runReport.end(mysqlCur.rowcount)
+
+    #Rebuild the materialised conflicts for the idents touched by this import
+    logger.info("Refreshing flight conflicts.")
+
+    runReport.begin("Refreshing flight conflicts")
+
+    with yaspin(text="Refreshing flight conflicts...") as spinner:
+
+        mysqlCur.execute("DELETE flight_conflicts FROM flight_conflicts \
+                            INNER JOIN (SELECT DISTINCT ident FROM import) AS touched ON touched.ident = flight_conflicts.ident;")
+
+        mysqlCur.execute("INSERT INTO flight_conflicts (flight_number_id, ident, expires) \
+                            (SELECT flight_numbers.unique_id, flight_numbers.ident, flight_numbers.expires FROM flight_numbers \
+                            INNER JOIN (SELECT flight_numbers.ident FROM flight_numbers \
+                                INNER JOIN (SELECT DISTINCT ident FROM import) AS touched ON touched.ident = flight_numbers.ident \
+                                WHERE flight_numbers.expires > NOW() \
+                                GROUP BY flight_numbers.ident HAVING count(flight_numbers.ident) > 1) AS conflicted ON conflicted.ident = flight_numbers.ident \
+                            WHERE flight_numbers.expires > NOW());")
+
+        conflictCount = mysqlCur.rowcount
+
+        #Tell the API its cached flight lookups are stale
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('flight_numbers') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
+        logger.info("Committing flight conflicts to MySQL.")
+        flightNumbersDb.commit()
+
+        spinner.text = "Recorded " + str(conflictCount) + " conflicting flight numbers.\n"
+        spinner.ok("")
+
+    logger.info("Recorded " + str(conflictCount) + " conflicting flight numbers.")
+    runReport.end(conflictCount)
     
     mysqlCur.close()
     flightNumbersDb.close()
@@ -414,6 +496,8 @@ def export_data():
 
 def process_flights(arryFlights):
 
+    flightBatch = sqlite_batch.insert_batch(import_sql, flight.INSERT_STATEMENT, settings['staging_batch_size'])
+
     for objFlight in arryFlights:
 
         #Ensure the expected data elements are present
@@ -479,11 +563,16 @@ def process_flights(arryFlights):
             logger.info("Skipping flight " + objFlight['fa_flight_id'] + " because the origin -> code_iata was NULL.")
             continue
 
-        tmpFlight.commit()
+        tmpFlight.commit(flightBatch)
+
+    #Write the page of flights to the staging table
+    flightBatch.flush()
 
 
 class flight():
 
+    INSERT_STATEMENT = "INSERT INTO flight_numbers (airline_designator, flight_number, ident, origin, destination) VALUES (?,?,?,?,?)"
+
     def __init__(self):
         self.airline_designator = ""
         self.flight_number = ""
@@ -494,18 +583,12 @@ class flight():
     def toDict(self):
         return self.__dict__
 
-    def commit(self):
+    def commit(self, batch):
 
-        dbCursor = import_sql.cursor()
-
-        insert_statement = "INSERT INTO flight_numbers (airline_designator, flight_number, ident, origin, destination) VALUES (?,?,?,?,?)"
         parameters = (self.airline_designator, self.flight_number, self.ident, self.origin, self.destination)
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
+        #Queue the record for the table
+        batch.add(parameters)
 
 
 
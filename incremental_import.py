@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+#Keeps unchanged records out of an import.  The live (icao_hex, hash) pairs of one source are loaded before exporting; only new or
+#  changed records are sent to MySQL, followed by the keys that were not seen at all.
+import mysql_bulk
+
+
+def is_enabled(settings):
+
+    #Get the incremental import mode, defaulting to false
+    if "incremental_import" not in settings:
+        return False
+
+    if settings['incremental_import'] not in [True, False]:
+        raise Exception("The incremental import mode (incremental_import) must be true or false.")
+
+    return settings['incremental_import']
+
+
+class change_filter():
+
+    def __init__(self, mysqlCur, table, agency):
+        self.table = table
+        self.liveHashes = {}
+        self.matchedHashes = {}
+        self.rematched = []
+        self.skipped = 0
+
+        mysqlCur.execute("SELECT " + table + ".icao_hex, " + table + ".hash FROM " + table + " \
+                            INNER JOIN sources ON sources.unique_id = " + table + ".source \
+                            WHERE " + table + ".deleted IS NULL AND sources.agency = %s;", (agency,))
+
+        for icaoHex, hash in mysqlCur:
+
+            #A key with more than one live record is always sent, so the merge settles which records stay
+            if icaoHex in self.liveHashes and self.liveHashes[icaoHex] != hash:
+                self.liveHashes[icaoHex] = ""
+                continue
+
+            self.liveHashes[icaoHex] = hash
+
+        self.liveCount = len(self.liveHashes)
+
+    def changed(self, icaoHex, hash):
+
+        liveHash = self.liveHashes.pop(icaoHex, None)
+
+        if liveHash is None:
+
+            #Another record for a key already skipped as unchanged; the merge would mark the skipped record obsolete, so it is restored afterwards
+            matchedHash = self.matchedHashes.get(icaoHex)
+
+            if matchedHash is not None and matchedHash != hash:
+                self.rematched.append((icaoHex, matchedHash))
+
+            return True
+
+        if liveHash == hash:
+            self.matchedHashes[icaoHex] = hash
+            self.skipped = self.skipped + 1
+            return False
+
+        return True
+
+    def send_vanished(self, mysqlCur, mode, batchSize):
+
+        mysqlCur.execute("CREATE TEMPORARY TABLE vanished (icao_hex char(6) NOT NULL, KEY icao_hex (icao_hex));")
+
+        with mysql_bulk.bulk_loader(mysqlCur, "vanished", ['icao_hex'], mode, batchSize) as vanishedLoader:
+            for icaoHex in self.liveHashes:
+                vanishedLoader.add((icaoHex,))
+
+        return vanishedLoader.count
+
+    def restore_rematched(self, mysqlCur):
+
+        if len(self.rematched) == 0:
+            return 0
+
+        mysqlCur.executemany("UPDATE " + self.table + " SET deleted = NULL WHERE icao_hex = %s AND hash = %s;", self.rematched)
+
+        return len(self.rematched)
+
+    def summary(self):
+        return "Skipped " + str(self.skipped) + " unchanged of " + str(self.liveCount) + " live records; " + str(len(self.liveHashes)) + " vanished."
@@ -1,7 +1,6 @@
 import csv
 import os
 import json
-import requests
 import shutil
 from urllib.parse import urlparse
 import zipfile
@@ -10,14 +9,18 @@ import logging
 import logging.handlers as handlers
 import sys
 from datetime import datetime
-from progress.bar import Bar
 import time
-import hashlib
 from yaspin import yaspin
 from bson.objectid import ObjectId
 import mysql.connector #pip3 install mysql-connector-python
 import argparse
 import re
+import sqlite_batch
+import mysql_bulk
+import canonical_json
+import source_download
+import zip_source
+import run_report
 
 #https://www.mictronics.de/aircraft-database/indexedDB.php
 
@@ -27,6 +30,7 @@ def setup(args):
     global applicationName
     global settings
     global import_sql
+    global runReport
 
     settings = {}
 
@@ -45,6 +49,9 @@ def setup(args):
         logger.setLevel(logging.INFO)
 
         logger.info(applicationName + " application started.")
+
+        #Time each stage of the run
+        runReport = run_report.run_report(os.path.splitext(os.path.basename(__file__))[0], filePath, logger)
         
         #Make sure the settings file exists
         if os.path.exists(filePath + 'settings.json') == False:
@@ -61,6 +68,7 @@ def setup(args):
         settings['filePath'] = filePath
         settings['tempPath']  = os.path.join(settings['filePath'] , "tmp")
         settings['download_url'] = args.download_url
+        settings['force_download'] = args.force_download
 
         #By default, do not skip the download
         if "skip_download" not in settings:
@@ -87,6 +95,21 @@ def setup(args):
         if "database" not in settings['mySQL']:
             raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
 
+        #Get the storage format of active registration documents, defaulting to "json"
+        if 'registration_storage' not in settings:
+            settings['registration_storage'] = "json"
+
+        settings['registration_storage'] = str(settings['registration_storage']).lower()
+
+        if settings['registration_storage'] not in ["json", "zlib"]:
+            raise Exception("The registration storage format (registration_storage) must be json or zlib.")
+
+        settings['staging_batch_size'] = sqlite_batch.get_batch_size(settings)
+        settings['bulk_load_mode'] = mysql_bulk.get_mode(settings)
+        settings['bulk_load_batch_size'] = mysql_bulk.get_batch_size(settings)
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+        settings['read_from_zip'] = zip_source.get_read_from_zip(settings)
+
         #Get the SQL mode, defaulting to "memory"
         if 'local_database_mode' not in settings:
             settings['local_database_mode'] = "memory"
@@ -127,9 +150,15 @@ def main():
 
     try:
 
+        sourceFile = None
+
         #Get the files
         if settings['skip_download'] != True:
-            download()
+            sourceFile = download()
+
+            #Nothing has changed since the last import
+            if sourceFile is None:
+                exitApp()
 
         #Import the operators file
         import_operators()
@@ -146,6 +175,10 @@ def main():
         #Export the operator data
         export_operators()
 
+        #Remember the file that was imported, so an unchanged file is skipped next time
+        if sourceFile is not None:
+            sourceFile.remember()
+
         #Success, exit the app
         exitApp()
 
@@ -180,6 +213,8 @@ def exitApp(exitCode=None):
     if exitCode != 0:
         logger.info("Error; Exiting with code " + str(exitCode))
 
+    runReport.finish(exitCode, settings.get('mySQL'))
+
     sys.exit(exitCode)
 
 
@@ -202,24 +237,39 @@ def download():
     #Get the file
     logger.info("Beginning file download.  File: " + settings['download_url'])
 
+    sourceFile = source_download.source_file(settings['download_url'], settings['filePath'])
+
+    runReport.begin("Downloading")
+
     with yaspin(text="Downloading file...") as spinner:
-        response = requests.get(settings['download_url'])
+
+        #Streamed to disk; skipped if the file has not changed since the last import, unless forced
+        if sourceFile.fetch(downloadFileDestination, settings['force_download'] == False) == False:
+            spinner.text = "File has not changed since the last import.\n"
+            spinner.ok()
+
+            logger.info("File has not changed since the last import.")
+            runReport.end()
+            return None
 
         spinner.text = "Completed file download.\n"
         spinner.ok()
-   
-    if response.status_code != 200:
-        raise Exception("Response code from download was " + str(response.status_code) + ".")
 
-    #Write the file to disk
-    with open(downloadFileDestination, 'wb') as downloadedFile:
-        downloadedFile.write(response.content)
+    if sourceFile.resumed == True:
+        logger.info("Resumed the partial download from where it stopped.")
 
     logger.info("Completed file download.")
+    runReport.end(bytes=sourceFile.bytesDownloaded)
+
+    #The files are read straight out of the ZIP file instead
+    if settings['read_from_zip'] == True:
+        return sourceFile
 
     #Extract the file
     logger.info("Extracting ZIP file.")
 
+    runReport.begin("Extracting")
+
     with zipfile.ZipFile(downloadFileDestination, 'r') as downloadedFile:
 
         with yaspin(text="Extracting files...") as spinner:
@@ -229,6 +279,7 @@ def download():
             spinner.ok()
 
     logger.info("ZIP file extracted.")
+    runReport.end()
 
     #Delete the original zip file
     os.remove(downloadFileDestination)
@@ -237,60 +288,54 @@ def download():
     for extractedFile in os.listdir(settings['tempPath']):
         os.rename(os.path.join(settings['tempPath'], extractedFile), os.path.join(settings['tempPath'], extractedFile.lower()))
 
+    return sourceFile
 
-def import_operators():
-
-    #Ensure the file exists
-    operatorsFilePath = os.path.join(settings['tempPath'], 'operators.json')
 
-    if os.path.exists(operatorsFilePath) == False:
-        raise Exception ("Operators file not found, expected " + operatorsFilePath)
+def import_operators():
 
     logger.info("Beginning to import operators file.")
 
-    with open(operatorsFilePath) as operatorsFile:
-        fileContents = json.load(operatorsFile)
+    runReport.begin("Importing operators")
+
+    with zip_source.open_text(settings, 'operators.json') as operatorsText:
+        fileContents = json.load(operatorsText.file)
 
     count = 0
 
-    for operator in fileContents:
+    operatorBatch = sqlite_batch.insert_batch(import_sql, "INSERT INTO operators (airline_designator, name, country, callsign) VALUES (?,?,?,?)", settings['staging_batch_size'])
 
-        dbCursor = import_sql.cursor()
+    for operator in fileContents:
 
-        insert_statement = "INSERT INTO operators (airline_designator, name, country, callsign) VALUES (?,?,?,?)"
         parameters = (str(operator).strip(), str(fileContents[operator][0]).strip(), str(fileContents[operator][1]).strip(), str(fileContents[operator][2]).strip())
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
+        #Queue the record for the table
+        operatorBatch.add(parameters)
 
         count = count + 1
 
-        #Close the cursor
-        dbCursor.close()
+    #Write the remaining records
+    operatorBatch.flush()
 
     logger.info("Completed importing " + str(count) + " operators.")
+    runReport.end(count, staging_insert_seconds=operatorBatch.seconds)
    
     return
 
 
 def import_types():
 
-    #Ensure the file exists
-    typesFilePath = os.path.join(settings['tempPath'], 'types.json')
-
-    if os.path.exists(typesFilePath) == False:
-        raise Exception ("Types file not found, expected " + typesFilePath)
-    
     logger.info("Beginning to read aircraft types file.")
 
+    runReport.begin("Importing aircraft types")
+
     count = 0
 
-    with open(typesFilePath) as aircraftTypeFile:
-        fileContents = json.load(aircraftTypeFile)
+    with zip_source.open_text(settings, 'types.json') as aircraftTypeText:
+        fileContents = json.load(aircraftTypeText.file)
 
-    for entry in fileContents:
+    typeBatch = sqlite_batch.insert_batch(import_sql, "INSERT INTO types (type_designator, manufacturer_model, powerplant, category, wake_turbulence_category) VALUES (?,?,?,?,?)", settings['staging_batch_size'])
 
-        dbCursor = import_sql.cursor()
+    for entry in fileContents:
 
         #Correct incorrect WTC for the A388
         if str(entry).strip() == "A388":
@@ -304,38 +349,35 @@ def import_types():
         tmpObj['category'] = tmpDecodedDescription['category']
         tmpObj['wake_turbulence_category'] = decode_wtc(str(fileContents[entry][2]).strip())
 
-        insert_statement = "INSERT INTO types (type_designator, manufacturer_model, powerplant, category, wake_turbulence_category) VALUES (?,?,?,?,?)"
         parameters = (tmpObj['designator'], tmpObj['manufacturer_model'], json.dumps(tmpObj['powerplant']), tmpObj['category'], tmpObj['wake_turbulence_category'])
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
+        #Queue the record for the table
+        typeBatch.add(parameters)
 
         count = count + 1
 
-        #Close the cursor
-        dbCursor.close()
+    #Write the remaining records
+    typeBatch.flush()
 
     logger.info("Finished reading aircraft types, created " + str(count) + " total entries.")
+    runReport.end(count, staging_insert_seconds=typeBatch.seconds)
 
 
 def import_aircraft():
 
-    #Ensure the file exists
-    aircraftsFilePath = os.path.join(settings['tempPath'], 'aircrafts.json')
-
-    if os.path.exists(aircraftsFilePath) == False:
-        raise Exception ("Aircraft file not found, expected " + aircraftsFilePath)
-    
     logger.info("Beginning to read aircraft file.")
 
+    runReport.begin("Importing aircraft")
+
     count = 0
 
-    with open(aircraftsFilePath) as aircraftFile:
-        fileContents = json.load(aircraftFile)
+    with zip_source.open_text(settings, 'aircrafts.json') as aircraftText:
+        fileContents = json.load(aircraftText.file)
+
+    aircraftBatch = sqlite_batch.insert_batch(import_sql, "INSERT INTO aircraft (icao_hex, registration, type_designator, military, interesting) VALUES (?,?,?,?,?)", settings['staging_batch_size'])
 
     for entry in fileContents:
 
-        dbCursor = import_sql.cursor()
         tmpObject = {}
         tmpObject['icao_hex'] = str(entry).strip()
         tmpObject['registration'] = str(fileContents[entry][0]).strip()
@@ -346,18 +388,18 @@ def import_aircraft():
         if tmpObject['type_designator'] == "":
             tmpObject['type_designator'] = None
 
-        insert_statement = "INSERT INTO aircraft (icao_hex, registration, type_designator, military, interesting) VALUES (?,?,?,?,?)"
         parameters = (tmpObject['icao_hex'], tmpObject['registration'], tmpObject['type_designator'] , tmpObject['military'], tmpObject['interesting'])
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
+        #Queue the record for the table
+        aircraftBatch.add(parameters)
 
         count = count + 1
 
-        #Close the cursor
-        dbCursor.close()
+    #Write the remaining records
+    aircraftBatch.flush()
 
     logger.info("Finished reading aircraft, created " + str(count) + " total entries.")
+    runReport.end(count, staging_insert_seconds=aircraftBatch.seconds)
 
 
 def decode_description(description):
@@ -555,22 +597,26 @@ def export_aircraft():
 
     with yaspin(text="Querying aircraft data from SQLite...") as spinner:
 
-        aircraftCur.execute("SELECT aircraft.icao_hex, aircraft.registration, aircraft.type_designator, aircraft.military, \
+        sqlQuery = "SELECT aircraft.icao_hex, aircraft.registration, aircraft.type_designator, aircraft.military, \
                                 types.manufacturer_model, types.powerplant, types.category, types.wake_turbulence_category \
                             FROM aircraft \
-                            LEFT JOIN types on aircraft.type_designator = types.type_designator")
+                            LEFT JOIN types on aircraft.type_designator = types.type_designator"
 
-        arrayAircraft = aircraftCur.fetchall()
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        aircraftCur.execute(sqlQuery)
+
+        arrayAircraft = sqlite_batch.fetch_chunks(aircraftCur, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(arrayAircraft)) + " rows of aircraft data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of aircraft data.")
 
     registrationsDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     logger.info("Creating temp table in MySQL.")
 
@@ -587,9 +633,11 @@ def export_aircraft():
      
     logger.info("Exporting simple registration data to MySQL.")
 
-    sqlInsert = "INSERT INTO import (icao_hex, registration, data, hash) VALUES (%s,%s,%s,%s)"
+    runReport.begin("Exporting simple registration data to MySQL")
+
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import", ['icao_hex', 'registration', 'data', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
 
-    with Bar("Exporting Simple Registration Data to MySQL...", max=len(arrayAircraft)) as bar:
+    with run_report.throttled_bar("Exporting Simple Registration Data to MySQL...", max=rowCount) as bar:
 
         for aircraft in arrayAircraft:
 
@@ -614,26 +662,39 @@ def export_aircraft():
             if aircraft['wake_turbulence_category'] is not None:
                 objCompleted['wake_turbulence_category'] = aircraft['wake_turbulence_category']
 
-            mysqlCur.execute(sqlInsert, (objCompleted['icao_hex'], objCompleted['registration'], json.dumps(objCompleted), hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+            data, dataHash = canonical_json.encode(objCompleted, settings['hash_scheme'])
+
+            importLoader.add((objCompleted['icao_hex'], objCompleted['registration'], data, dataHash, ))
 
             #Increment the bar
             bar.next()
 
         bar.finish()
 
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
+
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
+
     logger.info("Committing simple registration import data to MySQL.")
 
+    runReport.begin("Committing simple registration import data to MySQL")
+
     with yaspin(text="Committing simple registration import data to MySQL...") as spinner:
         registrationsDb.commit()
 
-        spinner.text = "Committed " + str(mysqlCur.rowcount) + " rows of aircraft import data to MySQL.\n"
+        spinner.text = "Committed " + str(importLoader.count) + " rows of aircraft import data to MySQL.\n"
         spinner.ok()
 
-    logger.info("Committed " + str(mysqlCur.rowcount) + " rows of aircraft import data to MySQL.")
+    logger.info("Committed " + str(importLoader.count) + " rows of aircraft import data to MySQL.")
+    runReport.end()
 
     #Delete registrations that don't exist in the import
     logger.info("Deleting deregistered simple registrations.")
 
+    runReport.begin("Deleting deregistered simple registrations")
+
     with yaspin(text="Deleting deregistered simple registrations...") as spinner:
 
         mysqlCur.execute("UPDATE simple, \
@@ -651,10 +712,13 @@ def export_aircraft():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " missing registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
     #Delete registrations if we have a new record coming in where the hashes don't match
     logger.info("Deleting obsolete simple registrations.")
 
+    runReport.begin("Deleting obsolete simple registrations")
+
     with yaspin(text="Deleting obsolete simple registrations...") as spinner:
 
         mysqlCur.execute("UPDATE simple, \
@@ -672,10 +736,13 @@ def export_aircraft():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " obsolete simple registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
     # Create new registrations and mark deleted registrations with a matching has as undeleted
     logger.info("Creating new simple registrations.")
 
+    runReport.begin("Creating new simple registrations")
+
     with yaspin(text="Creating new simple registrations...") as spinner:
 
         mysqlCur.execute("INSERT INTO simple (icao_hex, registration, data,  hash, source) \
@@ -690,6 +757,45 @@ def export_aircraft():
         spinner.ok("")
 
     logger.info("Created " + str(mysqlCur.rowcount) + " new simple registrations.")
+    runReport.end(mysqlCur.rowcount)
+
+    #Bring the active projection in line with the live rows
+    logger.info("Refreshing active simple registrations.")
+
+    runReport.begin("Refreshing active simple registrations")
+
+    with yaspin(text="Refreshing active simple registrations...") as spinner:
+
+        mysqlCur.execute("DELETE simple_active FROM simple_active \
+                            LEFT OUTER JOIN simple ON simple.unique_id = simple_active.unique_id AND simple.deleted IS NULL \
+                            WHERE simple.unique_id IS NULL;")
+
+        removedCount = mysqlCur.rowcount
+
+        #Documents are either copied as JSON or stored compressed by MySQL's zlib COMPRESS()
+        if settings['registration_storage'] == "zlib":
+            dataColumns = "NULL, COMPRESS(CAST(simple.data AS CHAR))"
+        else:
+            dataColumns = "simple.data, NULL"
+
+        mysqlCur.execute("INSERT INTO simple_active (icao_hex, unique_id, registration, data, data_zlib, hash, source) \
+                            (SELECT CONV(simple.icao_hex, 16, 10), simple.unique_id, simple.registration, " + dataColumns + ", simple.hash, simple.source FROM simple \
+                            LEFT OUTER JOIN simple_active ON simple_active.unique_id = simple.unique_id \
+                            WHERE simple.deleted IS NULL AND simple_active.unique_id IS NULL AND simple.icao_hex REGEXP '^[0-9A-Fa-f]{6}$');")
+
+        addedCount = mysqlCur.rowcount
+
+        #Signal the API to drop its cached registrations
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('registrations') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
+        logger.info("Committing active simple registrations to MySQL.")
+        registrationsDb.commit()
+
+        spinner.text = "Removed " + str(removedCount) + " and added " + str(addedCount) + " active simple registrations.\n"
+        spinner.ok("")
+
+    logger.info("Removed " + str(removedCount) + " and added " + str(addedCount) + " active simple registrations.")
+    runReport.end(removedCount + addedCount)
     
     mysqlCur.close()
     registrationsDb.close()
@@ -704,19 +810,23 @@ def export_operators():
 
     with yaspin(text="Querying operator data from SQLite...") as spinner:
 
-        operatorCur.execute("SELECT airline_designator, name, country, callsign FROM operators;")
+        sqlQuery = "SELECT airline_designator, name, country, callsign FROM operators;"
+
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        operatorCur.execute(sqlQuery)
 
-        arrayOperators = operatorCur.fetchall()
+        arrayOperators = sqlite_batch.fetch_chunks(operatorCur, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(arrayOperators)) + " rows of operator data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of operator data.")
 
     registrationsDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     logger.info("Creating temp table in MySQL.")
 
@@ -733,9 +843,11 @@ def export_operators():
      
     logger.info("Exporting simple registration data to MySQL.")
 
-    sqlInsert = "INSERT INTO import_operators (airline_designator, name, callsign, country, hash) VALUES (%s,%s,%s,%s,%s)"
+    runReport.begin("Exporting operator data to MySQL")
 
-    with Bar("Exporting Operator Data to MySQL...", max=len(arrayOperators)) as bar:
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import_operators", ['airline_designator', 'name', 'callsign', 'country', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+
+    with run_report.throttled_bar("Exporting Operator Data to MySQL...", max=rowCount) as bar:
 
         for operator in arrayOperators:
 
@@ -747,26 +859,37 @@ def export_operators():
             objCompleted['country'] = operator['country']
             objCompleted['source'] = "Mictronics-IndexedDB"
             
-            mysqlCur.execute(sqlInsert, (objCompleted['airline_designator'], objCompleted['name'], objCompleted['callsign'], objCompleted['country'], hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+            importLoader.add((objCompleted['airline_designator'], objCompleted['name'], objCompleted['callsign'], objCompleted['country'], canonical_json.encode(objCompleted, settings['hash_scheme'])[1], ))
 
             #Increment the bar
             bar.next()
 
     bar.finish()
 
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
+
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
+
     logger.info("Committing operator import data to MySQL.")
 
+    runReport.begin("Committing operator import data to MySQL")
+
     with yaspin(text="Committing operator import data to MySQL...") as spinner:
         registrationsDb.commit()
 
-        spinner.text = "Committed " + str(mysqlCur.rowcount) + " rows of operator data to MySQL.\n"
+        spinner.text = "Committed " + str(importLoader.count) + " rows of operator data to MySQL.\n"
         spinner.ok()
 
-    logger.info("Committed " + str(mysqlCur.rowcount) + " rows of operator data to MySQL.")
+    logger.info("Committed " + str(importLoader.count) + " rows of operator data to MySQL.")
+    runReport.end()
 
     #Delete operators that don't exist in the import (Mictronics deleted the previously imported record from the database)
     logger.info("Deleting deregistered operators.")
 
+    runReport.begin("Deleting deregistered operators")
+
     with yaspin(text="Deleting deregistered operators...") as spinner:
 
         mysqlCur.execute("UPDATE operators, \
@@ -784,11 +907,14 @@ def export_operators():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " missing operators as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
 
     #Mark any active operators as deleted if the hash does not match (Mictronics updated the database)
     logger.info("Deleting obsolete operators.")
 
+    runReport.begin("Deleting obsolete operators")
+
     with yaspin(text="Deleting obsolete operators...") as spinner:
 
         mysqlCur.execute("UPDATE operators, ( \
@@ -807,12 +933,15 @@ def export_operators():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " obsolete operators as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
 
 
     #Mark any active operators as deleted if they exist in this import but did not originate from this import (Mictronics will replace the existing record)
     logger.info("Deleting conflicting other source operators.")
 
+    runReport.begin("Deleting conflicting other source operators")
+
     with yaspin(text="Deleting conflicting other source operators...") as spinner:
 
         mysqlCur.execute("UPDATE operators, ( \
@@ -831,11 +960,14 @@ def export_operators():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " conflicting other source operators as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
 
     # Create new operators and mark deleted operators with a matching has as undeleted
     logger.info("Creating operators.")
 
+    runReport.begin("Creating new operators")
+
     with yaspin(text="Creating new operators...") as spinner:
 
         mysqlCur.execute("INSERT INTO operators (airline_designator, name, callsign, country, hash, source) \
@@ -844,13 +976,19 @@ def export_operators():
                                 FROM import_operators \
                             LEFT OUTER JOIN operators on import_operators.airline_designator = operators.airline_designator) ON DUPLICATE KEY UPDATE deleted = NULL;")
 
+        createdCount = mysqlCur.rowcount
+
+        #Signal the API to drop its cached operators
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('operators') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
         logger.info("Committing new operators to MySQL.")
         registrationsDb.commit()
         
-        spinner.text = "Created " + str(mysqlCur.rowcount) + " new operators.\n"
+        spinner.text = "Created " + str(createdCount) + " new operators.\n"
         spinner.ok("")
 
-    logger.info("Created " + str(mysqlCur.rowcount) + " new operators.")
+    logger.info("Created " + str(createdCount) + " new operators.")
+    runReport.end(createdCount)
     
     mysqlCur.close()
     registrationsDb.close()
@@ -860,6 +998,7 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Imports Mictronic\'s IndexedDB, containing a registry of global registration information')
     parser.add_argument(dest='download_url', metavar="download_url", help='URL of Mictronic\'s IndexedDB (https://www.mictronics.de/aircraft-database/indexedDB.php).')
+    parser.add_argument('--force-download', dest='force_download', action='store_true', help='Download and import the file even if it has not changed since the last import.')
 
     args = parser.parse_args()
 
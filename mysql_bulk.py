@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+#Loads rows into an importer's MySQL temporary table in bulk, either as chunked multi-row INSERTs or with LOAD DATA LOCAL INFILE
+#  from a spooled tab separated file.
+import os
+import tempfile
+import time
+
+
+BULK_LOAD_MODES = ["insert", "load_data"]
+DEFAULT_BATCH_SIZE = 1000
+
+#LOAD DATA's default escaping, applied to every field written to the spool file
+TSV_ESCAPES = str.maketrans({"\\" : "\\\\", "\t" : "\\t", "\n" : "\\n", "\r" : "\\r", "\0" : "\\0"})
+
+
+def get_mode(settings):
+
+    #Get the bulk load mode, defaulting to "insert"
+    if "bulk_load_mode" not in settings:
+        return "insert"
+
+    if str(settings['bulk_load_mode']).lower() not in BULK_LOAD_MODES:
+        raise Exception("The bulk load mode (bulk_load_mode) must be insert or load_data.")
+
+    return str(settings['bulk_load_mode']).lower()
+
+
+def get_batch_size(settings):
+
+    #Get the number of rows per multi-row INSERT, defaulting to DEFAULT_BATCH_SIZE
+    if "bulk_load_batch_size" not in settings:
+        return DEFAULT_BATCH_SIZE
+
+    if str(settings['bulk_load_batch_size']).isnumeric() != True or int(settings['bulk_load_batch_size']) < 1:
+        raise Exception("The bulk load batch size (bulk_load_batch_size) must be a positive whole number.")
+
+    return int(settings['bulk_load_batch_size'])
+
+
+class bulk_loader():
+
+    def __init__(self, cursor, table, columns, mode="insert", batch_size=DEFAULT_BATCH_SIZE):
+        self.cursor = cursor
+        self.table = table
+        self.columns = columns
+        self.mode = mode
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        self.seconds = 0
+        self.loadSeconds = 0
+        self.spool = None
+        self.start = time.perf_counter()
+
+        if self.mode == "load_data":
+            self.spool = tempfile.NamedTemporaryFile(mode="w", encoding="utf8", newline="", suffix=".tsv", delete=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+
+        if excType is None:
+            self.finish()
+        else:
+            self.discard()
+
+    def add(self, parameters):
+
+        if self.mode == "load_data":
+            self.spool.write("\t".join(self.tsv_field(value) for value in parameters) + "\n")
+            self.count = self.count + 1
+            return
+
+        self.rows.append(parameters)
+
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+
+        if len(self.rows) == 0:
+            return
+
+        placeholders = "(" + ",".join(["%s"] * len(self.columns)) + ")"
+        parameters = [value for row in self.rows for value in row]
+
+        start = time.perf_counter()
+        self.cursor.execute("INSERT INTO " + self.table + " (" + ", ".join(self.columns) + ") VALUES " + ",".join([placeholders] * len(self.rows)), parameters)
+        self.loadSeconds = self.loadSeconds + time.perf_counter() - start
+
+        self.count = self.count + len(self.rows)
+        self.rows = []
+
+    def finish(self):
+
+        if self.mode == "load_data":
+            if self.spool is not None:
+                self.spool.close()
+
+                start = time.perf_counter()
+
+                try:
+                    self.cursor.execute("LOAD DATA LOCAL INFILE %s INTO TABLE " + self.table + " CHARACTER SET utf8mb4 (" + ", ".join(self.columns) + ")", (self.spool.name,))
+                finally:
+                    os.remove(self.spool.name)
+                    self.spool = None
+
+                self.loadSeconds = time.perf_counter() - start
+        else:
+            self.flush()
+
+        self.seconds = time.perf_counter() - self.start
+
+        return self.count
+
+    def discard(self):
+
+        self.rows = []
+
+        if self.spool is not None:
+            self.spool.close()
+            os.remove(self.spool.name)
+            self.spool = None
+
+    def rowsPerSecond(self):
+
+        if self.seconds <= 0:
+            return 0
+
+        return self.count / self.seconds
+
+    def summary(self):
+        return "Loaded " + str(self.count) + " rows into " + self.table + " in " + format(self.seconds, ".1f") + " seconds (" + format(self.rowsPerSecond(), ",.0f") + " rows/s, " + self.mode + ")."
+
+    @staticmethod
+    def tsv_field(value):
+
+        if value is None:
+            return "\\N"
+
+        if value is True or value is False:
+            return str(int(value))
+
+        return str(value).translate(TSV_ESCAPES)
@@ -20,12 +20,8 @@ ENGINE = InnoDB
 DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
-CREATE UNIQUE INDEX `unique_id_UNIQUE` ON `registrations` (`unique_id` ASC) VISIBLE;
-
 CREATE UNIQUE INDEX `icao_hex_hash` ON `registrations` (`icao_hex` ASC, `hash` ASC) VISIBLE;
 
-CREATE INDEX `icao_hex` ON `registrations` (`icao_hex` ASC) VISIBLE;
-
 CREATE INDEX `hash` ON `registrations` (`hash` ASC) VISIBLE;
 
 CREATE INDEX `registration` ON `registrations` (`registration` ASC) VISIBLE;
@@ -48,12 +44,8 @@ ENGINE = InnoDB
 DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
-CREATE UNIQUE INDEX `unique_id_UNIQUE` ON `simple` (`unique_id` ASC) VISIBLE;
-
 CREATE UNIQUE INDEX `icao_hex_hash` ON `simple` (`icao_hex` ASC, `hash` ASC) VISIBLE;
 
-CREATE INDEX `icao_hex` ON `simple` (`icao_hex` ASC) VISIBLE;
-
 CREATE INDEX `hash` ON `simple` (`hash` ASC) VISIBLE;
 
 CREATE INDEX `registration` ON `simple` (`registration` ASC) VISIBLE;
@@ -41,7 +41,7 @@ CREATE TABLE IF NOT EXISTS `airports` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 
-CREATE TABLE `operators_unknown` (
+CREATE TABLE IF NOT EXISTS `operators_unknown` (
   `airline_designator` varchar(10) NOT NULL,
   `count` int DEFAULT '1',
   `created` datetime DEFAULT CURRENT_TIMESTAMP,
@@ -50,6 +50,353 @@ CREATE TABLE `operators_unknown` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 
+/* Materialised flight ident conflicts, maintained by the API and the FlightAware importer */
+
+CREATE TABLE IF NOT EXISTS `flight_conflicts` (
+  `flight_number_id` int NOT NULL,
+  `ident` varchar(10) NOT NULL,
+  `expires` datetime NOT NULL,
+  PRIMARY KEY (`flight_number_id`),
+  KEY `ident_expires` (`ident`,`expires`),
+  KEY `expires` (`expires`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT IGNORE INTO flight_conflicts (flight_number_id, ident, expires)
+  SELECT flight_numbers.unique_id, flight_numbers.ident, flight_numbers.expires FROM flight_numbers
+  WHERE flight_numbers.ident IN (SELECT ident FROM flight_numbers WHERE expires > now() GROUP BY ident HAVING count(ident) > 1)
+    AND flight_numbers.expires > now();
+
+
+/* Support keyset pagination of unknown operators, ordered by count descending then airline designator */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'operators_unknown' AND INDEX_NAME = 'deleted_count_airline_designator' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'NOT_EXISTS',
+	'CREATE INDEX deleted_count_airline_designator ON operators_unknown (deleted ASC, count DESC, airline_designator ASC);',
+	'SELECT ''Operators Unknown Already Contains Paging Index; Ignoring''') into @actionCommand;
+
+PREPARE stmtCreateIndex FROM @actionCommand;
+EXECUTE stmtCreateIndex;
+DEALLOCATE PREPARE stmtCreateIndex;
+
+
+/* Importers bump their dataset version when they finish so the API can reload its in-memory indexes */
+
+CREATE TABLE IF NOT EXISTS `dataset_versions` (
+  `dataset` varchar(50) NOT NULL,
+  `updated` datetime(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (`dataset`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+
+
+/* Active projections of registrations and simple, holding only live rows keyed by unique_id; kept in sync by the importers.
+   icao_hex is not unique, two live rows can share an address and registration.get() reports that as an unexpected result */
+
+CREATE TABLE IF NOT EXISTS `registrations_active` (
+  `icao_hex` mediumint unsigned NOT NULL,
+  `unique_id` int NOT NULL,
+  `registration` varchar(20) NOT NULL,
+  `data` json DEFAULT NULL,
+  `data_zlib` blob DEFAULT NULL,
+  `hash` char(32) NOT NULL,
+  `source` int NOT NULL,
+  PRIMARY KEY (`unique_id`),
+  KEY `icao_hex` (`icao_hex`),
+  KEY `registration` (`registration`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+/* Store the 24-bit ICAO address in 3 bytes instead of 24; the projection is emptied and reseeded below if it still uses char(6) */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT column_name FROM information_schema.columns WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'registrations_active' AND COLUMN_NAME = 'icao_hex' AND DATA_TYPE = 'char' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @columnTest;
+
+SELECT IF ( @columnTest = 'EXISTS',
+	'TRUNCATE TABLE registrations_active;',
+	'SELECT ''Registrations Active Already Uses Integer icao_hex; Ignoring''') into @actionCommand;
+
+PREPARE stmtTruncateTable FROM @actionCommand;
+EXECUTE stmtTruncateTable;
+DEALLOCATE PREPARE stmtTruncateTable;
+
+SELECT IF ( @columnTest = 'EXISTS',
+	'ALTER TABLE registrations_active MODIFY COLUMN icao_hex mediumint unsigned NOT NULL;',
+	'SELECT ''Registrations Active Already Uses Integer icao_hex; Ignoring''') into @actionCommand;
+
+PREPARE stmtModifyColumn FROM @actionCommand;
+EXECUTE stmtModifyColumn;
+DEALLOCATE PREPARE stmtModifyColumn;
+
+/* Projections keyed by icao_hex kept only one of the live rows sharing an address; rekey by unique_id so the reseed below restores the others */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'registrations_active' AND INDEX_NAME = 'PRIMARY' AND COLUMN_NAME = 'icao_hex' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'ALTER TABLE registrations_active DROP PRIMARY KEY, DROP INDEX unique_id, ADD PRIMARY KEY (unique_id), ADD KEY icao_hex (icao_hex);',
+	'SELECT ''Registrations Active Already Keyed By unique_id; Ignoring''') into @actionCommand;
+
+PREPARE stmtRekeyTable FROM @actionCommand;
+EXECUTE stmtRekeyTable;
+DEALLOCATE PREPARE stmtRekeyTable;
+
+INSERT IGNORE INTO registrations_active (icao_hex, unique_id, registration, data, hash, source)
+  SELECT CONV(icao_hex, 16, 10), unique_id, registration, data, hash, source FROM registrations
+  WHERE deleted IS NULL AND icao_hex REGEXP '^[0-9A-Fa-f]{6}$';
+
+/* unique_id_UNIQUE duplicates the primary key and icao_hex duplicates the leading column of icao_hex_hash */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'registrations' AND INDEX_NAME = 'unique_id_UNIQUE' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'DROP INDEX unique_id_UNIQUE ON registrations;',
+	'SELECT ''Registrations unique_id_UNIQUE Already Dropped; Ignoring''') into @actionCommand;
+
+PREPARE stmtDropIndex FROM @actionCommand;
+EXECUTE stmtDropIndex;
+DEALLOCATE PREPARE stmtDropIndex;
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'registrations' AND INDEX_NAME = 'icao_hex' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'DROP INDEX icao_hex ON registrations;',
+	'SELECT ''Registrations icao_hex Index Already Dropped; Ignoring''') into @actionCommand;
+
+PREPARE stmtDropIndex FROM @actionCommand;
+EXECUTE stmtDropIndex;
+DEALLOCATE PREPARE stmtDropIndex;
+
+CREATE TABLE IF NOT EXISTS `simple_active` (
+  `icao_hex` mediumint unsigned NOT NULL,
+  `unique_id` int NOT NULL,
+  `registration` varchar(20) NOT NULL,
+  `data` json DEFAULT NULL,
+  `data_zlib` blob DEFAULT NULL,
+  `hash` char(32) NOT NULL,
+  `source` int NOT NULL,
+  PRIMARY KEY (`unique_id`),
+  KEY `icao_hex` (`icao_hex`),
+  KEY `registration` (`registration`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+/* Store the 24-bit ICAO address in 3 bytes instead of 24; the projection is emptied and reseeded below if it still uses char(6) */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT column_name FROM information_schema.columns WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'simple_active' AND COLUMN_NAME = 'icao_hex' AND DATA_TYPE = 'char' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @columnTest;
+
+SELECT IF ( @columnTest = 'EXISTS',
+	'TRUNCATE TABLE simple_active;',
+	'SELECT ''Simple Active Already Uses Integer icao_hex; Ignoring''') into @actionCommand;
+
+PREPARE stmtTruncateTable FROM @actionCommand;
+EXECUTE stmtTruncateTable;
+DEALLOCATE PREPARE stmtTruncateTable;
+
+SELECT IF ( @columnTest = 'EXISTS',
+	'ALTER TABLE simple_active MODIFY COLUMN icao_hex mediumint unsigned NOT NULL;',
+	'SELECT ''Simple Active Already Uses Integer icao_hex; Ignoring''') into @actionCommand;
+
+PREPARE stmtModifyColumn FROM @actionCommand;
+EXECUTE stmtModifyColumn;
+DEALLOCATE PREPARE stmtModifyColumn;
+
+/* Projections keyed by icao_hex kept only one of the live rows sharing an address; rekey by unique_id so the reseed below restores the others */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'simple_active' AND INDEX_NAME = 'PRIMARY' AND COLUMN_NAME = 'icao_hex' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'ALTER TABLE simple_active DROP PRIMARY KEY, DROP INDEX unique_id, ADD PRIMARY KEY (unique_id), ADD KEY icao_hex (icao_hex);',
+	'SELECT ''Simple Active Already Keyed By unique_id; Ignoring''') into @actionCommand;
+
+PREPARE stmtRekeyTable FROM @actionCommand;
+EXECUTE stmtRekeyTable;
+DEALLOCATE PREPARE stmtRekeyTable;
+
+INSERT IGNORE INTO simple_active (icao_hex, unique_id, registration, data, hash, source)
+  SELECT CONV(icao_hex, 16, 10), unique_id, registration, data, hash, source FROM simple
+  WHERE deleted IS NULL AND icao_hex REGEXP '^[0-9A-Fa-f]{6}$';
+
+/* unique_id_UNIQUE duplicates the primary key and icao_hex duplicates the leading column of icao_hex_hash */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'simple' AND INDEX_NAME = 'unique_id_UNIQUE' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'DROP INDEX unique_id_UNIQUE ON simple;',
+	'SELECT ''Simple unique_id_UNIQUE Already Dropped; Ignoring''') into @actionCommand;
+
+PREPARE stmtDropIndex FROM @actionCommand;
+EXECUTE stmtDropIndex;
+DEALLOCATE PREPARE stmtDropIndex;
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT index_name FROM information_schema.statistics WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'simple' AND INDEX_NAME = 'icao_hex' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @indexTest;
+
+SELECT IF ( @indexTest = 'EXISTS',
+	'DROP INDEX icao_hex ON simple;',
+	'SELECT ''Simple icao_hex Index Already Dropped; Ignoring''') into @actionCommand;
+
+PREPARE stmtDropIndex FROM @actionCommand;
+EXECUTE stmtDropIndex;
+DEALLOCATE PREPARE stmtDropIndex;
+
+
+/* Optional compressed storage of registrations_active documents; exactly one of data or data_zlib is populated */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT column_name FROM information_schema.columns WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'registrations_active' AND COLUMN_NAME = 'data_zlib' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @columnTest;
+
+SELECT IF ( @columnTest = 'NOT_EXISTS',
+	'ALTER TABLE registrations_active MODIFY COLUMN data json DEFAULT NULL, ADD COLUMN data_zlib blob DEFAULT NULL AFTER data;',
+	'SELECT ''Registrations Active Already Contains data_zlib Column; Ignoring''') into @actionCommand;
+
+PREPARE stmtCreateColumn FROM @actionCommand;
+EXECUTE stmtCreateColumn;
+DEALLOCATE PREPARE stmtCreateColumn;
+
+/* Optional compressed storage of simple_active documents; exactly one of data or data_zlib is populated */
+
+SELECT IF (
+    EXISTS (
+        SELECT DISTINCT column_name FROM information_schema.columns WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'simple_active' AND COLUMN_NAME = 'data_zlib' )
+		, 'EXISTS'
+		, 'NOT_EXISTS') into @columnTest;
+
+SELECT IF ( @columnTest = 'NOT_EXISTS',
+	'ALTER TABLE simple_active MODIFY COLUMN data json DEFAULT NULL, ADD COLUMN data_zlib blob DEFAULT NULL AFTER data;',
+	'SELECT ''Simple Active Already Contains data_zlib Column; Ignoring''') into @actionCommand;
+
+PREPARE stmtCreateColumn FROM @actionCommand;
+EXECUTE stmtCreateColumn;
+DEALLOCATE PREPARE stmtCreateColumn;
+
+/* History tables receiving deleted and expired rows once they pass the retention period; filled by archive-history.py */
+
+CREATE TABLE IF NOT EXISTS `registrations_history` (
+  `unique_id` int NOT NULL,
+  `icao_hex` char(6) NOT NULL,
+  `registration` varchar(20) NOT NULL,
+  `data` json NOT NULL,
+  `hash` char(32) NOT NULL,
+  `source` int NOT NULL,
+  `created` datetime DEFAULT NULL,
+  `deleted` datetime DEFAULT NULL,
+  `archived` datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`unique_id`),
+  KEY `icao_hex` (`icao_hex`),
+  KEY `registration` (`registration`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `simple_history` (
+  `unique_id` int NOT NULL,
+  `icao_hex` char(6) NOT NULL,
+  `registration` varchar(20) NOT NULL,
+  `data` json NOT NULL,
+  `hash` char(32) NOT NULL,
+  `source` int NOT NULL,
+  `created` datetime DEFAULT NULL,
+  `deleted` datetime DEFAULT NULL,
+  `archived` datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`unique_id`),
+  KEY `icao_hex` (`icao_hex`),
+  KEY `registration` (`registration`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `operators_history` (
+  `unique_id` int NOT NULL,
+  `airline_designator` varchar(10) NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `callsign` varchar(45) NOT NULL,
+  `country` varchar(45) NOT NULL,
+  `hash` char(32) NOT NULL,
+  `source` int NOT NULL,
+  `created` datetime DEFAULT NULL,
+  `deleted` datetime DEFAULT NULL,
+  `archived` datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`unique_id`),
+  KEY `airline_designator` (`airline_designator`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `flight_numbers_history` (
+  `unique_id` int NOT NULL,
+  `airline_designator` char(3) DEFAULT NULL,
+  `flight_number` varchar(10) DEFAULT NULL,
+  `ident` varchar(10) DEFAULT NULL,
+  `origin` char(4) DEFAULT NULL,
+  `destination` char(4) DEFAULT NULL,
+  `expires` datetime DEFAULT NULL,
+  `source` int DEFAULT NULL,
+  `hash` char(32) DEFAULT NULL,
+  `archived` datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`unique_id`),
+  KEY `ident` (`ident`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+/* The same designator can be reported, deleted and archived more than once, so its history rows need their own key */
+
+CREATE TABLE IF NOT EXISTS `operators_unknown_history` (
+  `history_id` int NOT NULL AUTO_INCREMENT,
+  `airline_designator` varchar(10) NOT NULL,
+  `count` int DEFAULT NULL,
+  `created` datetime DEFAULT NULL,
+  `deleted` datetime DEFAULT NULL,
+  `archived` datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`history_id`),
+  KEY `airline_designator` (`airline_designator`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+
+/* Timings of each importer run, one row per run; the report column holds the per-stage breakdown also written next to events.log */
+
+CREATE TABLE IF NOT EXISTS `import_runs` (
+  `unique_id` int NOT NULL AUTO_INCREMENT,
+  `importer` varchar(64) NOT NULL,
+  `started` datetime(6) NOT NULL,
+  `finished` datetime(6) NOT NULL,
+  `exit_code` int NOT NULL,
+  `wall_seconds` double NOT NULL,
+  `cpu_seconds` double NOT NULL,
+  `peak_rss_mib` double NOT NULL,
+  `report` json NOT NULL,
+  PRIMARY KEY (`unique_id`),
+  KEY `importer_started` (`importer`,`started`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+
 SET SQL_MODE=@OLD_SQL_MODE;
 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
\ No newline at end of file
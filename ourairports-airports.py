@@ -1,7 +1,6 @@
 import csv
 import os
 import json
-import requests
 import shutil
 from urllib.parse import urlparse
 import zipfile
@@ -10,13 +9,16 @@ import logging
 import logging.handlers as handlers
 import sys
 from datetime import datetime
-from progress.bar import Bar
 import time
-import hashlib
 from yaspin import yaspin
 from bson.objectid import ObjectId
 import mysql.connector #pip3 install mysql-connector-python
 import argparse
+import sqlite_batch
+import mysql_bulk
+import canonical_json
+import source_download
+import run_report
 
 # https://davidmegginson.github.io/ourairports-data/airports.csv
 
@@ -26,6 +28,7 @@ def setup(args):
     global applicationName
     global settings
     global import_sql
+    global runReport
 
     settings = {}
 
@@ -44,6 +47,9 @@ def setup(args):
         logger.setLevel(logging.INFO)
 
         logger.info(applicationName + " application started.")
+
+        #Time each stage of the run
+        runReport = run_report.run_report(os.path.splitext(os.path.basename(__file__))[0], filePath, logger)
         
         #Make sure the settings file exists
         if os.path.exists(filePath + 'settings.json') == False:
@@ -60,6 +66,7 @@ def setup(args):
         settings['filePath'] = filePath
         settings['tempPath']  = os.path.join(settings['filePath'] , "tmp")
         settings['download_url'] = args.download_url
+        settings['force_download'] = args.force_download
 
         #By default, do not skip the download
         if "skip_download" not in settings:
@@ -86,6 +93,11 @@ def setup(args):
         if "database" not in settings['mySQL']:
             raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
 
+        settings['staging_batch_size'] = sqlite_batch.get_batch_size(settings)
+        settings['bulk_load_mode'] = mysql_bulk.get_mode(settings)
+        settings['bulk_load_batch_size'] = mysql_bulk.get_batch_size(settings)
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+
         #Get the SQL mode, defaulting to "memory"
         if 'local_database_mode' not in settings:
             settings['local_database_mode'] = "memory"
@@ -123,9 +135,15 @@ def main():
 
     try:
 
+        sourceFile = None
+
         #Get the files
         if settings['skip_download'] != True:
-            download()
+            sourceFile = download()
+
+            #Nothing has changed since the last import
+            if sourceFile is None:
+                exitApp()
 
         #Import the airports file
         import_airports()
@@ -133,6 +151,10 @@ def main():
         #Export the data to disk
         export_data()
 
+        #Remember the file that was imported, so an unchanged file is skipped next time
+        if sourceFile is not None:
+            sourceFile.remember()
+
         #Success, exit the app
         exitApp()
 
@@ -166,6 +188,8 @@ def exitApp(exitCode=None):
     if exitCode != 0:
         logger.info("Error; Exiting with code " + str(exitCode))
 
+    runReport.finish(exitCode, settings.get('mySQL'))
+
     sys.exit(exitCode)
 
 def totalLines(filename):
@@ -191,20 +215,31 @@ def download():
     #Get the file from OurAirports
     logger.info("Beginning file download from OurAirports.  File: " + settings['download_url'])
 
+    sourceFile = source_download.source_file(settings['download_url'], settings['filePath'])
+
+    runReport.begin("Downloading")
+
     with yaspin(text="Downloading file from OurAirports...") as spinner:
-        response = requests.get(settings['download_url'])
+
+        #Streamed to disk; skipped if the file has not changed since the last import, unless forced
+        if sourceFile.fetch(downloadFileDestination, settings['force_download'] == False) == False:
+            spinner.text = "File has not changed since the last import.\n"
+            spinner.ok()
+
+            logger.info("File has not changed since the last import.")
+            runReport.end()
+            return None
 
         spinner.text = "Completed file download from OurAirports.\n"
         spinner.ok()
-   
-    if response.status_code != 200:
-        raise Exception("Response code from download was " + str(response.status_code) + ".")
 
-    #Write the file to disk
-    with open(downloadFileDestination, 'wb') as downloadedFile:
-        downloadedFile.write(response.content)
+    if sourceFile.resumed == True:
+        logger.info("Resumed the partial download from where it stopped.")
 
     logger.info("Completed file download from OurAirports.")
+    runReport.end(bytes=sourceFile.bytesDownloaded)
+
+    return sourceFile
 
 
 def import_airports():
@@ -213,6 +248,8 @@ def import_airports():
 
     logger.info("Beginning Airports Import.")
 
+    runReport.begin("Importing airports")
+
     #Make sure the file exists
     if os.path.exists(airportsFile) == False:
         raise Exception ("Airports file does not exist.  Expected " + airportsFile)
@@ -225,7 +262,7 @@ def import_airports():
         #Skip the headers
         fileReader.__next__()
 
-        with Bar("Importing Airports...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Airports...", max=rowCount) as bar, sqlite_batch.insert_batch(import_sql, airport.INSERT_STATEMENT, settings['staging_batch_size']) as airportBatch:
 
             for row in fileReader:
 
@@ -255,8 +292,8 @@ def import_airports():
                 if len(tmpAirport.iata_code) == 0 or tmpAirport.iata_code == "0":
                     tmpAirport.iata_code = None
 
-                #Store it in the DB
-                tmpAirport.commit()
+                #Queue it for the DB
+                tmpAirport.commit(airportBatch)
 
                 #Increment the bar
                 bar.next()
@@ -266,6 +303,7 @@ def import_airports():
         bar.finish()
 
         logger.info("Completed Airport Import, total row count " + str(rowCount) + ".")
+        runReport.end(rowCount, staging_insert_seconds=airportBatch.seconds)
 
 
 def export_data():
@@ -277,18 +315,22 @@ def export_data():
 
     with yaspin(text="Querying data from SQLite...") as spinner:
 
-        sqliteCur.execute("SELECT icao_code, iata_code, name, city, region, country, phonic FROM airports;")
-        rows = sqliteCur.fetchall()
+        sqlQuery = "SELECT icao_code, iata_code, name, city, region, country, phonic FROM airports;"
+
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        sqliteCur.execute(sqlQuery)
+        rows = sqlite_batch.fetch_chunks(sqliteCur, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(rows)) + " rows of data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of data.")
 
     registrationsDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     mysqlCur = registrationsDb.cursor()
 
@@ -305,9 +347,11 @@ def export_data():
  
     logger.info("Exporting data to MySQL.")
 
-    sqlInsert = "INSERT INTO import (icao_code, iata_code, name, city, region, country, phonic, hash) VALUES (%s,%s,%s,%s,%s,%s,%s,%s)"
+    runReport.begin("Exporting data to MySQL")
 
-    with Bar("Exporting Data to MySQL...", max=len(rows)) as bar:
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import", ['icao_code', 'iata_code', 'name', 'city', 'region', 'country', 'phonic', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+
+    with run_report.throttled_bar("Exporting Data to MySQL...", max=rowCount) as bar:
 
         for row in rows:
             objCompleted = {}
@@ -319,47 +363,68 @@ def export_data():
             objCompleted['country'] = row['country']
             objCompleted['phonic'] = row['phonic']           
             
-            mysqlCur.execute(sqlInsert, (objCompleted['icao_code'], objCompleted['iata_code'], objCompleted['name'], objCompleted['city'], objCompleted['region'], objCompleted['country'], objCompleted['phonic'], hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+            importLoader.add((objCompleted['icao_code'], objCompleted['iata_code'], objCompleted['name'], objCompleted['city'], objCompleted['region'], objCompleted['country'], objCompleted['phonic'], canonical_json.encode(objCompleted, settings['hash_scheme'])[1], ))
 
             #Increment the bar
             bar.next()
 
         bar.finish()
 
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
+
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
+
     logger.info("Committing import data to MySQL.")
 
+    runReport.begin("Committing import data to MySQL")
+
     with yaspin(text="Committing import data to MySQL...") as spinner:
         registrationsDb.commit()
 
-        spinner.text = "Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.\n"
+        spinner.text = "Committed " + str(importLoader.count) + " rows of import data to MySQL.\n"
         spinner.ok()
 
-    logger.info("Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.")
+    logger.info("Committed " + str(importLoader.count) + " rows of import data to MySQL.")
+    runReport.end()
 
     #Delete registrations if we have a new record coming in where the hashes don't match
     logger.info("Deleting existing airports.")
 
+    runReport.begin("Deleting existing airports")
+
     with yaspin(text="Deleting existing airports...") as spinner:
 
         mysqlCur.execute("DELETE FROM airports;")
         spinner.ok("")
 
+    runReport.end(mysqlCur.rowcount)
+
     # Create new registrations and mark deleted registrations with a matching has as undeleted
     logger.info("Creating new airports.")
 
+    runReport.begin("Creating new airports")
+
     with yaspin(text="Creating new airports...") as spinner:
 
         mysqlCur.execute("INSERT INTO airports (icao_code, iata_code, name, city, region, country, phonic, hash, source) \
                             (SELECT import.icao_code, import.iata_code, import.name, import.city, import.region, import.country, import.phonic, import.hash, sources.unique_id FROM import \
                             LEFT OUTER JOIN sources ON sources.agency = 'OurAirports');")
 
+        createdCount = mysqlCur.rowcount
+
+        #Signal the API to reload its airport index
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('airports') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
         logger.info("Committing new airports to MySQL.")
         registrationsDb.commit()
         
-        spinner.text = "Created " + str(mysqlCur.rowcount) + " new airports.\n"
+        spinner.text = "Created " + str(createdCount) + " new airports.\n"
         spinner.ok("")
 
-    logger.info("Created " + str(mysqlCur.rowcount) + " new airports.")
+    logger.info("Created " + str(createdCount) + " new airports.")
+    runReport.end(createdCount)
     
     mysqlCur.close()
     registrationsDb.close()
@@ -367,6 +432,8 @@ def export_data():
 
 class airport():
 
+    INSERT_STATEMENT = "INSERT INTO airports (icao_code, iata_code, name, city, region, country, phonic) VALUES (?,?,?,?,?,?,?)"
+
     def __init__(self):
         self.icao_code = ""
         self.iata_code = ""
@@ -441,24 +508,19 @@ class airport():
         self.phonic = self.phonic.strip()
 
 
-    def commit(self):
-
-        dbCursor = import_sql.cursor()
+    def commit(self, batch):
 
-        insert_statement = "INSERT INTO airports (icao_code, iata_code, name, city, region, country, phonic) VALUES (?,?,?,?,?,?,?)"
         parameters = (self.icao_code, self.iata_code, self.name, self.city, self.region, self.country, self.phonic)
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
+        #Queue the record for the table
+        batch.add(parameters)
 
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Imports OurAirports Airports')
     parser.add_argument(dest='download_url', metavar="download_url", help='URL of the OurAirports airport file to download.')
+    parser.add_argument('--force-download', dest='force_download', action='store_true', help='Download and import the file even if it has not changed since the last import.')
 
     args = parser.parse_args()
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+#Decodes a large CSV file in a pool of processes.  The file is split into byte ranges that start and end on line boundaries, each
+#  range is decoded by a worker and the results are yielded in file order.  Only suitable for files whose quoted fields never
+#  contain line breaks, such as the FAA registry.
+import collections
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+
+
+DEFAULT_PROCESSES = 1
+
+#More chunks than processes keeps every worker busy until the end of the file, and only a few chunks are held in memory at a time
+CHUNKS_PER_PROCESS = 8
+PENDING_PER_PROCESS = 2
+
+#Lines sent to a worker at a time when the file is read as a stream rather than split by byte offset
+LINES_PER_CHUNK = 10000
+
+
+def get_processes(settings):
+
+    #Get the number of decode processes, defaulting to DEFAULT_PROCESSES; "auto" uses one per CPU
+    if "decode_processes" not in settings:
+        return DEFAULT_PROCESSES
+
+    if str(settings['decode_processes']).lower() == "auto":
+        return os.cpu_count() or DEFAULT_PROCESSES
+
+    if str(settings['decode_processes']).isnumeric() != True or int(settings['decode_processes']) < 1:
+        raise Exception("The number of decode processes (decode_processes) must be a positive whole number or auto.")
+
+    return int(settings['decode_processes'])
+
+
+def line_chunks(fileName, chunkCount):
+
+    #Byte ranges covering everything after the header line, each one starting at the beginning of a line
+    fileSize = os.path.getsize(fileName)
+
+    with open(fileName, "rb") as rawFile:
+        rawFile.readline()
+        bounds = [rawFile.tell()]
+
+        for index in range(1, chunkCount):
+            rawFile.seek(max(bounds[0] + (fileSize - bounds[0]) * index // chunkCount, bounds[-1]))
+
+            #Move on to the end of the line the offset landed in
+            rawFile.readline()
+            bounds.append(rawFile.tell())
+
+    bounds.append(fileSize)
+
+    return [(bounds[index], bounds[index + 1]) for index in range(len(bounds) - 1) if bounds[index] < bounds[index + 1]]
+
+
+def decode_chunk(fileName, start, end, decodeRow):
+
+    with open(fileName, "rb") as rawFile:
+        rawFile.seek(start)
+        data = rawFile.read(end - start)
+
+    #Same encoding and newline handling as open(fileName, "r")
+    textFile = io.TextIOWrapper(io.BytesIO(data))
+
+    return [decodeRow(row) for row in csv.reader(textFile)]
+
+
+def decode_lines(lines, decodeRow):
+    return [decodeRow(row) for row in csv.reader(lines)]
+
+
+def decode_file(fileName, decodeRow, processes=DEFAULT_PROCESSES):
+
+    #Yields decodeRow(row) for every row after the header, in file order
+    if processes <= 1:
+        with open(fileName, "r") as csvfile:
+            fileReader = csv.reader(csvfile)
+
+            #Skip the headers
+            fileReader.__next__()
+
+            for row in fileReader:
+                yield decodeRow(row)
+
+        return
+
+    #Forked workers inherit the importer's settings and logger, which are only set up when it runs as a script
+    with multiprocessing.get_context("fork").Pool(processes) as pool:
+
+        pending = collections.deque()
+
+        for start, end in line_chunks(fileName, processes * CHUNKS_PER_PROCESS):
+            pending.append(pool.apply_async(decode_chunk, (fileName, start, end, decodeRow)))
+
+            if len(pending) >= processes * PENDING_PER_PROCESS:
+                for result in pending.popleft().get():
+                    yield result
+
+        while len(pending) > 0:
+            for result in pending.popleft().get():
+                yield result
+
+
+def decode_stream(textFile, decodeRow, processes=DEFAULT_PROCESSES):
+
+    #Yields decodeRow(row) for every row after the header of an open text file, in file order.  Used where the file cannot be split
+    #  by byte offset, such as a member of a ZIP file
+    if processes <= 1:
+        fileReader = csv.reader(textFile)
+
+        #Skip the headers
+        fileReader.__next__()
+
+        for row in fileReader:
+            yield decodeRow(row)
+
+        return
+
+    #Skip the headers
+    textFile.readline()
+
+    with multiprocessing.get_context("fork").Pool(processes) as pool:
+
+        pending = collections.deque()
+
+        while True:
+            lines = list(itertools.islice(textFile, LINES_PER_CHUNK))
+
+            if len(lines) == 0:
+                break
+
+            pending.append(pool.apply_async(decode_lines, (lines, decodeRow)))
+
+            if len(pending) >= processes * PENDING_PER_PROCESS:
+                for result in pending.popleft().get():
+                    yield result
+
+        while len(pending) > 0:
+            for result in pending.popleft().get():
+                yield result
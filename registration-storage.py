@@ -0,0 +1,163 @@
+import os
+import json
+import logging
+import logging.handlers as handlers
+import sys
+import time
+from yaspin import yaspin
+import mysql.connector #pip3 install mysql-connector-python
+import argparse
+
+
+def setup(args):
+    global logger
+    global applicationName
+    global settings
+
+    settings = {}
+
+    try:
+
+        filePath = os.path.dirname(os.path.realpath(__file__)) + "/"
+
+        applicationName = "Registration Storage"
+
+        #Setup the logger, 10MB maximum log size
+        logger = logging.getLogger(applicationName)
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] - %(message)s')
+        logHandler = handlers.RotatingFileHandler(filePath + 'events.log', maxBytes=10485760, backupCount=1)
+        logHandler.setFormatter(formatter)
+        logger.addHandler(logHandler)
+        logger.setLevel(logging.INFO)
+
+        logger.info(applicationName + " application started.")
+
+        #Make sure the settings file exists
+        if os.path.exists(filePath + 'settings.json') == False:
+            raise Exception("Settings file does not exist.  Expected file " + filePath + 'settings.json')
+
+        #Get the settings file
+        if os.path.exists(filePath + 'settings.json.private') == True:
+            with open(filePath + 'settings.json.private') as settingsFile:
+                settings = json.load(settingsFile)
+        else:
+            with open(filePath + 'settings.json') as settingsFile:
+                settings = json.load(settingsFile)
+
+        settings['format'] = args.format
+        settings['batch_size'] = args.batch_size
+
+        if "mySQL" not in settings:
+            raise Exception("The database information (mySQL) is not populated in the settings.json file.")
+
+        if "uri" not in settings['mySQL']:
+            raise Exception("The database uri (mySQL -> uri) is not populated in the settings.json file.")
+
+        if "username" not in settings['mySQL']:
+            raise Exception("The database username (mySQL -> username) is not populated in the settings.json file.")
+
+        if "password" not in settings['mySQL']:
+            raise Exception("The database password (mySQL -> password) is not populated in the settings.json file.")
+
+        if "database" not in settings['mySQL']:
+            raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
+
+        if str(settings.get('registration_storage', "json")).lower() != settings['format']:
+            print("Warning: registration_storage in settings.json is not " + settings['format'] + "; the next import will write new documents in the old format.")
+            logger.warning("registration_storage in settings.json is not " + settings['format'] + ".")
+
+    except Exception as ex:
+        logger.error(ex)
+        print(ex)
+        exitApp(1)
+
+
+def main():
+
+    try:
+
+        registrationsDb = mysql.connector.connect(
+            host=settings['mySQL']['uri'],
+            user=settings['mySQL']['username'],
+            password=settings['mySQL']['password'],
+            database=settings['mySQL']['database'])
+
+        mysqlCur = registrationsDb.cursor()
+
+        for table in ["registrations_active", "simple_active"]:
+            convert(registrationsDb, mysqlCur, table)
+
+        #Signal the API to drop its cached registrations
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('registrations') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+        registrationsDb.commit()
+
+        mysqlCur.close()
+        registrationsDb.close()
+
+        #Success, exit the app
+        exitApp()
+
+    except Exception as ex:
+        logger.error(ex)
+        print(ex)
+        exitApp(1)
+
+
+def convert(registrationsDb, mysqlCur, table):
+
+    #Convert in small batches so each transaction only briefly locks the rows the API is reading
+    if settings['format'] == "zlib":
+        sqlUpdate = "UPDATE " + table + " SET data_zlib = COMPRESS(CAST(data AS CHAR)), data = NULL WHERE data IS NOT NULL LIMIT " + str(settings['batch_size']) + ";"
+    else:
+        sqlUpdate = "UPDATE " + table + " SET data = CAST(CONVERT(UNCOMPRESS(data_zlib) USING utf8mb4) AS JSON), data_zlib = NULL WHERE data_zlib IS NOT NULL LIMIT " + str(settings['batch_size']) + ";"
+
+    logger.info("Converting " + table + " to " + settings['format'] + ".")
+
+    convertedCount = 0
+    start = time.time()
+
+    with yaspin(text="Converting " + table + " to " + settings['format'] + "...") as spinner:
+
+        while True:
+            mysqlCur.execute(sqlUpdate)
+            registrationsDb.commit()
+
+            if mysqlCur.rowcount < 1:
+                break
+
+            convertedCount = convertedCount + mysqlCur.rowcount
+            spinner.text = "Converting " + table + " to " + settings['format'] + "... " + str(convertedCount) + " rows"
+
+        spinner.text = "Converted " + str(convertedCount) + " rows of " + table + " to " + settings['format'] + " in " + format(time.time() - start, ".1f") + " seconds.\n"
+        spinner.ok("")
+
+    logger.info("Converted " + str(convertedCount) + " rows of " + table + " to " + settings['format'] + " in " + format(time.time() - start, ".1f") + " seconds.")
+
+
+def exitApp(exitCode=None):
+
+    if exitCode is None:
+        exitCode = 0
+
+    if exitCode == 0:
+        print(applicationName + " application finished successfully.")
+        logger.info(applicationName + " application finished successfully.")
+
+    if exitCode != 0:
+        logger.info("Error; Exiting with code " + str(exitCode))
+
+    sys.exit(exitCode)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Converts the active registration documents between JSON and zlib compressed storage')
+    parser.add_argument(dest='format', metavar="format", choices=["json", "zlib"], help='Storage format to convert to, json or zlib.')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=5000, help='Rows converted per transaction.  Defaults to 5000.')
+
+    args = parser.parse_args()
+
+    #Setup the configuration required
+    setup(args)
+
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+#Records the wall time, CPU time, row count and peak memory of each stage of an importer run.  The report is written as JSON next to
+#  events.log and kept in the import_runs table, so runs can be compared over time.
+import os
+import json
+import time
+import resource
+from datetime import datetime
+import mysql.connector #pip3 install mysql-connector-python
+from progress.bar import Bar
+
+
+#Rows between progress bar redraws; redrawing the bar for every row is a noticeable share of an import
+PROGRESS_INTERVAL = 1000
+
+
+class throttled_bar(Bar):
+
+    def __init__(self, *args, **kwargs):
+        self.pending = 0
+        super().__init__(*args, **kwargs)
+
+    def next(self, n=1):
+        self.pending = self.pending + n
+
+        if self.pending >= PROGRESS_INTERVAL:
+            super().next(self.pending)
+            self.pending = 0
+
+    def finish(self):
+
+        #Show the rows counted since the last redraw
+        if self.pending > 0:
+            super().next(self.pending)
+            self.pending = 0
+
+        super().finish()
+
+
+def cpu_seconds():
+
+    #User and system time of this process and its finished children, such as decode processes
+    selfUsage = resource.getrusage(resource.RUSAGE_SELF)
+    childUsage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return selfUsage.ru_utime + selfUsage.ru_stime + childUsage.ru_utime + childUsage.ru_stime
+
+
+def peak_rss_mib():
+
+    #Peak resident set size of this process or its largest child so far; Linux reports ru_maxrss in KiB
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+class run_report():
+
+    def __init__(self, importer, filePath, logger):
+        self.importer = importer
+        self.fileName = os.path.join(filePath, importer + "-run.json")
+        self.logger = logger
+        self.started = datetime.now()
+        self.startWall = time.perf_counter()
+        self.startCpu = cpu_seconds()
+        self.stages = []
+        self.open = []
+
+    def begin(self, name):
+
+        stage = {"name" : name, "started" : datetime.now().isoformat(), "depth" : len(self.open)}
+        stage['_wall'] = time.perf_counter()
+        stage['_cpu'] = cpu_seconds()
+
+        self.stages.append(stage)
+        self.open.append(stage)
+
+        return stage
+
+    def end(self, rows=None, **metrics):
+
+        #Closes the most recently begun stage
+        stage = self.open.pop()
+
+        stage['wall_seconds'] = round(time.perf_counter() - stage.pop('_wall'), 3)
+        stage['cpu_seconds'] = round(cpu_seconds() - stage.pop('_cpu'), 3)
+        stage['peak_rss_mib'] = round(peak_rss_mib(), 1)
+
+        if rows is not None:
+            stage['rows'] = rows
+            stage['rows_per_second'] = round(rows / stage['wall_seconds'], 1) if stage['wall_seconds'] > 0 else None
+
+        for key, value in metrics.items():
+            stage[key] = round(value, 3) if isinstance(value, float) else value
+
+        #Whatever is not spent writing to SQLite or loading MySQL is spent reading and decoding, or building and serialising the documents
+        if "staging_insert_seconds" in metrics:
+            stage['decode_seconds'] = round(stage['wall_seconds'] - metrics['staging_insert_seconds'], 3)
+
+        if "mysql_load_seconds" in metrics:
+            stage['serialise_seconds'] = round(stage['wall_seconds'] - metrics['mysql_load_seconds'], 3)
+
+        return stage
+
+    def summary(self, exitCode):
+
+        return {
+            "importer" : self.importer,
+            "started" : self.started.isoformat(),
+            "finished" : datetime.now().isoformat(),
+            "exit_code" : exitCode,
+            "wall_seconds" : round(time.perf_counter() - self.startWall, 3),
+            "cpu_seconds" : round(cpu_seconds() - self.startCpu, 3),
+            "peak_rss_mib" : round(peak_rss_mib(), 1),
+            "stages" : self.stages
+        }
+
+    def finish(self, exitCode, mySQL=None):
+
+        #Stages still open when the run stops are the ones that failed
+        while len(self.open) > 0:
+            self.end(failed=True)
+
+        report = self.summary(exitCode)
+
+        try:
+            with open(self.fileName, 'w') as reportFile:
+                json.dump(report, reportFile, indent=2)
+
+        except Exception as ex:
+            self.logger.warning("Unable to write the run report to " + self.fileName + ": " + str(ex))
+
+        if mySQL is None:
+            return report
+
+        #A failure to record the run must not change the outcome of the import
+        try:
+            reportDb = mysql.connector.connect(
+                host=mySQL['uri'],
+                user=mySQL['username'],
+                password=mySQL['password'],
+                database=mySQL['database'])
+
+            reportCur = reportDb.cursor()
+
+            reportCur.execute("INSERT INTO import_runs (importer, started, finished, exit_code, wall_seconds, cpu_seconds, peak_rss_mib, report) VALUES (%s, %s, %s, %s, %s, %s, %s, %s);",
+                (self.importer, report['started'], report['finished'], exitCode, report['wall_seconds'], report['cpu_seconds'], report['peak_rss_mib'], json.dumps(report)))
+
+            reportDb.commit()
+            reportCur.close()
+            reportDb.close()
+
+        except Exception as ex:
+            self.logger.warning("Unable to record the run report in MySQL: " + str(ex))
+
+        return report
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#Downloads an importer's source file to disk in chunks.  The ETag and Last-Modified values of the last imported file are kept so an
+#  unchanged file is not downloaded again, and an interrupted download is resumed with a Range request.
+import os
+import json
+from urllib.parse import urlparse
+import requests
+
+
+CHUNK_SIZE = 1048576
+
+#Kept next to the importers, since the temp folder is deleted after every successful run
+STATE_FOLDER = "downloads"
+
+
+class source_file():
+
+    def __init__(self, url, filePath, session=None, headers=None):
+        self.url = url
+        self.session = session if session is not None else requests.session()
+        self.headers = dict(headers) if headers is not None else {}
+        self.stateFolder = os.path.join(filePath, STATE_FOLDER)
+        self.fileName = os.path.basename(urlparse(url).path)
+        self.partialFile = os.path.join(self.stateFolder, self.fileName + ".part")
+        self.partialStateFile = self.partialFile + ".json"
+        self.stateFile = os.path.join(self.stateFolder, self.fileName + ".json")
+        self.validators = {}
+        self.resumed = False
+        self.bytesDownloaded = 0
+
+        if os.path.exists(self.stateFolder) == False:
+            os.mkdir(self.stateFolder)
+
+    def fetch(self, destination, conditional=True):
+
+        #Returns False if the file has not changed since it was last imported, otherwise writes it to destination and returns True
+        headers = dict(self.headers)
+        partialState = self.read_state(self.partialStateFile)
+        importedState = self.read_state(self.stateFile)
+
+        if os.path.exists(self.partialFile) and partialState is not None:
+
+            #Ask for the rest of the file, unless it changed since the partial download started
+            headers['Range'] = "bytes=" + str(os.path.getsize(self.partialFile)) + "-"
+            headers['If-Range'] = partialState.get('etag') or partialState.get('last_modified')
+
+        elif conditional == True and importedState is not None:
+
+            if importedState.get('etag'):
+                headers['If-None-Match'] = importedState['etag']
+
+            if importedState.get('last_modified'):
+                headers['If-Modified-Since'] = importedState['last_modified']
+
+        with self.session.get(self.url, headers=headers, stream=True) as response:
+
+            if response.status_code == 304:
+                return False
+
+            if response.status_code == 416:
+
+                #The partial file is no use; start again from the beginning
+                self.discard_partial()
+                return self.fetch(destination, conditional)
+
+            if response.status_code not in [200, 206]:
+                raise Exception("Response code from download was " + str(response.status_code) + ".")
+
+            self.validators = {"url" : self.url, "etag" : response.headers.get('ETag'), "last_modified" : response.headers.get('Last-Modified')}
+
+            #A full response replaces whatever was downloaded before
+            if response.status_code == 206:
+                self.resumed = True
+                fileMode = "ab"
+
+                for key in ['etag', 'last_modified']:
+                    if self.validators[key] is None:
+                        self.validators[key] = partialState.get(key)
+            else:
+                fileMode = "wb"
+
+                if self.validators['etag'] or self.validators['last_modified']:
+                    self.write_state(self.partialStateFile, self.validators)
+
+            with open(self.partialFile, fileMode) as downloadedFile:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    downloadedFile.write(chunk)
+                    self.bytesDownloaded = self.bytesDownloaded + len(chunk)
+
+        os.replace(self.partialFile, destination)
+
+        if os.path.exists(self.partialStateFile):
+            os.remove(self.partialStateFile)
+
+        return True
+
+    def remember(self):
+
+        #Called once the file has been imported, so a failed import is retried with a full download
+        if self.validators.get('etag') or self.validators.get('last_modified'):
+            self.write_state(self.stateFile, self.validators)
+
+    def discard_partial(self):
+
+        for fileName in [self.partialFile, self.partialStateFile]:
+            if os.path.exists(fileName):
+                os.remove(fileName)
+
+    def read_state(self, fileName):
+
+        if os.path.exists(fileName) == False:
+            return None
+
+        with open(fileName) as stateFile:
+            state = json.load(stateFile)
+
+        #State left by a different URL does not apply
+        if state.get('url') != self.url:
+            return None
+
+        return state
+
+    def write_state(self, fileName, state):
+
+        with open(fileName, 'w') as stateFile:
+            json.dump(state, stateFile)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#Buffers rows bound for an importer's SQLite staging table and writes them with executemany(), one transaction per batch, and
+#  reads them back in chunks of the same size.
+import time
+
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def get_batch_size(settings):
+
+    #Get the staging batch size, defaulting to DEFAULT_BATCH_SIZE
+    if "staging_batch_size" not in settings:
+        return DEFAULT_BATCH_SIZE
+
+    if str(settings['staging_batch_size']).isnumeric() != True or int(settings['staging_batch_size']) < 1:
+        raise Exception("The staging batch size (staging_batch_size) must be a positive whole number.")
+
+    return int(settings['staging_batch_size'])
+
+
+class insert_batch():
+
+    def __init__(self, connection, statement, batch_size=DEFAULT_BATCH_SIZE):
+        self.connection = connection
+        self.statement = statement
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        self.seconds = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+
+        #Write whatever is left, unless the import is already failing
+        if excType is None:
+            self.flush()
+
+    def add(self, parameters):
+
+        self.rows.append(parameters)
+
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+
+        if len(self.rows) == 0:
+            return
+
+        start = time.perf_counter()
+
+        #The connection's context manager commits the batch, or rolls it back if any row fails
+        with self.connection:
+            self.connection.executemany(self.statement, self.rows)
+
+        self.seconds = self.seconds + time.perf_counter() - start
+
+        self.count = self.count + len(self.rows)
+        self.rows = []
+
+
+def count_rows(connection, query, parameters=()):
+
+    #Count what a query returns without keeping its rows
+    return connection.execute("SELECT COUNT(*) FROM (" + query.strip().rstrip(";") + ")", parameters).fetchone()[0]
+
+
+def fetch_chunks(cursor, chunk_size=DEFAULT_BATCH_SIZE):
+
+    #Iterate over an executed query's rows, holding only chunk_size of them in memory at a time
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+
+        if len(rows) == 0:
+            return
+
+        for row in rows:
+            yield row
@@ -10,13 +10,19 @@ import logging
 import logging.handlers as handlers
 import sys
 from datetime import datetime
-from progress.bar import Bar
 import time
-import hashlib
 from yaspin import yaspin
 from bson.objectid import ObjectId
 import mysql.connector #pip3 install mysql-connector-python
 import argparse
+import sqlite_batch
+import mysql_bulk
+import canonical_json
+import source_download
+import zip_source
+import incremental_import
+import parallel_decode
+import run_report
 
 ###################
 # Content below for restricting TLS 1.3
@@ -51,6 +57,7 @@ def setup(args):
     global applicationName
     global settings
     global import_sql
+    global runReport
 
     settings = {}
 
@@ -69,6 +76,9 @@ def setup(args):
         logger.setLevel(logging.INFO)
 
         logger.info(applicationName + " application started.")
+
+        #Time each stage of the run
+        runReport = run_report.run_report(os.path.splitext(os.path.basename(__file__))[0], filePath, logger)
         
         #Make sure the settings file exists
         if os.path.exists(filePath + 'settings.json') == False:
@@ -85,6 +95,8 @@ def setup(args):
         settings['filePath'] = filePath
         settings['tempPath']  = os.path.join(settings['filePath'] , "tmp")
         settings['download_url'] = args.download_url
+        settings['force_download'] = args.force_download
+        settings['streaming'] = args.streaming
 
         #By default, do not skip the download
         if "skip_download" not in settings:
@@ -111,10 +123,33 @@ def setup(args):
         if "database" not in settings['mySQL']:
             raise Exception("The database name (mySQL -> database) is not populated in the settings.json file.")
 
+        #Get the storage format of active registration documents, defaulting to "json"
+        if 'registration_storage' not in settings:
+            settings['registration_storage'] = "json"
+
+        settings['registration_storage'] = str(settings['registration_storage']).lower()
+
+        if settings['registration_storage'] not in ["json", "zlib"]:
+            raise Exception("The registration storage format (registration_storage) must be json or zlib.")
+
+        settings['staging_batch_size'] = sqlite_batch.get_batch_size(settings)
+        settings['bulk_load_mode'] = mysql_bulk.get_mode(settings)
+        settings['bulk_load_batch_size'] = mysql_bulk.get_batch_size(settings)
+        settings['hash_scheme'] = canonical_json.get_hash_scheme(settings)
+        settings['read_from_zip'] = zip_source.get_read_from_zip(settings)
+        settings['incremental_import'] = incremental_import.is_enabled(settings)
+        settings['decode_processes'] = parallel_decode.get_processes(settings)
+
         #Get the SQL mode, defaulting to "memory"
         if 'local_database_mode' not in settings:
             settings['local_database_mode'] = "memory"
 
+        #Streaming joins the reference files in memory and does not use the local database at all
+        if settings['streaming'] == True:
+            settings['local_database_mode'] = "none"
+            import_sql = None
+            return
+
         if str(settings['local_database_mode']).lower() == "memory":
 
             import_sql = sqlite3.connect(":memory:")
@@ -150,21 +185,42 @@ def main():
 
     try:
 
+        sourceFile = None
+
         #Get the files
         if settings['skip_download'] != True:
-            download()
+            sourceFile = download()
 
-        #Import the engine file
-        import_engines()
+            #Nothing has changed since the last import
+            if sourceFile is None:
+                exitApp()
 
-        #Import the aircraft file
-        import_aircraft()
+        if settings['streaming'] == True:
 
-        #Import the registrations
-        import_registrations()
+            #Load the engine and aircraft reference files
+            engines = load_engines()
+            aircraftTypes = load_aircraft()
 
-        #Export the data to disk
-        export_data()
+            #Stream the registrations straight into the export
+            export_data(stream_registrations(engines, aircraftTypes), registrationRowCount())
+
+        else:
+
+            #Import the engine file
+            import_engines()
+
+            #Import the aircraft file
+            import_aircraft()
+
+            #Import the registrations
+            import_registrations()
+
+            #Export the data to disk
+            export_data(*query_registrations())
+
+        #Remember the file that was imported, so an unchanged file is skipped next time
+        if sourceFile is not None:
+            sourceFile.remember()
 
         #Success, exit the app
         exitApp()
@@ -199,11 +255,9 @@ def exitApp(exitCode=None):
     if exitCode != 0:
         logger.info("Error; Exiting with code " + str(exitCode))
 
-    sys.exit(exitCode)
+    runReport.finish(exitCode, settings.get('mySQL'))
 
-def totalLines(filename):
-    with open(filename) as f:
-        return (sum(1 for line in f)) - 1
+    sys.exit(exitCode)
 
 def download():
 
@@ -238,24 +292,39 @@ def download():
 
     headers = {"User-Agent":"P5Software AROI"}
 
+    sourceFile = source_download.source_file(settings['download_url'], settings['filePath'], session, headers)
+
+    runReport.begin("Downloading")
+
     with yaspin(text="Downloading file from FAA...") as spinner:
-        response = session.get(settings['download_url'], headers=headers)
+
+        #Streamed to disk; skipped if the file has not changed since the last import, unless forced
+        if sourceFile.fetch(downloadFileDestination, settings['force_download'] == False) == False:
+            spinner.text = "File has not changed since the last import.\n"
+            spinner.ok()
+
+            logger.info("File has not changed since the last import.")
+            runReport.end()
+            return None
 
         spinner.text = "Completed file download from FAA.\n"
         spinner.ok()
-   
-    if response.status_code != 200:
-        raise Exception("Response code from download was " + str(response.status_code) + ".")
 
-    #Write the file to disk
-    with open(downloadFileDestination, 'wb') as downloadedFile:
-        downloadedFile.write(response.content)
+    if sourceFile.resumed == True:
+        logger.info("Resumed the partial download from where it stopped.")
 
     logger.info("Completed file download from FAA.")
+    runReport.end(bytes=sourceFile.bytesDownloaded)
+
+    #The files are read straight out of the ZIP file instead
+    if settings['read_from_zip'] == True:
+        return sourceFile
 
     #Extract the file
     logger.info("Extracting ZIP file.")
 
+    runReport.begin("Extracting")
+
     with zipfile.ZipFile(downloadFileDestination, 'r') as downloadedFile:
 
         with yaspin(text="Extracting files...") as spinner:
@@ -265,6 +334,7 @@ def download():
             spinner.ok()
 
     logger.info("ZIP file extracted.")
+    runReport.end()
 
     #Delete the original zip file
     os.remove(downloadFileDestination)
@@ -278,173 +348,299 @@ def download():
         if ".txt.txt" in extractedFile:
             os.rename(os.path.join(settings['tempPath'], extractedFile), os.path.join(settings['tempPath'], os.path.splitext(extractedFile)[0]))
 
+    return sourceFile
+
+
+def parse_engine(row):
+
+    tmpEngine = engine()
+
+    #Import data by address
+    tmpEngine.code = str(row[0])
+    tmpEngine.manufacturer = str(row[1]).strip()
+    tmpEngine.model = str(row[2]).strip()
+    tmpEngine.set_engine_type(str(row[3]).strip())
+    tmpEngine.set_power(int(row[4]), int(row[5]))
+
+    return tmpEngine
+
+def parse_aircraft(row):
+
+    tmpAircraft = aircraft()
+
+    #Import data by address
+    tmpAircraft.code = str(row[0]).strip()
+    tmpAircraft.manufacturer = str(row[1]).strip()
+    tmpAircraft.model = str(row[2]).strip()
+    tmpAircraft.set_aircraft_type(str(row[3]).strip())
+    tmpAircraft.set_engine_type(str(int(row[4])))
+    tmpAircraft.set_category(str(row[5]).strip())
+    tmpAircraft.set_builder_certification(str(row[6]).strip())
+    tmpAircraft.engine_count = str(int(row[7]))
+    tmpAircraft.seat_count = str(int(row[8]))
+    tmpAircraft.set_weight(str(row[9]).strip())
+    tmpAircraft.speed = int(row[10])
+
+    return tmpAircraft
+
+def parse_registration(row):
+
+    tmpRegistration = registration()
+
+    #Import data by address
+    tmpRegistration.registration = "N" + str(row[0]).strip()
+    tmpRegistration.serial_number = str(row[1]).strip()
+    tmpRegistration.code_aircraft = str(row[2]).strip()
+    tmpRegistration.code_engine = str(row[3]).strip()
+    tmpRegistration.manufactured_year = str(row[4]).strip()
+    tmpRegistration.set_type_registrant(str(row[5]).strip())
+    tmpRegistration.set_name(str(row[6]).strip())
+    tmpRegistration.set_street(str(row[7]).strip(), str(row[8]).strip())
+    tmpRegistration.city = str(row[9]).strip()
+    tmpRegistration.state = str(row[10]).strip()
+    tmpRegistration.postal_code = str(row[11]).strip()
+    tmpRegistration.set_region(str(row[12]).strip())
+    tmpRegistration.country = str(row[14]).strip()
+    tmpRegistration.last_action = parseYYYYMMDD(str(row[15]).strip())
+    tmpRegistration.certificate_issue = parseYYYYMMDD(str(row[16]).strip())
+    tmpRegistration.set_certification(str(row[17]).strip())
+    tmpRegistration.set_aircraft_type(str(row[18]).strip())
+    tmpRegistration.set_engine_type(str(row[19]).strip())
+    tmpRegistration.set_status(str(row[20]).strip())
+    tmpRegistration.icao24_octal = str(row[21]).strip()
+    tmpRegistration.set_fractional_ownership(str(row[22]).strip())
+    tmpRegistration.airworthiness_date = parseYYYYMMDD(str(row[23]).strip())
+    tmpRegistration.set_name(str(row[24]).strip())
+    tmpRegistration.set_name(str(row[25]).strip())
+    tmpRegistration.set_name(str(row[26]).strip())
+    tmpRegistration.set_name(str(row[27]).strip())
+    tmpRegistration.set_name(str(row[28]).strip())
+    tmpRegistration.expiration_date = parseYYYYMMDD(str(row[29]).strip())
+    tmpRegistration.kit_manufacturer = str(row[31]).strip()
+    tmpRegistration.kit_model = str(row[32]).strip()
+    tmpRegistration.icao24_hex = str(row[33]).strip()
+
+    return tmpRegistration
 
 def import_engines():
 
-    engineFile = os.path.join(settings['tempPath'], "engine.txt")
-
     logger.info("Beginning Engine Import.")
 
-    #Make sure the file exists
-    if os.path.exists(engineFile) == False:
-        raise Exception ("Engine file does not exist.  Expected " + engineFile)
-
-    rowCount = totalLines(engineFile)
+    runReport.begin("Importing engines")
 
-    with open(engineFile, "r") as csvfile:
-        fileReader = csv.reader(csvfile)
+    with zip_source.open_text(settings, "engine.txt") as engineText:
+        fileReader = csv.reader(engineText.file)
 
         #Skip the headers
         fileReader.__next__()
 
-        with Bar("Importing Engines...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Engines...", max=engineText.total()) as bar, sqlite_batch.insert_batch(import_sql, engine.INSERT_STATEMENT, settings['staging_batch_size']) as engineBatch:
 
             for row in fileReader:
 
-                tmpEngine = engine()
+                tmpEngine = parse_engine(row)
 
-                #Import data by address
-                tmpEngine.code = str(row[0])
-                tmpEngine.manufacturer = str(row[1]).strip()
-                tmpEngine.model = str(row[2]).strip()
-                tmpEngine.set_engine_type(str(row[3]).strip())
-                tmpEngine.set_power(int(row[4]), int(row[5]))
-
-                #Store it in the DB
-                tmpEngine.commit()
+                #Queue it for the DB
+                tmpEngine.commit(engineBatch)
 
                 #Increment the bar
-                bar.next()
+                engineText.advance(bar)
 
             bar.message = "Done Importing Engines."
 
         bar.finish()
 
-        logger.info("Completed Engine Import, total row count " + str(rowCount) + ".")
+        logger.info("Completed Engine Import, total row count " + str(engineText.rows) + ".")
+        runReport.end(engineText.rows, staging_insert_seconds=engineBatch.seconds)
 
 def import_aircraft():
-    
-    aircraftFile = os.path.join(settings['tempPath'], "acftref.txt")
 
     logger.info("Beginning Aircraft Import.")
 
-    #Make sure the file exists
-    if os.path.exists(aircraftFile) == False:
-        raise Exception ("Aircraft file does not exist.  Expected " + aircraftFile)
+    runReport.begin("Importing aircraft")
 
-    rowCount = totalLines(aircraftFile)
-
-    with open(aircraftFile, "r") as csvfile:
-        fileReader = csv.reader(csvfile)
+    with zip_source.open_text(settings, "acftref.txt") as aircraftText:
+        fileReader = csv.reader(aircraftText.file)
 
         #Skip the headers
         fileReader.__next__()
 
-        with Bar("Importing Aircraft...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Aircraft...", max=aircraftText.total()) as bar, sqlite_batch.insert_batch(import_sql, aircraft.INSERT_STATEMENT, settings['staging_batch_size']) as aircraftBatch:
 
             for row in fileReader:
 
-                tmpAircraft = aircraft()
-
-                #Import data by address
-                tmpAircraft.code = str(row[0]).strip()
-                tmpAircraft.manufacturer = str(row[1]).strip()
-                tmpAircraft.model = str(row[2]).strip()
-                tmpAircraft.set_aircraft_type(str(row[3]).strip())
-                tmpAircraft.set_engine_type(str(int(row[4])))
-                tmpAircraft.set_category(str(row[5]).strip())
-                tmpAircraft.set_builder_certification(str(row[6]).strip())
-                tmpAircraft.engine_count = str(int(row[7]))
-                tmpAircraft.seat_count = str(int(row[8]))
-                tmpAircraft.set_weight(str(row[9]).strip())
-                tmpAircraft.speed = int(row[10])
+                tmpAircraft = parse_aircraft(row)
 
-                #Store it in the DB
-                tmpAircraft.commit()
+                #Queue it for the DB
+                tmpAircraft.commit(aircraftBatch)
 
                 #Increment the bar
-                bar.next()
+                aircraftText.advance(bar)
 
             bar.finish()
 
-        logger.info("Completed Aircraft Import, total row count " + str(rowCount) + ".")
+        logger.info("Completed Aircraft Import, total row count " + str(aircraftText.rows) + ".")
+        runReport.end(aircraftText.rows, staging_insert_seconds=aircraftBatch.seconds)
 
-def import_registrations():
+def decode_registrations(registrationText):
 
-    registrationFile = os.path.join(settings['tempPath'], "master.txt")
+    #An extracted file is split between the decode processes by byte offset; a ZIP member can only be read as a stream
+    if settings['read_from_zip'] == True:
+        return parallel_decode.decode_stream(registrationText.file, parse_registration, settings['decode_processes'])
 
-    logger.info("Beginning Registration Import.")
+    return parallel_decode.decode_file(registrationText.fileName, parse_registration, settings['decode_processes'])
 
-    #Make sure the file exists
-    if os.path.exists(registrationFile) == False:
-        raise Exception ("Registration file does not exist.  Expected " + registrationFile)
+def import_registrations():
 
-    rowCount = totalLines(registrationFile)
+    logger.info("Beginning Registration Import.")
 
-    with open(registrationFile, "r") as csvfile:
-        fileReader = csv.reader(csvfile)
+    runReport.begin("Importing registrations")
 
-        #Skip the headers
-        fileReader.__next__()
+    with zip_source.open_text(settings, "master.txt") as registrationText:
 
-        with Bar("Importing Registrations...", max=rowCount) as bar:
+        with run_report.throttled_bar("Importing Registrations...", max=registrationText.total()) as bar, sqlite_batch.insert_batch(import_sql, registration.INSERT_STATEMENT, settings['staging_batch_size']) as registrationBatch:
 
-            for row in fileReader:
+            for tmpRegistration in decode_registrations(registrationText):
 
                 #Limit the number of registrations if requested in the settings file (dev only)
                 if "limit" in settings:
                     if settings['limit'] == True:
-                        if bar.index >= 500:
+                        if registrationText.rows >= 500:
                             bar.finish()
                             break
 
-                tmpRegistration = registration()
-
-                #Import data by address
-                tmpRegistration.registration = "N" + str(row[0]).strip()
-                tmpRegistration.serial_number = str(row[1]).strip()
-                tmpRegistration.code_aircraft = str(row[2]).strip()
-                tmpRegistration.code_engine = str(row[3]).strip()
-                tmpRegistration.manufactured_year = str(row[4]).strip()
-                tmpRegistration.set_type_registrant(str(row[5]).strip())
-                tmpRegistration.set_name(str(row[6]).strip())
-                tmpRegistration.set_street(str(row[7]).strip(), str(row[8]).strip())
-                tmpRegistration.city = str(row[9]).strip()
-                tmpRegistration.state = str(row[10]).strip()
-                tmpRegistration.postal_code = str(row[11]).strip()
-                tmpRegistration.set_region(str(row[12]).strip())
-                tmpRegistration.country = str(row[14]).strip()
-                tmpRegistration.last_action = parseYYYYMMDD(str(row[15]).strip())
-                tmpRegistration.certificate_issue = parseYYYYMMDD(str(row[16]).strip())
-                tmpRegistration.set_certification(str(row[17]).strip())
-                tmpRegistration.set_aircraft_type(str(row[18]).strip())
-                tmpRegistration.set_engine_type(str(row[19]).strip())
-                tmpRegistration.set_status(str(row[20]).strip())
-                tmpRegistration.icao24_octal = str(row[21]).strip()
-                tmpRegistration.set_fractional_ownership(str(row[22]).strip())
-                tmpRegistration.airworthiness_date = parseYYYYMMDD(str(row[23]).strip())
-                tmpRegistration.set_name(str(row[24]).strip())
-                tmpRegistration.set_name(str(row[25]).strip())
-                tmpRegistration.set_name(str(row[26]).strip())
-                tmpRegistration.set_name(str(row[27]).strip())
-                tmpRegistration.set_name(str(row[28]).strip())
-                tmpRegistration.expiration_date = parseYYYYMMDD(str(row[29]).strip())
-                tmpRegistration.kit_manufacturer = str(row[31]).strip()
-                tmpRegistration.kit_model = str(row[32]).strip()
-                tmpRegistration.icao24_hex = str(row[33]).strip()
-
-                #Store it in the DB
-                tmpRegistration.commit()
+                #Queue it for the DB
+                tmpRegistration.commit(registrationBatch)
 
                 #Increment the bar
-                bar.next()
+                registrationText.advance(bar)
 
         bar.finish()
 
-    logger.info("Completed Registration Import, total row count " + str(rowCount) + ".")
+    logger.info("Completed Registration Import, total row count " + str(registrationText.rows) + ".")
+    runReport.end(registrationText.rows, staging_insert_seconds=registrationBatch.seconds)
+
+
+def load_engines():
+
+    logger.info("Loading engine reference data.")
+
+    runReport.begin("Loading engines")
+
+    engines = {}
+
+    with zip_source.open_text(settings, "engine.txt") as engineText:
+        fileReader = csv.reader(engineText.file)
+
+        #Skip the headers
+        fileReader.__next__()
+
+        for row in fileReader:
+            tmpEngine = parse_engine(row)
+            engines[tmpEngine.code] = tmpEngine
+
+    logger.info("Loaded " + str(len(engines)) + " engines.")
+    runReport.end(len(engines))
 
+    return engines
 
-def export_data():
+def load_aircraft():
+
+    logger.info("Loading aircraft reference data.")
+
+    runReport.begin("Loading aircraft")
+
+    aircraftTypes = {}
+
+    with zip_source.open_text(settings, "acftref.txt") as aircraftText:
+        fileReader = csv.reader(aircraftText.file)
+
+        #Skip the headers
+        fileReader.__next__()
+
+        for row in fileReader:
+            tmpAircraft = parse_aircraft(row)
+            aircraftTypes[tmpAircraft.code] = tmpAircraft
+
+    logger.info("Loaded " + str(len(aircraftTypes)) + " aircraft.")
+    runReport.end(len(aircraftTypes))
+
+    return aircraftTypes
+
+def registrationRowCount():
+
+    rowCount = zip_source.open_text(settings, "master.txt").count_rows()
+
+    #Limit the number of registrations if requested in the settings file (dev only)
+    if "limit" in settings:
+        if settings['limit'] == True:
+            rowCount = min(rowCount, 500)
+
+    return rowCount
+
+def stream_registrations(engines, aircraftTypes):
+
+    logger.info("Streaming registrations.")
+
+    count = 0
+
+    with zip_source.open_text(settings, "master.txt") as registrationText:
+
+        for tmpRegistration in decode_registrations(registrationText):
+
+            #Limit the number of registrations if requested in the settings file (dev only)
+            if "limit" in settings:
+                if settings['limit'] == True:
+                    if count >= 500:
+                        break
+
+            tmpAircraft = aircraftTypes.get(tmpRegistration.code_aircraft)
+            tmpEngine = engines.get(tmpRegistration.code_engine)
+
+            count = count + 1
+
+            #Same shape and types as the rows query_registrations() returns; the SQLite aircraft table stores the counts as integers
+            yield {
+                'registration' : tmpRegistration.registration,
+                'serial_number' : tmpRegistration.serial_number,
+                'manufactured_year' : tmpRegistration.manufactured_year,
+                'registrant_type' : tmpRegistration.registrant_type,
+                'name' : tmpRegistration.name,
+                'street' : tmpRegistration.street,
+                'city' : tmpRegistration.city,
+                'state' : tmpRegistration.state,
+                'postal_code' : tmpRegistration.postal_code,
+                'region' : tmpRegistration.region,
+                'country' : tmpRegistration.country,
+                'last_action' : tmpRegistration.last_action,
+                'certificate_issue' : tmpRegistration.certificate_issue,
+                'certification' : tmpRegistration.certification,
+                'operations' : tmpRegistration.operations,
+                'aircraft_type' : tmpRegistration.aircraft_type,
+                'status' : tmpRegistration.status,
+                'airworthiness_date' : tmpRegistration.airworthiness_date,
+                'registration_expiration_date' : tmpRegistration.expiration_date,
+                'kit_manufacturer' : tmpRegistration.kit_manufacturer,
+                'kit_model' : tmpRegistration.kit_model,
+                'icao_hex' : tmpRegistration.icao24_hex,
+                'aircraft_manufacturer' : tmpAircraft.manufacturer if tmpAircraft else None,
+                'aircraft_model' : tmpAircraft.model if tmpAircraft else None,
+                'aircraft_category' : tmpAircraft.category if tmpAircraft else None,
+                'builder_certification' : tmpAircraft.builder_certification if tmpAircraft else None,
+                'engine_count' : int(tmpAircraft.engine_count) if tmpAircraft else None,
+                'seats' : int(tmpAircraft.seat_count) if tmpAircraft else None,
+                'weight' : tmpAircraft.weight if tmpAircraft else None,
+                'speed' : tmpAircraft.speed if tmpAircraft else None,
+                'engine_manufacturer' : tmpEngine.manufacturer if tmpEngine else None,
+                'engine_model' : tmpEngine.model if tmpEngine else None,
+                'engine_type' : tmpEngine.engine_type if tmpEngine else None,
+                'power_value' : tmpEngine.power_value if tmpEngine else None,
+                'power_type' : tmpEngine.power_type if tmpEngine else None
+            }
+
+    logger.info("Streamed " + str(count) + " registrations.")
+
+def query_registrations():
 
     import_sql.row_factory = sqlite3.Row
     sqliteCur = import_sql.cursor()
@@ -453,7 +649,7 @@ def export_data():
 
     with yaspin(text="Querying data from SQLite...") as spinner:
 
-        sqliteCur.execute("SELECT registrations.registration, registrations.serial_number, registrations.manufactured_year, \
+        sqlQuery = "SELECT registrations.registration, registrations.serial_number, registrations.manufactured_year, \
                     registrations.registrant_type, registrations.name, registrations.street, registrations.city, \
                     registrations.state, registrations.postal_code, registrations.region, registrations.country, \
                     registrations.last_action, registrations.certificate_issue, registrations.certification, \
@@ -467,18 +663,37 @@ def export_data():
                     engines.manufacturer as engine_manufacturer, engines.model as engine_model, engines.engine_type as engine_type, \
                     engines.power_value as power_value, engines.power_type as power_type \
                     FROM registrations LEFT JOIN aircraft ON registrations.code_aircraft = aircraft.code \
-                    LEFT JOIN engines ON registrations.code_engine = engines.code")
-        rows = sqliteCur.fetchall()
+                    LEFT JOIN engines ON registrations.code_engine = engines.code"
+
+        rowCount = sqlite_batch.count_rows(import_sql, sqlQuery)
+        sqliteCur.execute(sqlQuery)
+        rows = sqlite_batch.fetch_chunks(sqliteCur, settings['staging_batch_size'])
 
         spinner.stop()
 
-    logger.info("SQLite returned " + str(len(rows)) + " rows of data.")
+    logger.info("SQLite returned " + str(rowCount) + " rows of data.")
+
+    return decode_staged_rows(rows), rowCount
+
+def decode_staged_rows(rows):
+
+    #Decode the list columns so rows match those from stream_registrations()
+    for row in rows:
+        row = dict(row)
+
+        for column in ['name', 'street', 'certification', 'operations']:
+            row[column] = json.loads(row[column])
+
+        yield row
+
+def export_data(rows, rowCount):
 
     registrationsDb = mysql.connector.connect(
         host=settings['mySQL']['uri'],
         user=settings['mySQL']['username'],
         password=settings['mySQL']['password'],
-        database=settings['mySQL']['database'])
+        database=settings['mySQL']['database'],
+        allow_local_infile=(settings['bulk_load_mode'] == "load_data"))
 
     mysqlCur = registrationsDb.cursor()
 
@@ -492,12 +707,26 @@ def export_data():
     logger.info("Creating temp table in MySQL.")
 
     mysqlCur.execute("CREATE TEMPORARY TABLE import (icao_hex char(6) NOT NULL, registration varchar(8) NOT NULL, data json NULL, hash char(32) NOT NULL, KEY icao_hex (icao_hex), KEY hash (hash));")
+
+    changeFilter = None
+
+    if settings['incremental_import'] == True:
+
+        runReport.begin("Loading live registration hashes")
+
+        #Only new and changed registrations are sent to MySQL; the rest are already live with the same hash
+        changeFilter = incremental_import.change_filter(mysqlCur, "registrations", "US-FAA")
+
+        logger.info("Loaded " + str(changeFilter.liveCount) + " live registration hashes from MySQL.")
+        runReport.end(changeFilter.liveCount)
  
     logger.info("Exporting data to MySQL.")
 
-    sqlInsert = "INSERT INTO import (icao_hex, registration, data, hash) VALUES (%s,%s,%s,%s)"
+    runReport.begin("Exporting data to MySQL")
 
-    with Bar("Exporting Data to MySQL...", max=len(rows)) as bar:
+    importLoader = mysql_bulk.bulk_loader(mysqlCur, "import", ['icao_hex', 'registration', 'data', 'hash'], settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+
+    with run_report.throttled_bar("Exporting Data to MySQL...", max=rowCount) as bar:
 
         for row in rows:
             objCompleted = {}
@@ -508,8 +737,8 @@ def export_data():
             objCompleted['airworthiness_date'] = row['airworthiness_date']
             objCompleted['registration_expiration_date'] = row['registration_expiration_date']
             objCompleted['registrant_type'] = row['registrant_type']
-            objCompleted['name'] = json.loads(row['name'])
-            objCompleted['street'] = json.loads(row['street'])
+            objCompleted['name'] = row['name']
+            objCompleted['street'] = row['street']
             objCompleted['city'] = row['city']
             objCompleted['state'] = row['state']
             objCompleted['postal_code'] = row['postal_code']
@@ -517,8 +746,8 @@ def export_data():
             objCompleted['country'] = row['country']
             objCompleted['last_action'] = row['last_action']
             objCompleted['certificate_issue'] = row['certificate_issue']
-            objCompleted['certification'] = json.loads(row['certification'])
-            objCompleted['operations'] = json.loads(row['operations'])
+            objCompleted['certification'] = row['certification']
+            objCompleted['operations'] = row['operations']
             objCompleted['status'] = row['status']            
             objCompleted['aircraft'] = {}
             objCompleted['aircraft']['manufacturer'] = row['aircraft_manufacturer']
@@ -558,35 +787,69 @@ def export_data():
             if objCompleted['powerplant'] == {}:
                 del objCompleted['powerplant']
             
-            mysqlCur.execute(sqlInsert, (objCompleted['icao_hex'], objCompleted['registration'], json.dumps(objCompleted), hashlib.md5(json.dumps(objCompleted).encode('utf-8')).hexdigest(), ))
+            data, dataHash = canonical_json.encode(objCompleted, settings['hash_scheme'])
+
+            if changeFilter is None or changeFilter.changed(objCompleted['icao_hex'], dataHash):
+                importLoader.add((objCompleted['icao_hex'], objCompleted['registration'], data, dataHash, ))
 
             #Increment the bar
             bar.next()
 
         bar.finish()
 
+    importLoader.finish()
+    runReport.end(rowCount, sent=importLoader.count, mysql_load_seconds=importLoader.loadSeconds)
+
+    logger.info(importLoader.summary())
+    print(importLoader.summary())
+
     logger.info("Committing import data to MySQL.")
 
+    runReport.begin("Committing import data to MySQL")
+
     with yaspin(text="Committing import data to MySQL...") as spinner:
         registrationsDb.commit()
 
-        spinner.text = "Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.\n"
+        spinner.text = "Committed " + str(importLoader.count) + " rows of import data to MySQL.\n"
         spinner.ok()
 
-    logger.info("Committed " + str(mysqlCur.rowcount) + " rows of import data to MySQL.")
+    logger.info("Committed " + str(importLoader.count) + " rows of import data to MySQL.")
+    runReport.end()
+
+    if changeFilter is not None:
+
+        runReport.begin("Sending vanished registrations")
+
+        #Registrations that were live but not in this file are sent as keys only
+        vanishedCount = changeFilter.send_vanished(mysqlCur, settings['bulk_load_mode'], settings['bulk_load_batch_size'])
+        registrationsDb.commit()
+
+        runReport.end(vanishedCount)
+
+        logger.info(changeFilter.summary())
+        print(changeFilter.summary())
 
     #Delete registrations that don't exist in the import
     logger.info("Deleting deregistered registrations.")
 
+    runReport.begin("Deleting deregistered registrations")
+
     with yaspin(text="Deleting deregistered registrations...") as spinner:
 
-        mysqlCur.execute("UPDATE registrations, \
-                            (SELECT registrations.unique_id FROM registrations \
-                            LEFT OUTER JOIN import ON registrations.icao_hex = import.icao_hex \
-                            INNER JOIN sources ON registrations.source = sources.unique_id \
-                            WHERE import.icao_hex IS NULL AND registrations.deleted IS NULL AND sources.agency = 'US-FAA') as d \
-                        SET registrations.deleted = CURRENT_TIMESTAMP \
-                        WHERE registrations.unique_id = d.unique_id;")
+        if changeFilter is None:
+            mysqlCur.execute("UPDATE registrations, \
+                                (SELECT registrations.unique_id FROM registrations \
+                                LEFT OUTER JOIN import ON registrations.icao_hex = import.icao_hex \
+                                INNER JOIN sources ON registrations.source = sources.unique_id \
+                                WHERE import.icao_hex IS NULL AND registrations.deleted IS NULL AND sources.agency = 'US-FAA') as d \
+                            SET registrations.deleted = CURRENT_TIMESTAMP \
+                            WHERE registrations.unique_id = d.unique_id;")
+        else:
+            mysqlCur.execute("UPDATE registrations \
+                                INNER JOIN vanished ON registrations.icao_hex = vanished.icao_hex \
+                                INNER JOIN sources ON registrations.source = sources.unique_id \
+                            SET registrations.deleted = CURRENT_TIMESTAMP \
+                            WHERE registrations.deleted IS NULL AND sources.agency = 'US-FAA';")
 
         logger.info("Committing deletion of deregistered registrations to MySQL.")
         registrationsDb.commit()
@@ -595,10 +858,13 @@ def export_data():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " missing registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
 
     #Delete registrations if we have a new record coming in where the hashes don't match
     logger.info("Deleting obsolete registrations.")
 
+    runReport.begin("Deleting obsolete registrations")
+
     with yaspin(text="Deleting obsolete registrations...") as spinner:
 
         mysqlCur.execute("UPDATE registrations, \
@@ -616,10 +882,20 @@ def export_data():
         spinner.ok("")
 
     logger.info("Marked " + str(mysqlCur.rowcount) + " obsolete registrations as deleted.")
+    runReport.end(mysqlCur.rowcount)
+
+    #A second record for a registration skipped as unchanged marks that registration obsolete above, so it is made live again
+    if changeFilter is not None and len(changeFilter.rematched) > 0:
+        restoredCount = changeFilter.restore_rematched(mysqlCur)
+        registrationsDb.commit()
+
+        logger.info("Restored " + str(restoredCount) + " unchanged registrations sharing an ICAO hex with a changed one.")
 
     # Create new registrations and mark deleted registrations with a matching has as undeleted
     logger.info("Creating new registrations.")
 
+    runReport.begin("Creating new registrations")
+
     with yaspin(text="Creating new registrations...") as spinner:
 
         mysqlCur.execute("INSERT INTO registrations (icao_hex, registration, data,  hash, source) \
@@ -634,11 +910,326 @@ def export_data():
         spinner.ok("")
 
     logger.info("Created " + str(mysqlCur.rowcount) + " new registrations.")
+    runReport.end(mysqlCur.rowcount)
+
+    #Bring the active projection in line with the live rows
+    logger.info("Refreshing active registrations.")
+
+    runReport.begin("Refreshing active registrations")
+
+    with yaspin(text="Refreshing active registrations...") as spinner:
+
+        mysqlCur.execute("DELETE registrations_active FROM registrations_active \
+                            LEFT OUTER JOIN registrations ON registrations.unique_id = registrations_active.unique_id AND registrations.deleted IS NULL \
+                            WHERE registrations.unique_id IS NULL;")
+
+        removedCount = mysqlCur.rowcount
+
+        #Documents are either copied as JSON or stored compressed by MySQL's zlib COMPRESS()
+        if settings['registration_storage'] == "zlib":
+            dataColumns = "NULL, COMPRESS(CAST(registrations.data AS CHAR))"
+        else:
+            dataColumns = "registrations.data, NULL"
+
+        mysqlCur.execute("INSERT INTO registrations_active (icao_hex, unique_id, registration, data, data_zlib, hash, source) \
+                            (SELECT CONV(registrations.icao_hex, 16, 10), registrations.unique_id, registrations.registration, " + dataColumns + ", registrations.hash, registrations.source FROM registrations \
+                            LEFT OUTER JOIN registrations_active ON registrations_active.unique_id = registrations.unique_id \
+                            WHERE registrations.deleted IS NULL AND registrations_active.unique_id IS NULL AND registrations.icao_hex REGEXP '^[0-9A-Fa-f]{6}$');")
+
+        addedCount = mysqlCur.rowcount
+
+        #Signal the API to drop its cached registrations
+        mysqlCur.execute("INSERT INTO dataset_versions (dataset) VALUES ('registrations') ON DUPLICATE KEY UPDATE updated = CURRENT_TIMESTAMP(6);")
+
+        logger.info("Committing active registrations to MySQL.")
+        registrationsDb.commit()
+
+        spinner.text = "Removed " + str(removedCount) + " and added " + str(addedCount) + " active registrations.\n"
+        spinner.ok("")
+
+    logger.info("Removed " + str(removedCount) + " and added " + str(addedCount) + " active registrations.")
+    runReport.end(removedCount + addedCount)
     
     mysqlCur.close()
     registrationsDb.close()
 
 
+#Descriptions of the FAA's single value codes, looked up by the code as it appears in the file
+REGISTRANT_TYPES = {
+    "1" : "Individual",
+    "2" : "Partnership",
+    "3" : "Corporation",
+    "4" : "Co-Owned",
+    "5" : "Government",
+    "7" : "LLC",
+    "8" : "Non-Citizen Corporation",
+    "9" : "Non-Citizen Co-Owned",
+    "" : "None"
+}
+
+REGIONS = {
+    "1" : "Eastern",
+    "2" : "Southwestern",
+    "3" : "Central",
+    "4" : "Western-Pacific",
+    "5" : "Alaskan",
+    "7" : "Southern",
+    "8" : "European",
+    "C" : "Great Lakes",
+    "E" : "New England",
+    "S" : "Northwest Mountain",
+    "" : "None"
+}
+
+AIRCRAFT_TYPES = {
+    "1" : "Glider",
+    "2" : "Balloon",
+    "3" : "Blimp/Dirigible",
+    "4" : "Fixed wing single engine",
+    "5" : "Fixed wing multi engine",
+    "6" : "Rotorcraft",
+    "7" : "Weight-shift-control",
+    "8" : "Powered Parachute",
+    "9" : "Gyroplane",
+    "H" : "Hybrid Lift",
+    "O" : "Other"
+}
+
+ENGINE_TYPES = {
+    "0" : "None",
+    "1" : "Reciprocating",
+    "2" : "Turbo-prop",
+    "3" : "Turbo-shaft",
+    "4" : "Turbo-jet",
+    "5" : "Turbo-fan",
+    "6" : "Ramjet",
+    "7" : "2 Cycle",
+    "8" : "4 Cycle",
+    "9" : "Unknown",
+    "10" : "Electric",
+    "11" : "Rotary"
+}
+
+STATUSES = {
+    "A" : "The Triennial Aircraft Registration form was mailed and has not been returned by the Post Office",
+    "D" : "Expired Dealer",
+    "E" : "The Certificate of Aircraft Registration was revoked by enforcement action",
+    "M" : "Valid - Aircraft assigned to the manufacturer under the manufacturer’s Dealer Certificate",
+    "N" : "Non-citizen Corporations which have not returned their flight hour reports",
+    "R" : "Registration pending",
+    "S" : "Second Triennial Aircraft Registration Form has been mailed and has not been returned by the Post Office",
+    "T" : "Valid Registration from a Trainee",
+    "V" : "Valid Registration",
+    "W" : "Certificate of Registration has been deemed Ineffective or Invalid",
+    "X" : "Enforcement Letter",
+    "Z" : "Permanent Reserved",
+    "1" : "Triennial Aircraft Registration form was returned by the Post Office as undeliverable",
+    "2" : "N-Number Assigned - but has not yet been registered",
+    "3" : "N-Number assigned as a Non Type Certificated aircraft - but has not yet been registered",
+    "4" : "N-Number assigned as import - but has not yet been registered",
+    "5" : "Reserved N-Number",
+    "6" : "Administratively canceled",
+    "7" : "Sale reported",
+    "8" : "A second attempt has been made at mailing a Triennial Aircraft Registration form to the owner with no response",
+    "9" : "Certificate of Registration has been revoked",
+    "10" : "N-Number assigned, has not been registered and is pending cancellation",
+    "11" : "N-Number assigned as a Non Type Certificated (Amateur) but has not been registered that is pending cancellation",
+    "12" : "N-Number assigned as import but has not been registered that is pending cancellation",
+    "13" : "Registration Expired",
+    "14" : "First Notice for Re-Registration/Renewal",
+    "15" : "Second Notice for Re-Registration/Renewal",
+    "16" : "Registration Expired - Pending Cancellation",
+    "17" : "Sale Reported - Pending Cancellation",
+    "18" : "Sale Reported - Canceled",
+    "19" : "Registration Pending - Pending Cancellation",
+    "20" : "Registration Pending - Canceled",
+    "21" : "Revoked - Pending Cancellation",
+    "22" : "Revoked - Canceled",
+    "23" : "Expired Dealer (Pending Cancellation)",
+    "24" : "Third Notice for Re-Registration/Renewal",
+    "25" : "First Notice for Registration Renewal",
+    "26" : "Second Notice for Registration Renewal",
+    "27" : "Registration Expired",
+    "28" : "Third Notice for Registration Renewal",
+    "29" : "Registration Expired - Pending Cancellation"
+}
+
+CATEGORIES = {
+    "1" : "Land",
+    "2" : "Sea",
+    "3" : "Amphibian"
+}
+
+BUILDER_CERTIFICATIONS = {
+    "0" : "Type Certificated",
+    "1" : "Not Type Certificated",
+    "2" : "Light Sport"
+}
+
+WEIGHTS = {
+    "CLASS 1" : "Up to 12,499lbs",
+    "CLASS 2" : "12,500 - 19,999lbs",
+    "CLASS 3" : "Exceeds 20,000lbs",
+    "CLASS 4" : "UAV up to 55lbs"
+}
+
+#Operations of each airworthiness classification, by the characters that follow the classification in a certification code.  A
+#  two character code applies when its first character is followed by its second, such as 8A for experimental operations.
+STANDARD_OPERATIONS = {
+    "N" : "Normal",
+    "U" : "Utility",
+    "A" : "Acrobatic",
+    "T" : "Transport",
+    "G" : "Glider",
+    "B" : "Balloon",
+    "C" : "Commuter",
+    "O" : "Other"
+}
+
+RESTRICTED_OPERATIONS = {
+    "0" : "Other",
+    "1" : "Agriculture and Pest Control",
+    "2" : "Aerial Surveying",
+    "3" : "Aerial Advertising",
+    "4" : "Forest",
+    "5" : "Patrolling",
+    "6" : "Weather Control",
+    "7" : "Carriage of Cargo"
+}
+
+EXPERIMENTAL_OPERATIONS = {
+    "0" : "To show compliance with FAR",
+    "1" : "Research and Development",
+    "2" : "Amateur Built",
+    "3" : "Exhibition",
+    "4" : "Racing",
+    "5" : "Crew Training",
+    "6" : "Market Survey",
+    "7" : "Operating Kit Built Aircraft",
+    "8A" : "Reg. Prior to 01/31/08",
+    "8B" : "Operating Light-Sport Kit-Built",
+    "8C" : "Operating Light-Sport Previously issued cert under 21.190",
+    "9A" : "Unmanned Aircraft - Research and Development",
+    "9B" : "Unmanned Aircraft - Market Survey",
+    "9C" : "Unmanned Aircraft - Crew Training",
+    "9D" : "Unmanned Aircraft - Exhibition",
+    "9E" : "Unmanned Aircraft - Compliance with CFR"
+}
+
+PROVISIONAL_OPERATIONS = {
+    "1" : "Class I",
+    "2" : "Class II"
+}
+
+SPECIAL_FLIGHT_PERMIT_OPERATIONS = {
+    "1" : "Ferry flight for repairs, alterations, maintenance or storage",
+    "2" : "Evacuate from area of impending danger",
+    "3" : "Operation in excess of maximum certificated",
+    "4" : "Delivery or export",
+    "5" : "Production flight testing",
+    "6" : "Customer Demo"
+}
+
+LIGHT_SPORT_OPERATIONS = {
+    "A" : "Airplane",
+    "G" : "Glider",
+    "L" : "Lighter than Air",
+    "P" : "Power-Parachute",
+    "W" : "Weight-Shift-Control"
+}
+
+#Airworthiness classifications by the first character of a certification code, with the operations that may follow; None where
+#  no operations are defined.  Code 6 (multiple classifications) is decoded separately.
+CERTIFICATIONS = {
+    "1" : ("Standard", STANDARD_OPERATIONS),
+    "2" : ("Limited", None),
+    "3" : ("Restricted", RESTRICTED_OPERATIONS),
+    "4" : ("Experimental", EXPERIMENTAL_OPERATIONS),
+    "5" : ("Provisional", PROVISIONAL_OPERATIONS),
+    "7" : ("Primary", None),
+    "8" : ("Special Flight Permit", SPECIAL_FLIGHT_PERMIT_OPERATIONS),
+    "9" : ("Light Sport", LIGHT_SPORT_OPERATIONS)
+}
+
+MULTIPLE_CERTIFICATIONS = {
+    "1" : "Standard",
+    "2" : "Limited",
+    "3" : "Restricted"
+}
+
+#Decoded certification codes; the registry only uses a few hundred distinct codes
+CERTIFICATION_CACHE = {}
+
+def decode_operations(codes, operationTable, classification, operations, warnings):
+
+    prefixes = set(code[0] for code in operationTable if len(code) > 1)
+    prefix = ""
+
+    for entry in codes:
+
+        if entry in operationTable:
+            prefix = ""
+            operations.append(operationTable[entry])
+            continue
+
+        if entry in prefixes:
+            prefix = entry
+            continue
+
+        if prefix + entry in operationTable:
+            operations.append(operationTable[prefix + entry])
+            prefix = ""
+            continue
+
+        warnings.append(classification + " airworthiness type has an unknown operation provided: " + entry + " (" + codes + ")")
+
+def decode_certification(value):
+
+    #Returns the airworthiness classifications, operations and warnings for an upper case certification code
+    if value in CERTIFICATION_CACHE:
+        return CERTIFICATION_CACHE[value]
+
+    certification = []
+    operations = []
+    warnings = []
+
+    if value == "":
+        certification.append("None")
+
+    elif value[0] == "0":
+        certification.append("Unknown")
+
+    elif value[0] == "6":
+
+        #Up to two classifications, then the restricted operations after a separator
+        for entry in value[1:3]:
+
+            if entry in MULTIPLE_CERTIFICATIONS:
+                certification.append(MULTIPLE_CERTIFICATIONS[entry])
+                continue
+
+            warnings.append("Multiple certifications has an unknown certification provided: " + entry)
+
+        decode_operations(value[4:], RESTRICTED_OPERATIONS, "Multiple", operations, warnings)
+
+    elif value[0] in CERTIFICATIONS:
+        classification, operationTable = CERTIFICATIONS[value[0]]
+        certification.append(classification)
+
+        if operationTable is not None:
+            decode_operations(value[1:], operationTable, classification, operations, warnings)
+
+        elif len(value) > 1:
+            warnings.append(classification + " airworthiness type has an unknown operation provided: " + value)
+
+    else:
+        certification.append("Unknown")
+        warnings.append("Unknown certification type provided: " + value)
+
+    CERTIFICATION_CACHE[value] = (tuple(certification), tuple(operations), tuple(warnings))
+
+    return CERTIFICATION_CACHE[value]
+
 def parseYYYYMMDD(value):
 
     if value == "":
@@ -648,6 +1239,11 @@ def parseYYYYMMDD(value):
 
 class registration():
 
+    INSERT_STATEMENT = "INSERT INTO registrations (registration, serial_number, code_aircraft, code_engine, manufactured_year, \
+                        registrant_type, name, street, city, state, postal_code, region, country, last_action, certificate_issue, \
+                        certification, operations, aircraft_type, engine_type, status, icao24_octal, fractional_ownership, airworthiness_date, \
+                        expiration_date, kit_manufacturer, kit_model, icao24_hex) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+
     def __init__(self):
         self.registration = ""
         self.serial_number = ""
@@ -684,40 +1280,8 @@ class registration():
 
     def set_type_registrant(self, value):
 
-        if value == "1":
-            self.registrant_type = "Individual"
-            return
-
-        if value == "2":
-            self.registrant_type = "Partnership"
-            return
-
-        if value == "3":
-            self.registrant_type = "Corporation"
-            return
-
-        if value == "4":
-            self.registrant_type = "Co-Owned"
-            return
-
-        if value == "5":
-            self.registrant_type = "Government"
-            return
-
-        if value == "7":
-            self.registrant_type = "LLC"
-            return
-
-        if value == "8":
-            self.registrant_type = "Non-Citizen Corporation"
-            return
-
-        if value == "9":
-            self.registrant_type = "Non-Citizen Co-Owned"
-            return
-
-        if value == "":
-            self.registrant_type = "None"
+        if value in REGISTRANT_TYPES:
+            self.registrant_type = REGISTRANT_TYPES[value]
             return
 
         self.registrant_type = "Unknown"
@@ -734,870 +1298,146 @@ class registration():
 
     def set_region(self, value):
 
-        if value == "1":
-            self.region = "Eastern"
-            return
-
-        if value == "2":
-            self.region = "Southwestern"
-            return
-
-        if value == "3":
-            self.region = "Central"
-            return
-
-        if value == "4":
-            self.region = "Western-Pacific"
-            return
-
-        if value == "5":
-            self.region = "Alaskan"
-            return
-
-        if value == "7":
-            self.region = "Southern"
-            return
-
-        if value == "8":
-            self.region = "European"
-            return
-
-        if value == "C":
-            self.region = "Great Lakes"
-            return
-
-        if value == "E":
-            self.region = "New England"
-            return
-        
-        if value == "S":
-            self.region = "Northwest Mountain"
-            return
-
-        if value == "":
-            self.region = "None"
+        if value in REGIONS:
+            self.region = REGIONS[value]
             return
 
         self.region = "Unknown"
         logger.warning("Unknown region type provided: " + value + " " + str(self.toDict()))
         return
-    
+
     def set_certification(self, value):
 
-        value = str(value).upper()
+        certification, operations, warnings = decode_certification(str(value).upper())
 
-        if value == "":
-            self.certification.append("None")
-            return
+        self.certification.extend(certification)
+        self.operations.extend(operations)
 
-        #Set the airworthiness
-        if value[0] == "0":
-            self.certification.append("Unknown")
-            return
+        for warning in warnings:
+            logger.warning(warning + " " + str(self.toDict()))
 
-        if value[0] == "1":
-            self.certification.append("Standard")
-            self.operations_standard(value)
-            return
+    def set_aircraft_type(self, value):
 
-        if value[0] == "2":
-            self.certification.append("Limited")
-            self.operations_limited(value)
+        if value in AIRCRAFT_TYPES:
+            self.aircraft_type = AIRCRAFT_TYPES[value]
             return
 
-        if value[0] == "3":
-            self.certification.append("Restricted")
-            self.operations_restricted(value)
-            return
+        self.aircraft_type = "Unknown"
+        logger.warning("Unknown aircarft type provided: " + value + " " + str(self.toDict()))
+        return
 
-        if value[0] == "4":
-            self.certification.append("Experimental")
-            self.operations_experimental(value)
-            return
+    def set_engine_type(self, value):
 
-        if value[0] == "5":
-            self.certification.append("Provisional")
-            self.operations_provisional(value)
+        if value in ENGINE_TYPES:
+            self.engine_type = ENGINE_TYPES[value]
             return
 
-        if value[0] == "6":
-            self.operations_multiple(value)
-            return
+        self.engine_type = "Unknown"
+        logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
+        return
 
-        if value[0] == "7":
-            self.certification.append("Primary")
-            self.operations_primary(value)
-            return
+    def set_status(self, value):
 
-        if value[0] == "8":
-            self.certification.append("Special Flight Permit")
-            self.operations_sfp(value)
-            return
+        value = str(value).upper()
 
-        if value[0] == "9":
-            self.certification.append("Light Sport")
-            self.operations_ls(value)
+        if value in STATUSES:
+            self.status = STATUSES[value]
             return
 
-        self.certification.append("Unknown")
-        logger.warning("Unknown certification type provided: " + value + " " + str(self.toDict()))
+        self.status = "Unknown"
+        logger.warning("Unknown status provided: " + value + " " + str(self.toDict()))
+        return
 
-    def operations_standard(self, value):
+    def set_fractional_ownership(self, value):
 
-        if len(value) < 2:
-            return
+        value = str(value).upper()
 
-        for entry in value[1:]:
+        if value == "Y":
+            self.fractional_ownership = True
+    
+    def commit(self, batch):
 
-            if entry == "N":
-                self.operations.append("Normal")
-                continue
+        parameters = (self.registration,
+                        self.serial_number,
+                        self.code_aircraft,
+                        self.code_engine,
+                        self.manufactured_year, 
+                        self.registrant_type,
+                        json.dumps(self.name), 
+                        json.dumps(self.street), 
+                        self.city, 
+                        self.state, 
+                        self.postal_code, 
+                        self.region, 
+                        self.country, 
+                        self.last_action,
+                        self.certificate_issue,
+                        json.dumps(self.certification), 
+                        json.dumps(self.operations), 
+                        self.aircraft_type, 
+                        self.engine_type, 
+                        self.status, 
+                        self.icao24_octal, 
+                        self.fractional_ownership, 
+                        self.airworthiness_date, 
+                        self.expiration_date, 
+                        self.kit_manufacturer, 
+                        self.kit_model,
+                        self.icao24_hex)
 
-            if entry == "U":
-                self.operations.append("Utility")
-                continue
+        #Queue the record for the table
+        batch.add(parameters)
 
-            if entry == "A":
-                self.operations.append("Acrobatic")
-                continue
+    def toDict(self):
+        return self.__dict__
 
-            if entry == "T":
-                self.operations.append("Transport")
-                continue
+class engine():
 
-            if entry == "G":
-                self.operations.append("Glider")
-                continue
+    INSERT_STATEMENT = "INSERT INTO engines (code, manufacturer, model, engine_type, power_value, power_type) VALUES (?,?,?,?,?,?)"
 
-            if entry == "B":
-                self.operations.append("Balloon")
-                continue
+    def __init__(self):
+        self.code = ""
+        self.manufacturer = ""
+        self.model = ""
+        self.engine_type = ""
+        self.power_value = ""
+        self.power_type = ""
 
-            if entry == "C":
-                self.operations.append("Commuter")
-                continue
+    def set_engine_type(self, value):
 
-            if entry == "O":
-                self.operations.append("Other")
-                continue
+        if value in ENGINE_TYPES:
+            self.engine_type = ENGINE_TYPES[value]
+            return
 
-            logger.warning("Standard airworthiness type has an unknown operation provided: " + entry + " " + str(self.toDict()))
+        self.engine_type = "Unknown"
+        logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
+        return
 
-    def operations_limited(self, value):
+    def set_power(self, horsepower, thrust):
 
-        if len(value) < 2:
+        if horsepower > 0:
+            self.power_type = "Horsepower"
+            self.power_value = horsepower
             return
-        
-        logger.warning("Limited airworthiness type has an unknown operation provided: " + value + " " + str(self.toDict()))
 
-    def operations_restricted(self, value):
-        
-        if len(value) < 2:
+        if thrust > 0:
+            self.power_type = "Thrust"
+            self.power_value = thrust
             return
+    
+    def toDict(self):
+        return self.__dict__
 
-        for entry in value[1:]:
+    def commit(self, batch):
 
-            if entry == "0":
-                self.operations.append("Other")
-                continue
+        parameters = (self.code, self.manufacturer, self.model, self.engine_type, self.power_value, self.power_type)
 
-            if entry == "1":
-                self.operations.append("Agriculture and Pest Control")
-                continue
+        #Queue the record for the table
+        batch.add(parameters)
 
-            if entry == "2":
-                self.operations.append("Aerial Surveying")
-                continue
+class aircraft():
 
-            if entry == "3":
-                self.operations.append("Aerial Advertising")
-                continue
-
-            if entry == "4":
-                self.operations.append("Forest")
-                continue
-
-            if entry == "5":
-                self.operations.append("Patrolling")
-                continue
-
-            if entry == "6":
-                self.operations.append("Weather Control")
-                continue
-
-            if entry == "7":
-                self.operations.append("Carriage of Cargo")
-                continue
-
-            logger.warning("Restricted airworthiness type has an unknown operation provided: " + value + " " + str(self.toDict()))
-
-    def operations_experimental(self, value):
-
-        if len(value) < 2:
-            return
-
-        prior_entry = 0
-
-        for entry in value[1:]:
-
-            if entry == "0":
-                prior_entry = 0
-                self.operations.append("To show compliance with FAR")
-                continue
-
-            if entry == "1":
-                prior_entry = 0
-                self.operations.append("Research and Development")
-                continue
-
-            if entry == "2":
-                prior_entry = 0
-                self.operations.append("Amateur Built")
-                continue
-
-            if entry == "3":
-                prior_entry = 0
-                self.operations.append("Exhibition")
-                continue
-
-            if entry == "4":
-                prior_entry = 0
-                self.operations.append("Racing")
-                continue
-
-            if entry == "5":
-                prior_entry = 0
-                self.operations.append("Crew Training")
-                continue
-
-            if entry == "6":
-                prior_entry = 0
-                self.operations.append("Market Survey")
-                continue
-
-            if entry == "7":
-                prior_entry = 0
-                self.operations.append("Operating Kit Built Aircraft")
-                continue
-
-            if entry == "8":
-                prior_entry = 8
-                continue
-
-            if prior_entry == 8 and entry == "A":
-                prior_entry = 0
-                self.operations.append("Reg. Prior to 01/31/08")
-                continue
-
-            if prior_entry == 8 and entry == "B":
-                prior_entry = 0
-                self.operations.append("Operating Light-Sport Kit-Built")
-                continue
-
-            if prior_entry == 8 and entry == "C":
-                prior_entry = 0
-                self.operations.append("Operating Light-Sport Previously issued cert under 21.190")
-                continue
-
-            if entry == "9":
-                prior_entry = 9
-                continue
-
-            if prior_entry == 9 and entry == "A":
-                prior_entry = 0
-                self.operations.append("Unmanned Aircraft - Research and Development")
-                continue
-
-            if prior_entry == 9 and entry == "B":
-                prior_entry = 0
-                self.operations.append("Unmanned Aircraft - Market Survey")
-                continue
-
-            if prior_entry == 9 and entry == "C":
-                prior_entry = 0
-                self.operations.append("Unmanned Aircraft - Crew Training")
-                continue
-
-            if prior_entry == 9 and entry == "D":
-                prior_entry = 0
-                self.operations.append("Unmanned Aircraft - Exhibition")
-                continue
-
-            if prior_entry == 9 and entry == "E":
-                prior_entry = 0
-                self.operations.append("Unmanned Aircraft - Compliance with CFR")
-                continue
-
-            logger.warning("Experimental airworthiness type has an unknown operation provided: " + value + " " + str(self.toDict()))
-        
-    def operations_provisional(self, value):
-        
-        if len(value) < 2:
-            return
-
-        for entry in value[1:]:
-
-            if entry == "1":
-                self.operations.append("Class I")
-                continue
-
-            if entry == "2":
-                self.operations.append("Class II")
-                continue
-
-            logger.warning("Provisional airworthiness type has an unknown operation provided: " + entry + " " + str(self.toDict()))
-
-    def operations_multiple(self, value):
-
-        #Handle the multiple certification types
-        for entry in value[1:3]:
-
-            if entry == "1":
-                self.certification.append("Standard")
-                continue
-
-            if entry == "2":
-                self.certification.append("Limited")
-                continue
-
-            if entry == "3":
-                self.certification.append("Restricted")
-                continue
-
-            logger.warning("Multiple certifications has an unknown certification provided: " + entry + " " + str(self.toDict()))
-
-        #Handle the operation types
-        for entry in value[4:]:
-
-            if entry == "0":
-                self.operations.append("Other")
-                continue
-
-            if entry == "1":
-                self.operations.append("Agriculture and Pest Control")
-                continue
-
-            if entry == "2":
-                self.operations.append("Aerial Surveying")
-                continue
-
-            if entry == "3":
-                self.operations.append("Aerial Advertising")
-                continue
-
-            if entry == "4":
-                self.operations.append("Forest")
-                continue
-
-            if entry == "5":
-                self.operations.append("Patrolling")
-                continue
-
-            if entry == "6":
-                self.operations.append("Weather Control")
-                continue
-
-            if entry == "7":
-                self.operations.append("Carriage of Cargo")
-                continue
-
-            logger.warning("Multiple airworthiness type has an unknown operation provided: " + value + " " + str(self.toDict()))
-
-    def operations_primary(self, value):
-        
-        if len(value) > 1:
-            logger.warning("Primary airworthiness type has an unknown operation provided: " + value + " " + str(self.toDict()))
-
-    def operations_sfp(self, value):
-        
-        if len(value) < 2:
-            return
-
-        for entry in value[1:]:
-
-            if entry == "1":
-                self.operations.append("Ferry flight for repairs, alterations, maintenance or storage")
-                continue
-
-            if entry == "2":
-                self.operations.append("Evacuate from area of impending danger")
-                continue
-
-            if entry == "3":
-                self.operations.append("Operation in excess of maximum certificated")
-                continue
-
-            if entry == "4":
-                self.operations.append("Delivery or export")
-                continue
-
-            if entry == "5":
-                self.operations.append("Production flight testing")
-                continue
-
-            if entry == "6":
-                self.operations.append("Customer Demo")
-                continue
-
-            logger.warning("Special Flight Permit airworthiness type has an unknown operation provided: " + entry + " " + str(self.toDict()))
-
-    def operations_ls(self, value):
-
-        if len(value) < 2:
-            return
-
-        for entry in value[1:]:
-
-            if entry == "A":
-                self.operations.append("Airplane")
-                continue
-
-            if entry == "G":
-                self.operations.append("Glider")
-                continue
-
-            if entry == "L":
-                self.operations.append("Lighter than Air")
-                continue
-
-            if entry == "P":
-                self.operations.append("Power-Parachute")
-                continue
-
-            if entry == "W":
-                self.operations.append("Weight-Shift-Control")
-                continue         
-
-            logger.warning("Light Sport airworthiness type has an unknown operation provided: " + entry + " " + str(self.toDict()))
-
-    def set_aircraft_type(self, value):
-        
-        if value == "1":
-            self.aircraft_type = "Glider"
-            return
-
-        if value == "2":
-            self.aircraft_type = "Balloon"
-            return
-
-        if value == "3":
-            self.aircraft_type = "Blimp/Dirigible"
-            return
-
-        if value == "4":
-            self.aircraft_type = "Fixed wing single engine"
-            return
-
-        if value == "5":
-            self.aircraft_type = "Fixed wing multi engine"
-            return
-
-        if value == "6":
-            self.aircraft_type = "Rotorcraft"
-            return
-
-        if value == "7":
-            self.aircraft_type = "Weight-shift-control"
-            return
-
-        if value == "8":
-            self.aircraft_type = "Powered Parachute"
-            return
-
-        if value == "9":
-            self.aircraft_type = "Gyroplane"
-            return
-
-        if value == "H":
-            self.aircraft_type = "Hybrid Lift"
-            return
-
-        if value == "O":
-            self.aircraft_type = "Other"
-            return
-
-        self.aircraft_type = "Unknown"
-        logger.warning("Unknown aircarft type provided: " + value + " " + str(self.toDict()))
-        return
-
-    def set_engine_type(self, value):
-
-        if value == "0":
-            self.engine_type = "None"
-            return
-        
-        if value == "1":
-            self.engine_type = "Reciprocating"
-            return
-
-        if value == "2":
-            self.engine_type = "Turbo-prop"
-            return
-
-        if value == "3":
-            self.engine_type = "Turbo-shaft"
-            return
-        
-        if value == "4":
-            self.engine_type = "Turbo-jet"
-            return
-
-        if value == "5":
-            self.engine_type = "Turbo-fan"
-            return
-
-        if value == "6":
-            self.engine_type = "Ramjet"
-            return
-
-        if value == "7":
-            self.engine_type = "2 Cycle"
-            return
-
-        if value == "8":
-            self.engine_type = "4 Cycle"
-            return
-
-        if value == "9":
-            self.engine_type = "Unknown"
-            return
-
-        if value == "10":
-            self.engine_type = "Electric"
-            return
-
-        if value == "11":
-            self.engine_type = "Rotary"
-            return
-
-        #Default "Unknown"
-        self.engine_type = "Unknown"
-        logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
-        return
-
-    def set_status(self, value):
-
-        value = str(value).upper()
-
-        if value == "A":
-            self.status = "The Triennial Aircraft Registration form was mailed and has not been returned by the Post Office"
-            return
-
-        if value == "D":
-            self.status = "Expired Dealer"
-            return
-
-        if value == "E":
-            self.status = "The Certificate of Aircraft Registration was revoked by enforcement action"
-            return
-
-        if value == "M":
-            self.status = "Valid - Aircraft assigned to the manufacturer under the manufacturer’s Dealer Certificate"
-            return
-
-        if value == "N":
-            self.status = "Non-citizen Corporations which have not returned their flight hour reports"
-            return
-
-        if value == "R":
-            self.status = "Registration pending"
-            return
-
-        if value == "S":
-            self.status = "Second Triennial Aircraft Registration Form has been mailed and has not been returned by the Post Office"
-            return
-
-        if value == "T":
-            self.status = "Valid Registration from a Trainee"
-            return
-
-        if value == "V":
-            self.status = "Valid Registration"
-            return
-
-        if value == "W":
-            self.status = "Certificate of Registration has been deemed Ineffective or Invalid"
-            return
-
-        if value == "X":
-            self.status = "Enforcement Letter"
-            return
-
-        if value == "Z":
-            self.status = "Permanent Reserved"
-            return
-
-        if value == "1":
-            self.status = "Triennial Aircraft Registration form was returned by the Post Office as undeliverable"
-            return
-
-        if value == "2":
-            self.status = "N-Number Assigned - but has not yet been registered"
-            return
-
-        if value == "3":
-            self.status = "N-Number assigned as a Non Type Certificated aircraft - but has not yet been registered"
-            return
-
-        if value == "4":
-            self.status = "N-Number assigned as import - but has not yet been registered"
-            return
-
-        if value == "5":
-            self.status = "Reserved N-Number"
-            return
-
-        if value == "6":
-            self.status = "Administratively canceled"
-            return
-
-        if value == "7":
-            self.status = "Sale reported"
-            return
-
-        if value == "8":
-            self.status = "A second attempt has been made at mailing a Triennial Aircraft Registration form to the owner with no response"
-            return
-
-        if value == "9":
-            self.status = "Certificate of Registration has been revoked"
-            return
-
-        if value == "10":
-            self.status = "N-Number assigned, has not been registered and is pending cancellation"
-            return
-
-        if value == "11":
-            self.status = "N-Number assigned as a Non Type Certificated (Amateur) but has not been registered that is pending cancellation"
-            return
-
-        if value == "12":
-            self.status = "N-Number assigned as import but has not been registered that is pending cancellation"
-            return
-
-        if value == "13":
-            self.status = "Registration Expired"
-            return
-
-        if value == "14":
-            self.status = "First Notice for Re-Registration/Renewal"
-            return
-
-        if value == "15":
-            self.status = "Second Notice for Re-Registration/Renewal"
-            return
-
-        if value == "16":
-            self.status = "Registration Expired - Pending Cancellation"
-            return
-
-        if value == "17":
-            self.status = "Sale Reported - Pending Cancellation"
-            return
-
-        if value == "18":
-            self.status = "Sale Reported - Canceled"
-            return
-
-        if value == "19":
-            self.status = "Registration Pending - Pending Cancellation"
-            return
-
-        if value == "20":
-            self.status = "Registration Pending - Canceled"
-            return
-
-        if value == "21":
-            self.status = "Revoked - Pending Cancellation"
-            return
-
-        if value == "22":
-            self.status = "Revoked - Canceled"
-            return
-
-        if value == "23":
-            self.status = "Expired Dealer (Pending Cancellation)"
-            return
-
-        if value == "24":
-            self.status = "Third Notice for Re-Registration/Renewal"
-            return
-
-        if value == "25":
-            self.status = "First Notice for Registration Renewal"
-            return
-
-        if value == "26":
-            self.status = "Second Notice for Registration Renewal"
-            return
-
-        if value == "27":
-            self.status = "Registration Expired"
-            return
-
-        if value == "28":
-            self.status = "Third Notice for Registration Renewal"
-            return
-
-        if value == "29":
-            self.status = "Registration Expired - Pending Cancellation"
-            return
-    
-        #Default "Unknown"
-        self.status = "Unknown"
-        logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
-        return
-
-    def set_fractional_ownership(self, value):
-
-        value = str(value).upper()
-
-        if value == "Y":
-            self.fractional_ownership = True
-    
-    def commit(self):
-        
-        dbCursor = import_sql.cursor()
-
-        insert_statement = "INSERT INTO registrations (registration, serial_number, code_aircraft, code_engine, manufactured_year, \
-                            registrant_type, name, street, city, state, postal_code, region, country, last_action, certificate_issue, \
-                            certification, operations, aircraft_type, engine_type, status, icao24_octal, fractional_ownership, airworthiness_date, \
-                            expiration_date, kit_manufacturer, kit_model, icao24_hex) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
-        parameters = (self.registration,
-                        self.serial_number,
-                        self.code_aircraft,
-                        self.code_engine,
-                        self.manufactured_year, 
-                        self.registrant_type,
-                        json.dumps(self.name), 
-                        json.dumps(self.street), 
-                        self.city, 
-                        self.state, 
-                        self.postal_code, 
-                        self.region, 
-                        self.country, 
-                        self.last_action,
-                        self.certificate_issue,
-                        json.dumps(self.certification), 
-                        json.dumps(self.operations), 
-                        self.aircraft_type, 
-                        self.engine_type, 
-                        self.status, 
-                        self.icao24_octal, 
-                        self.fractional_ownership, 
-                        self.airworthiness_date, 
-                        self.expiration_date, 
-                        self.kit_manufacturer, 
-                        self.kit_model,
-                        self.icao24_hex)
-
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
-
-        #Destroy itself
-
-
-    def toDict(self):
-        return self.__dict__
-
-class engine():
-
-    def __init__(self):
-        self.code = ""
-        self.manufacturer = ""
-        self.model = ""
-        self.engine_type = ""
-        self.power_value = ""
-        self.power_type = ""
-
-
-    def set_engine_type(self, value):
-
-        if value == "0":
-            self.engine_type = "None"
-            return
-        
-        if value == "1":
-            self.engine_type = "Reciprocating"
-            return
-
-        if value == "2":
-            self.engine_type = "Turbo-prop"
-            return
-
-        if value == "3":
-            self.engine_type = "Turbo-shaft"
-            return
-        
-        if value == "4":
-            self.engine_type = "Turbo-jet"
-            return
-
-        if value == "5":
-            self.engine_type = "Turbo-fan"
-            return
-
-        if value == "6":
-            self.engine_type = "Ramjet"
-            return
-
-        if value == "7":
-            self.engine_type = "2 Cycle"
-            return
-
-        if value == "8":
-            self.engine_type = "4 Cycle"
-            return
-
-        if value == "9":
-            self.engine_type = "Unknown"
-            return
-
-        if value == "10":
-            self.engine_type = "Electric"
-            return
-
-        if value == "11":
-            self.engine_type = "Rotary"
-            return
-
-        #Default "Unknown"
-        self.engine_type = "Unknown"
-        logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
-        return
-
-    def set_power(self, horsepower, thrust):
-
-        if horsepower > 0:
-            self.power_type = "Horsepower"
-            self.power_value = horsepower
-            return
-
-        if thrust > 0:
-            self.power_type = "Thrust"
-            self.power_value = thrust
-            return
-    
-    def toDict(self):
-        return self.__dict__
-
-    def commit(self):
-
-        dbCursor = import_sql.cursor()
-
-        insert_statement = "INSERT INTO engines (code, manufacturer, model, engine_type, power_value, power_type) VALUES (?,?,?,?,?,?)"
-        parameters = (self.code, self.manufacturer, self.model, self.engine_type, self.power_value, self.power_type)
-
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
-
-class aircraft():
+    INSERT_STATEMENT = "INSERT INTO aircraft (code, manufacturer, model, aircraft_type, engine_type, category, builder_certification, engine_count, seat_count, weight, speed) VALUES (?,?,?,?,?,?,?,?,?,?,?)"
 
     def __init__(self):
         self.code = ""
@@ -1613,49 +1453,9 @@ class aircraft():
         self.speed = ""
 
     def set_aircraft_type(self, value):
-        
-        if value == "1":
-            self.aircraft_type = "Glider"
-            return
-
-        if value == "2":
-            self.aircraft_type = "Balloon"
-            return
-
-        if value == "3":
-            self.aircraft_type = "Blimp/Dirigible"
-            return
 
-        if value == "4":
-            self.aircraft_type = "Fixed wing single engine"
-            return
-
-        if value == "5":
-            self.aircraft_type = "Fixed wing multi engine"
-            return
-
-        if value == "6":
-            self.aircraft_type = "Rotorcraft"
-            return
-
-        if value == "7":
-            self.aircraft_type = "Weight-shift-control"
-            return
-
-        if value == "8":
-            self.aircraft_type = "Powered Parachute"
-            return
-
-        if value == "9":
-            self.aircraft_type = "Gyroplane"
-            return
-
-        if value == "H":
-            self.aircraft_type = "Hybrid Lift"
-            return
-
-        if value == "O":
-            self.aircraft_type = "Other"
+        if value in AIRCRAFT_TYPES:
+            self.aircraft_type = AIRCRAFT_TYPES[value]
             return
 
         self.aircraft_type = "Unknown"
@@ -1664,116 +1464,40 @@ class aircraft():
 
     def set_engine_type(self, value):
 
-        if value == "0":
-            self.engine_type = "None"
-            return
-        
-        if value == "1":
-            self.engine_type = "Reciprocating"
-            return
-
-        if value == "2":
-            self.engine_type = "Turbo-prop"
-            return
-
-        if value == "3":
-            self.engine_type = "Turbo-shaft"
-            return
-        
-        if value == "4":
-            self.engine_type = "Turbo-jet"
-            return
-
-        if value == "5":
-            self.engine_type = "Turbo-fan"
-            return
-
-        if value == "6":
-            self.engine_type = "Ramjet"
-            return
-
-        if value == "7":
-            self.engine_type = "2 Cycle"
-            return
-
-        if value == "8":
-            self.engine_type = "4 Cycle"
-            return
-
-        if value == "9":
-            self.engine_type = "Unknown"
-            return
-
-        if value == "10":
-            self.engine_type = "Electric"
+        if value in ENGINE_TYPES:
+            self.engine_type = ENGINE_TYPES[value]
             return
 
-        if value == "11":
-            self.engine_type = "Rotary"
-            return
-
-        #Default "Unknown"
         self.engine_type = "Unknown"
         logger.warning("Unknown engine type provided: " + value + " " + str(self.toDict()))
         return
 
     def set_category(self, value):
 
-        if value == "1":
-            self.category = "Land"
-            return
-
-        if value == "2":
-            self.category = "Sea"
+        if value in CATEGORIES:
+            self.category = CATEGORIES[value]
             return
 
-        if value == "3":
-            self.category = "Amphibian"
-            return
-
-        #Default "Unknown"
         self.category = "Unknown"
         logger.warning("Unknown category type provided: " + value + " " + str(self.toDict()))
         return
 
     def set_builder_certification(self, value):
 
-        if value == "0":
-            self.builder_certification = "Type Certificated"
+        if value in BUILDER_CERTIFICATIONS:
+            self.builder_certification = BUILDER_CERTIFICATIONS[value]
             return
 
-        if value == "1":
-            self.builder_certification = "Not Type Certificated"
-            return
-
-        if value == "2":
-            self.builder_certification = "Light Sport"
-            return
-
-        #Default "Unknown"
         self.builder_certification = "Unknown"
         logger.warning("Unknown builder certification type provided: " + value + " " + str(self.toDict()))
         return
-    
-    def set_weight(self, value):
-
-        if value == "CLASS 1":
-            self.weight = "Up to 12,499lbs"
-            return
 
-        if value == "CLASS 2":
-            self.weight = "12,500 - 19,999lbs"
-            return
-
-        if value == "CLASS 3":
-            self.weight = "Exceeds 20,000lbs"
-            return
+    def set_weight(self, value):
 
-        if value == "CLASS 4":
-            self.weight = "UAV up to 55lbs"
+        if value in WEIGHTS:
+            self.weight = WEIGHTS[value]
             return
 
-        #Default "Unknown"
         self.weight = "Unknown"
         logger.warning("Unknown weight provided: " + value + " " + str(self.toDict()))
         return
@@ -1781,23 +1505,19 @@ class aircraft():
     def toDict(self):
         return self.__dict__
 
-    def commit(self):
-
-        dbCursor = import_sql.cursor()
+    def commit(self, batch):
 
-        insert_statement = "INSERT INTO aircraft (code, manufacturer, model, aircraft_type, engine_type, category, builder_certification, engine_count, seat_count, weight, speed) VALUES (?,?,?,?,?,?,?,?,?,?,?)"
         parameters = (self.code, self.manufacturer, self.model, self.aircraft_type, self.engine_type, self.category, self.builder_certification, self.engine_count, self.seat_count, self.weight, self.speed)
 
-        #Insert the record into the table
-        dbCursor.execute(insert_statement, parameters)
-
-        #Close the cursor
-        dbCursor.close()
+        #Queue the record for the table
+        batch.add(parameters)
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Imports the FAA N-Number Registry')
     parser.add_argument(dest='download_url', metavar="download_url", help='URL of the FAA N-Number registry to download.')
+    parser.add_argument('--force-download', dest='force_download', action='store_true', help='Download and import the file even if it has not changed since the last import.')
+    parser.add_argument('--streaming', dest='streaming', action='store_true', help='Join the reference files in memory and stream the registrations straight to MySQL instead of staging them in the local database.')
 
     args = parser.parse_args()
 
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#Opens an importer's source files, either extracted to the temp folder or read straight out of the downloaded ZIP file without
+#  extracting it.  Progress through a ZIP member is tracked by the compressed bytes read, so the member is only read once.
+import io
+import os
+import zipfile
+from urllib.parse import urlparse
+
+
+#Rows read between progress bar updates when reading from the ZIP file
+PROGRESS_INTERVAL = 1000
+
+
+def get_read_from_zip(settings):
+
+    #Get whether to read from the ZIP file, defaulting to false
+    if "read_from_zip" not in settings:
+        return False
+
+    if settings['read_from_zip'] not in [True, False]:
+        raise Exception("Reading source files from the ZIP file (read_from_zip) must be true or false.")
+
+    return settings['read_from_zip']
+
+
+def archive_path(settings):
+    return os.path.join(settings['tempPath'], os.path.basename(urlparse(settings['download_url']).path))
+
+
+def find_member(zipFile, memberName):
+
+    #Agencies are inconsistent about the case of their file names, and the FAA sometimes doubles the extension
+    for info in zipFile.infolist():
+        fileName = os.path.basename(info.filename).lower()
+
+        if fileName == memberName or fileName == memberName + os.path.splitext(memberName)[1]:
+            return info
+
+    raise Exception("File does not exist in the ZIP file.  Expected " + memberName + " in " + zipFile.filename)
+
+
+def open_text(settings, fileName, encoding=None):
+
+    if settings['read_from_zip'] == True:
+        return member_text(archive_path(settings), fileName, encoding)
+
+    return extracted_text(os.path.join(settings['tempPath'], fileName), encoding)
+
+
+class extracted_text():
+
+    def __init__(self, fileName, encoding=None):
+        self.fileName = fileName
+        self.encoding = encoding
+        self.file = None
+        self.rows = 0
+
+        #Make sure the file exists
+        if os.path.exists(self.fileName) == False:
+            raise Exception("File does not exist.  Expected " + self.fileName)
+
+    def __enter__(self):
+        self.file = open(self.fileName, "r", encoding=self.encoding)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.file.close()
+
+    def count_rows(self):
+
+        #Rows after the header, read from a separate handle
+        with open(self.fileName, "r", encoding=self.encoding) as countFile:
+            return sum(1 for line in countFile) - 1
+
+    def total(self):
+
+        #The progress bar counts rows
+        return self.count_rows()
+
+    def advance(self, bar):
+        self.rows = self.rows + 1
+        bar.next()
+
+
+class member_text():
+
+    def __init__(self, archiveFile, memberName, encoding=None):
+        self.archiveFile = archiveFile
+        self.memberName = memberName
+        self.encoding = encoding
+        self.file = None
+        self.rows = 0
+
+        #Make sure the file exists
+        if os.path.exists(self.archiveFile) == False:
+            raise Exception("ZIP file does not exist.  Expected " + self.archiveFile)
+
+    def __enter__(self):
+
+        #The ZIP file reads through this handle, so its position is how far into the member's compressed data the reader has got
+        self.rawFile = open(self.archiveFile, "rb")
+        self.zipFile = zipfile.ZipFile(self.rawFile)
+        self.info = find_member(self.zipFile, self.memberName)
+        memberFile = self.zipFile.open(self.info)
+        self.start = self.rawFile.tell()
+
+        #Same encoding and newline handling as open(fileName, "r")
+        self.file = io.TextIOWrapper(memberFile, encoding=self.encoding)
+
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.file.close()
+        self.zipFile.close()
+        self.rawFile.close()
+
+    def count_rows(self):
+
+        #Rows after the header; decompresses the member a second time, but nothing is written to disk
+        with zipfile.ZipFile(self.archiveFile) as zipFile:
+            with io.TextIOWrapper(zipFile.open(find_member(zipFile, self.memberName)), encoding=self.encoding) as countFile:
+                return sum(1 for line in countFile) - 1
+
+    def total(self):
+
+        #The progress bar counts compressed bytes
+        return self.info.compress_size
+
+    def advance(self, bar):
+        self.rows = self.rows + 1
+
+        if self.rows % PROGRESS_INTERVAL == 0:
+            bar.goto(min(self.rawFile.tell() - self.start, self.info.compress_size))